@@ -0,0 +1,210 @@
+import os
+import math
+import time
+import heapq
+import asyncio
+import itertools
+
+from prometheus_client import Counter, Gauge, Histogram
+from sse_starlette.sse import EventSourceResponse
+
+from src.backend.lib.singleton_class import Singleton
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+ADMISSION_IN_FLIGHT = Gauge("chat_admission_in_flight", "LLM chat turns currently being served")
+ADMISSION_QUEUE_DEPTH = Gauge("chat_admission_queue_depth", "LLM chat turns waiting for a slot")
+ADMISSION_REJECTED = Counter("chat_admission_rejected_total", "LLM chat turns rejected with 429", ["reason"])
+ADMISSION_QUEUE_WAIT = Histogram("chat_admission_queue_wait_seconds", "Time LLM chat turns waited for a slot",
+                                 buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+
+
+class AdmissionRejected(Exception):
+    """Raised when a chat turn cannot be admitted; carries the suggested Retry-After in seconds."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Chat admission rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A granted slot. Release it when the turn is finished; further releases are ignored."""
+
+    def __init__(self, controller, customer_guid, priority):
+        self.controller = controller
+        self.customer_guid = customer_guid
+        self.priority = priority
+        self.started = None
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+
+class AdmissionController(metaclass=Singleton):
+    """
+    Admission control for LLM-mode chat turns.
+    At most ADMISSION_MAX_CONCURRENT turns are served at once; the rest wait in a queue bounded
+    globally (ADMISSION_MAX_QUEUE) and per customer (ADMISSION_MAX_QUEUE_PER_TENANT). Customers in
+    ADMISSION_PRIORITY_CUSTOMERS are served before others. The expected wait is estimated from an
+    exponentially weighted average of turn durations; turns are rejected immediately, with a
+    Retry-After hint, when a queue is full or the estimate exceeds ADMISSION_MAX_QUEUE_WAIT_SECONDS.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+        self.max_concurrent = int(os.getenv("ADMISSION_MAX_CONCURRENT", 32))
+        self.max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", 100))
+        self.max_queue_per_tenant = int(os.getenv("ADMISSION_MAX_QUEUE_PER_TENANT", 20))
+        self.max_queue_wait_seconds = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_SECONDS", 30))
+        self.priority_customers = {guid.strip() for guid in os.getenv("ADMISSION_PRIORITY_CUSTOMERS", "").split(",") if guid.strip()}
+        self.ewma_alpha = 0.2
+        self.avg_service_seconds = float(os.getenv("ADMISSION_INITIAL_SERVICE_SECONDS", 5))
+
+        self.in_flight = 0
+        self._waiters = []  # heap of (priority, seq, future, ticket)
+        self._queued_per_tenant = {}
+        self._seq = itertools.count()
+        logger.info(
+            f"AdmissionController initialized (enabled={self.enabled}, max_concurrent={self.max_concurrent}, "
+            f"max_queue={self.max_queue}, max_queue_per_tenant={self.max_queue_per_tenant}, "
+            f"priority_customers={len(self.priority_customers)})"
+        )
+
+    def estimate_wait_seconds(self, position):
+        """Expected wait of a turn with `position` turns ahead of it in the queue."""
+        return (position + 1) * self.avg_service_seconds / self.max_concurrent
+
+    def _retry_after(self, position):
+        return max(1, math.ceil(self.estimate_wait_seconds(position)))
+
+    def _reject(self, reason, position):
+        ADMISSION_REJECTED.labels(reason=reason).inc()
+        retry_after = self._retry_after(position)
+        logger.warning(f"Rejecting chat turn ({reason}); retry after {retry_after}s")
+        raise AdmissionRejected(reason, retry_after)
+
+    def _queue_position(self, priority):
+        """Number of queued turns that would be served before a new turn of this priority."""
+        return sum(1 for waiter in self._waiters if waiter[0] <= priority)
+
+    async def acquire(self, customer_guid):
+        """Wait for a slot and return an AdmissionTicket, or raise AdmissionRejected."""
+        priority = 0 if customer_guid in self.priority_customers else 1
+        ticket = AdmissionTicket(self, customer_guid, priority)
+        if not self.enabled:
+            ticket.started = time.monotonic()
+            return ticket
+
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self._start(ticket)
+            return ticket
+
+        position = self._queue_position(priority)
+        if len(self._waiters) >= self.max_queue:
+            self._reject("global_queue_full", position)
+        if self._queued_per_tenant.get(customer_guid, 0) >= self.max_queue_per_tenant:
+            self._reject("tenant_queue_full", position)
+        if self.estimate_wait_seconds(position) > self.max_queue_wait_seconds:
+            self._reject("wait_too_long", position)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future, ticket))
+        self._queued_per_tenant[customer_guid] = self._queued_per_tenant.get(customer_guid, 0) + 1
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=self.max_queue_wait_seconds)
+        except asyncio.TimeoutError:
+            self._remove_waiter(ticket)
+            self._reject("queue_timeout", self._queue_position(priority))
+        except asyncio.CancelledError:
+            # The client went away; hand the slot on if it was granted in the meantime
+            if future.done() and not future.cancelled():
+                ticket.release()
+            else:
+                self._remove_waiter(ticket)
+            raise
+        ADMISSION_QUEUE_WAIT.observe(time.monotonic() - queued_at)
+        return ticket
+
+    def _start(self, ticket):
+        self.in_flight += 1
+        ticket.started = time.monotonic()
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+
+    def _remove_waiter(self, ticket):
+        for index, waiter in enumerate(self._waiters):
+            if waiter[3] is ticket:
+                self._waiters.pop(index)
+                heapq.heapify(self._waiters)
+                self._dequeued(ticket)
+                break
+
+    def _dequeued(self, ticket):
+        remaining = self._queued_per_tenant.get(ticket.customer_guid, 1) - 1
+        if remaining:
+            self._queued_per_tenant[ticket.customer_guid] = remaining
+        else:
+            self._queued_per_tenant.pop(ticket.customer_guid, None)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+
+    def _release(self, ticket):
+        if not self.enabled:
+            return
+        duration = time.monotonic() - ticket.started
+        self.avg_service_seconds += self.ewma_alpha * (duration - self.avg_service_seconds)
+        self.in_flight -= 1
+        # Hand the slot to the next waiter whose client is still there
+        while self._waiters and self.in_flight < self.max_concurrent:
+            _, _, future, waiter_ticket = heapq.heappop(self._waiters)
+            self._dequeued(waiter_ticket)
+            if not future.done():
+                self._start(waiter_ticket)
+                future.set_result(True)
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+
+    async def guard(self, ticket, stream):
+        """Pass an async generator through, releasing the ticket once it finishes or is closed."""
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            ticket.release()
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "queue_depth_per_tenant": dict(self._queued_per_tenant),
+            "max_queue_per_tenant": self.max_queue_per_tenant,
+            "avg_service_seconds": round(self.avg_service_seconds, 3),
+            "estimated_wait_seconds": round(self.estimate_wait_seconds(len(self._waiters)), 3),
+        }
+
+
+class AdmittedEventSourceResponse(EventSourceResponse):
+    """
+    EventSourceResponse holding an admission ticket. The ticket is released once the response
+    ends, even if its stream was never iterated (client gone or send failed before the first
+    event), since a generator that never started never runs its own finally.
+    """
+
+    def __init__(self, content, ticket, **kwargs):
+        super().__init__(content, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.ticket is not None:
+                self.ticket.release()
@@ -0,0 +1,94 @@
+import os
+import time
+import threading
+
+import numpy as np
+
+from src.backend.lib.singleton_class import Singleton
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+
+class AnswerCache(metaclass=Singleton):
+    """
+    Tenant-scoped semantic cache of final answers.
+    Entries are keyed by customer_guid and the normalized query embedding. A lookup hits when
+    the cosine similarity with a stored query reaches the threshold and the entry is younger
+    than the TTL. Every entry records the customer's knowledge version; when the version moves
+    (a file finished vectorizing or was deleted) all entries of that customer are dropped.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+        self.similarity_threshold = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", 0.95))
+        self.ttl_seconds = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", 3600))
+        self.max_entries_per_customer = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES_PER_CUSTOMER", 500))
+        self._entries = {}  # customer_guid -> list of entry dicts, oldest first
+        self._versions = {}  # customer_guid -> knowledge version the entries were built against
+        self._lock = threading.Lock()
+        logger.info(
+            f"AnswerCache initialized (enabled={self.enabled}, threshold={self.similarity_threshold}, "
+            f"ttl={self.ttl_seconds}s, max_entries_per_customer={self.max_entries_per_customer})"
+        )
+
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_version(self, customer_guid, knowledge_version):
+        """Drop the customer's entries if they were built against another knowledge version."""
+        if self._versions.get(customer_guid) != knowledge_version:
+            if self._entries.pop(customer_guid, None):
+                logger.info(f"Knowledge version changed for customer_guid: {customer_guid}. Answer cache invalidated.")
+            self._versions[customer_guid] = knowledge_version
+
+    def lookup(self, customer_guid, query_embedding, knowledge_version):
+        """Return the cached answer for a similar query, or None on a miss."""
+        if not self.enabled:
+            return None
+        query_vector = self._normalize(query_embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._sync_version(customer_guid, knowledge_version)
+            entries = [entry for entry in self._entries.get(customer_guid, []) if now - entry["created_at"] < self.ttl_seconds]
+            self._entries[customer_guid] = entries
+            if not entries:
+                return None
+            scores = np.stack([entry["embedding"] for entry in entries]) @ query_vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+            logger.debug(f"Answer cache hit for customer_guid: {customer_guid} (similarity={scores[best]:.4f}, query='{entries[best]['query']}')")
+            return entries[best]["answer"]
+
+    def store(self, customer_guid, query, query_embedding, answer, knowledge_version):
+        """Cache an answer for the customer, evicting the oldest entries beyond the limit."""
+        if not self.enabled or not answer:
+            return
+        with self._lock:
+            self._sync_version(customer_guid, knowledge_version)
+            entries = self._entries.setdefault(customer_guid, [])
+            entries.append({
+                "query": query,
+                "embedding": self._normalize(query_embedding),
+                "answer": answer,
+                "created_at": time.monotonic(),
+            })
+            del entries[:-self.max_entries_per_customer]
+
+    def invalidate_customer(self, customer_guid):
+        """Drop every cached answer of a customer."""
+        with self._lock:
+            self._entries.pop(customer_guid, None)
+            self._versions.pop(customer_guid, None)
+        logger.info(f"Answer cache invalidated for customer_guid: {customer_guid}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+        logger.info("Answer cache cleared")
@@ -0,0 +1,54 @@
+import os
+
+from prometheus_client import Counter, Histogram
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+LABELS = ["provider", "model", "tenant"]
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CHAT_PHASE_SECONDS = Histogram("chat_phase_seconds", "Duration of the phases of an LLM chat turn",
+                               ["phase"] + LABELS, buckets=LATENCY_BUCKETS)
+CHAT_FIRST_TOKEN_SECONDS = Histogram("chat_first_token_seconds", "Time from the start of a chat turn to its first streamed token",
+                                     LABELS, buckets=LATENCY_BUCKETS)
+CHAT_OUTPUT_TOKENS = Counter("chat_output_tokens_total", "Tokens streamed in chat answers", LABELS)
+CHAT_TOKENS_PER_SECOND = Histogram("chat_tokens_per_second", "Answer streaming rate after the first token",
+                                   LABELS, buckets=(1, 5, 10, 20, 40, 80, 160, 320))
+
+# Per-tenant series are opt-in: a customer_guid label grows the series count with every customer
+TENANT_LABEL_ENABLED = os.getenv("CHAT_METRICS_TENANT_LABEL", "false").lower() == "true"
+
+# Keys of the timings dict exported as chat_phase_seconds{phase=...}
+PHASES = {
+    "history_load_seconds": "history_load",
+    "rewrite_seconds": "rewrite",
+    "cache_lookup_seconds": "cache_lookup",
+    "embedding_seconds": "embedding",
+    "hybrid_query_seconds": "hybrid_query",
+    "rerank_seconds": "rerank",
+    "page_expansion_seconds": "page_expansion",
+    "retrieval_seconds": "retrieval",
+    "llm_first_token_seconds": "llm_first_token",
+    "generation_seconds": "generation",
+    "total_seconds": "total",
+}
+
+
+def record_turn_metrics(timings, provider, model, tenant):
+    """Export the timings collected for one chat turn, labelled by provider, model and tenant."""
+    try:
+        labels = {"provider": provider or "", "model": model or "", "tenant": tenant if TENANT_LABEL_ENABLED else ""}
+        for key, phase in PHASES.items():
+            if key in timings:
+                CHAT_PHASE_SECONDS.labels(phase=phase, **labels).observe(timings[key])
+        if "first_token_seconds" in timings:
+            CHAT_FIRST_TOKEN_SECONDS.labels(**labels).observe(timings["first_token_seconds"])
+        if timings.get("output_tokens"):
+            CHAT_OUTPUT_TOKENS.labels(**labels).inc(timings["output_tokens"])
+        if timings.get("tokens_per_second"):
+            CHAT_TOKENS_PER_SECOND.labels(**labels).observe(timings["tokens_per_second"])
+    except Exception as e:
+        logger.error(f"Failed to record chat metrics: {e}")
@@ -1,6 +1,7 @@
 import logging
 import json
 from http import HTTPStatus
+from typing import List
 
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -9,13 +10,13 @@ from pydantic import BaseModel
 from starlette.responses import StreamingResponse
 from src.backend.lib.auth_utils import get_decoded_token  # Import auth_utils
 from src.backend.lib.utils import CustomerService, auth_admin_dependency
-from sse_starlette.sse import EventSourceResponse
 
 from src.backend.db.database_manager import DatabaseManager, SenderType
 from src.backend.minio.minio_manager import MinioManager
-from src.backend.weaviate.weaviate_manager import WeaviateManager
+from src.backend.weaviate.vector_backend import get_vector_manager
 from src.backend.lib.logging_config import get_primitivechat_logger
 from src.backend.chat_service.llm_service import LLMService
+from src.backend.chat_service.admission_controller import AdmissionController, AdmissionRejected, AdmittedEventSourceResponse
 
 # Setup logging configuration
 logger = get_primitivechat_logger(__name__)
@@ -26,15 +27,17 @@ app = APIRouter()
 
 db_manager = DatabaseManager()
 minio_manager = MinioManager()
-weaviate_manager = WeaviateManager()
+weaviate_manager = get_vector_manager()
 customer_service = CustomerService()
 llm_service = LLMService()
+admission_controller = AdmissionController()
 
 # Pydantic models for the API inputs
 class ChatRequest(BaseModel):
     question: str
     chat_id: str = None
     stream: bool = False  # Default value is False
+    debug: bool = False  # Attach per-phase timings to the final event
 
 
 class GetAllChatsRequest(BaseModel):
@@ -51,6 +54,24 @@ class AdvancedSearchRequest(BaseModel):
     top_k: int = 3
     alpha: float = 0.5
 
+class BulkEmbeddingStatusRequest(BaseModel):
+    file_ids: List[str]
+
+# Map the database status to a user-friendly processing stage
+EMBEDDING_STATUS_MAPPING = {
+    "todo": "EXTRACTING",
+    "extract_error": "EXTRACTING",
+    "extracted": "CHUNKING",
+    "chunk_error": "CHUNKING",
+    "chunked": "EMBEDDING",
+    "vectorize_error": "EMBEDDING",
+    "completed": "SUCCESS",
+    "error": "FILE_EMBEDDING_FAILED",
+    "file_vectorization_failed": "FILE_EMBEDDING_FAILED"
+}
+
+MAX_BULK_EMBEDDING_STATUS_FILE_IDS = 500
+
 # API endpoint to add a new customer
 @app.post("/addcustomer", tags=["Customer Management"])
 async def add_customer(request: Request, auth=Depends(auth_admin_dependency)):
@@ -280,19 +301,7 @@ async def get_file_embedding_status(file_id: str, request: Request, auth=Depends
         filename, status, error_retry = file_status
 
         # Map the database status to a user-friendly processing stage
-        status_mapping = {
-            "todo": "EXTRACTING",
-            "extract_error": "EXTRACTING",
-            "extracted": "CHUNKING",
-            "chunk_error": "CHUNKING",
-            "chunked": "EMBEDDING",
-            "vectorize_error": "EMBEDDING",
-            "completed": "SUCCESS",
-            "error": "FILE_EMBEDDING_FAILED",
-            "file_vectorization_failed": "FILE_EMBEDDING_FAILED"
-        }
-
-        processing_stage = status_mapping.get(status, "UNKNOWN")
+        processing_stage = EMBEDDING_STATUS_MAPPING.get(status, "UNKNOWN")
         logger.info(f"File {file_id} is in stage: {processing_stage}")
 
         return {
@@ -310,6 +319,58 @@ async def get_file_embedding_status(file_id: str, request: Request, auth=Depends
         logger.debug(f"Exiting get_file_embedding_status() with file_id: {file_id}")
 
 
+@app.post("/files/embeddingstatus", tags=["Vectorize Management"])
+async def get_bulk_file_embedding_status(
+    bulk_request: BulkEmbeddingStatusRequest,
+    request: Request,
+    auth=Depends(auth_admin_dependency)
+):
+    logger.debug(f"Entering get_bulk_file_embedding_status() with {len(bulk_request.file_ids)} file_ids")
+    try:
+        # Get customer_guid from the token
+        customer_guid = customer_service.get_customer_guid_from_token(request)
+        if not customer_guid:
+            logger.error("Invalid or missing customer_guid in token")
+            raise HTTPException(status_code=404, detail="Invalid customer_guid provided")
+
+        # Preserve the request order while dropping duplicates
+        file_ids = list(dict.fromkeys(bulk_request.file_ids))
+        if not file_ids:
+            raise HTTPException(status_code=400, detail="file_ids must not be empty")
+        if len(file_ids) > MAX_BULK_EMBEDDING_STATUS_FILE_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A maximum of {MAX_BULK_EMBEDDING_STATUS_FILE_IDS} file_ids can be requested at once"
+            )
+
+        # Resolve every file_id with a single query
+        file_statuses = db_manager.get_file_embedding_statuses_from_file_ids(customer_guid, file_ids)
+        if file_statuses is None:
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+        statuses_by_file_id = {file["file_id"]: file for file in file_statuses}
+        files = [
+            {
+                "file_id": file_id,
+                "filename": statuses_by_file_id[file_id]["filename"],
+                "processing_stage": EMBEDDING_STATUS_MAPPING.get(statuses_by_file_id[file_id]["status"], "UNKNOWN"),
+            }
+            for file_id in file_ids if file_id in statuses_by_file_id
+        ]
+        not_found_file_ids = [file_id for file_id in file_ids if file_id not in statuses_by_file_id]
+
+        logger.info(f"Returning embedding status for {len(files)} files, {len(not_found_file_ids)} not found for customer_guid: {customer_guid}")
+        return {"files": files, "not_found_file_ids": not_found_file_ids}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching bulk file embedding status: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        logger.debug("Exiting get_bulk_file_embedding_status()")
+
+
 @app.get("/file/list", tags=["Vectorize Management"])
 async def paginated_list_files(
     request: Request,
@@ -332,25 +393,12 @@ async def paginated_list_files(
             logger.info(f"No files found for customer_guid: {customer_guid}")
             return []
 
-        # Map database status to user-friendly embedding status
-        status_mapping = {
-            "todo": "EXTRACTING",
-            "extract_error": "EXTRACTING",
-            "extracted": "CHUNKING",
-            "chunk_error": "CHUNKING",
-            "chunked": "EMBEDDING",
-            "vectorize_error": "EMBEDDING",
-            "completed": "SUCCESS",
-            "error": "FILE_EMBEDDING_FAILED",
-            "file_vectorization_failed": "FILE_EMBEDDING_FAILED"
-        }
-
-        # Format the response
+        # Format the response with user-friendly embedding status
         response = [
             {
                 "fileid": file["file_id"],
                 "filename": file["filename"],
-                "embeddingstatus": status_mapping.get(file["status"], "UNKNOWN"),
+                "embeddingstatus": EMBEDDING_STATUS_MAPPING.get(file["status"], "UNKNOWN"),
                 "uploaded_time": file["uploaded_time"]
             }
             for file in files
@@ -415,6 +463,7 @@ async def get_files_deletion_status(request: Request, page: int = 1, page_size:
 async def chat(chat_request: ChatRequest, request: Request, auth=Depends(auth_admin_dependency)):
     logger.debug(f"Entering chat() with Correlation ID: {request.state.correlation_id}")
 
+    ticket = None
     try:
         customer_guid = customer_service.get_customer_guid_from_token(request)
         if not customer_guid:
@@ -424,6 +473,14 @@ async def chat(chat_request: ChatRequest, request: Request, auth=Depends(auth_ad
         if not user_id:
             raise HTTPException(status_code=404, detail="Missing required parameter: user_id")
 
+        # Admit LLM turns before storing anything, so overload is rejected cheaply
+        if LLMService.get_llm_response() == "LLM":
+            try:
+                ticket = await admission_controller.acquire(customer_guid)
+            except AdmissionRejected as e:
+                raise HTTPException(status_code=429, detail="The assistant is busy. Please retry shortly.",
+                                    headers={"Retry-After": str(e.retry_after)})
+
         user_response = db_manager.add_message(
             user_id,
             customer_guid,
@@ -444,8 +501,12 @@ async def chat(chat_request: ChatRequest, request: Request, auth=Depends(auth_ad
             question=chat_request.question,
             user_id=user_id,
             customer_guid=customer_guid,
-            chat_id=chat_id
+            chat_id=chat_id,
+            debug=chat_request.debug
         )
+        if ticket is not None:
+            # The slot is held until the answer has been fully generated
+            response_stream = admission_controller.guard(ticket, response_stream)
 
         if chat_request.stream:
             full_answer = ""
@@ -467,16 +528,21 @@ async def chat(chat_request: ChatRequest, request: Request, auth=Depends(auth_ad
                     chat_id=chat_id
                 )
 
-            return EventSourceResponse(event_generator())
+            # The response releases the slot even if the stream never starts
+            response = AdmittedEventSourceResponse(event_generator(), ticket)
+            ticket = None
+            return response
 
         else:
             # Not streaming — accumulate response from chunks
             full_answer = ""
+            debug_info = None
             async for chunk in response_stream:
                 logger.debug(f"Received chunk: {chunk}")
                 if "choices" in chunk and chunk["choices"]:
                     delta = chunk["choices"][0].get("delta", {})
                     full_answer += delta.get("content", "")
+                debug_info = chunk.get("debug", debug_info)
 
             # Save system response to DB
             db_manager.add_message(
@@ -487,12 +553,15 @@ async def chat(chat_request: ChatRequest, request: Request, auth=Depends(auth_ad
                 chat_id=chat_id
             )
 
-            return {
+            response = {
                 "chat_id": chat_id,
                 "customer_guid": customer_guid,
                 "user_id": user_id,
                 "answer": full_answer
             }
+            if debug_info is not None:
+                response["debug"] = debug_info
+            return response
 
     except HTTPException as e:
         logger.error(f"HTTPException in chat(): {e.detail}")
@@ -500,6 +569,10 @@ async def chat(chat_request: ChatRequest, request: Request, auth=Depends(auth_ad
     except Exception as e:
         logger.error(f"Unexpected error in chat(): {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred during chat processing")
+    finally:
+        if ticket is not None:
+            # Non-streamed turn finished or failed; a no-op if the guard already released it
+            ticket.release()
 
 # API endpoint to retrieve chat messages in reverse chronological order (paginated)
 @app.get("/getallchats", tags=["Chat Management"])
@@ -602,6 +675,7 @@ async def delete_chats(delete_chats_request: DeleteChatsRequest, request: Reques
         if result is None:
             logger.error("Failed to delete chats")
             raise HTTPException(status_code=500, detail="Failed to delete chats")
+        llm_service.forget_chat(customer_guid, delete_chats_request.chat_id)
         logger.debug(f"Exiting delete_chats() with Correlation ID: {request.state.correlation_id}")
         return {"message": "Chat deleted successfully"}
     except HTTPException as e:
@@ -0,0 +1,126 @@
+import os
+
+import tiktoken
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+# Rough per-message overhead of chat formats (role markers, separators)
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+def make_token_counter(llm):
+    """
+    Return a function counting tokens with the model's own tokenizer (llm.get_num_tokens).
+    Falls back to tiktoken's cl100k_base encoding if the model cannot count tokens.
+    """
+    fallback_encoding = tiktoken.get_encoding("cl100k_base")
+    use_fallback = llm is None or not hasattr(llm, "get_num_tokens")
+
+    def count_tokens(text):
+        nonlocal use_fallback
+        if not text:
+            return 0
+        if not use_fallback:
+            try:
+                return llm.get_num_tokens(text)
+            except Exception as e:
+                logger.warning(f"Model tokenizer unavailable, falling back to cl100k_base: {e}")
+                use_fallback = True
+        return len(fallback_encoding.encode(text, disallowed_special=()))
+
+    return count_tokens
+
+
+class ContextPacker:
+    """
+    Fit conversation history and retrieved context into a token budget for the final RAG prompt.
+    Context is taken first, in order of relevance score, up to LLM_CONTEXT_TOKEN_SHARE of the budget
+    left after the fixed messages; overlapping chunks across ranks are emitted once and the JSON
+    scaffolding of the search results is replaced with a short source header per result. History
+    fills the rest of the budget, newest turns first.
+    """
+
+    def __init__(self, count_tokens, token_budget=None, context_token_share=None):
+        self.count_tokens = count_tokens
+        self.token_budget = token_budget or int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", 6000))
+        self.context_token_share = context_token_share or float(os.getenv("LLM_CONTEXT_TOKEN_SHARE", 0.7))
+
+    def _message_tokens(self, message):
+        return self.count_tokens(message.content) + MESSAGE_TOKEN_OVERHEAD
+
+    @staticmethod
+    def _result_chunks(result):
+        """Chunks of a search result; results without chunk details are treated as one chunk."""
+        chunks = result.get("chunks")
+        if chunks:
+            return sorted(chunks, key=lambda c: (min(c.get("page_numbers") or [0]), c.get("chunk_number", 0)))
+        return [{"chunk_number": None, "page_numbers": result.get("page_numbers", []), "text": result.get("text", "")}]
+
+    @staticmethod
+    def _source_header(filename, pages):
+        if not pages:
+            return f"Source: {filename}"
+        if len(pages) == 1:
+            return f"Source: {filename}, page {pages[0]}"
+        return f"Source: {filename}, pages {pages[0]}-{pages[-1]}"
+
+    def pack_context(self, search_results, token_limit):
+        """Build the context text from the search results within token_limit tokens."""
+        results = sorted(search_results.get("results", []), key=lambda r: r.get("relevance_score", 0), reverse=True)
+        seen_chunks = set()
+        sections = []
+        used_tokens = 0
+
+        for result in results:
+            filename = result.get("filename", "")
+            header_tokens = None
+            texts, pages = [], set()
+            for chunk in self._result_chunks(result):
+                if chunk["chunk_number"] is not None:
+                    key = (filename, chunk["chunk_number"])
+                else:
+                    key = (filename, tuple(chunk.get("page_numbers", [])))
+                text = (chunk.get("text") or "").strip()
+                if key in seen_chunks or not text:
+                    continue
+                if header_tokens is None:
+                    # The header is paid once per result, with the first chunk that fits
+                    header_tokens = self.count_tokens(self._source_header(filename, sorted(result.get("page_numbers", [])))) + 1
+                chunk_tokens = self.count_tokens(text)
+                extra = chunk_tokens + (header_tokens if not texts else 0)
+                if used_tokens + extra > token_limit:
+                    continue
+                seen_chunks.add(key)
+                texts.append(text)
+                pages.update(chunk.get("page_numbers", []))
+                used_tokens += extra
+
+            if texts:
+                sections.append(self._source_header(filename, sorted(pages)) + "\n" + " ".join(texts))
+
+        logger.debug(f"Packed {len(sections)} context sections using {used_tokens}/{token_limit} tokens")
+        return "\n\n".join(sections), used_tokens
+
+    def pack(self, fixed_messages, history_messages, search_results):
+        """
+        Return (packed_history, context_text). fixed_messages (system prompt, instructions,
+        the current question) are always kept and counted against the budget.
+        """
+        remaining = self.token_budget - sum(self._message_tokens(m) for m in fixed_messages)
+        context_text, context_tokens = self.pack_context(search_results, max(int(remaining * self.context_token_share), 0))
+        remaining -= context_tokens
+
+        packed_history = []
+        for message in reversed(history_messages):
+            message_tokens = self._message_tokens(message)
+            if message_tokens > remaining:
+                break
+            packed_history.append(message)
+            remaining -= message_tokens
+        packed_history.reverse()
+
+        logger.debug(f"Kept {len(packed_history)}/{len(history_messages)} history messages, {remaining} tokens unused")
+        return packed_history, context_text
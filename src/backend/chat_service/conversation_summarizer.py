@@ -0,0 +1,95 @@
+import os
+import asyncio
+
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from src.backend.lib.singleton_class import Singleton
+from src.backend.lib.logging_config import get_primitivechat_logger
+from src.backend.chat_service.history_store import HUMAN
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a customer support conversation. "
+    "Merge the existing summary with the new messages into one concise summary. "
+    "Keep the customer's goals, product names, identifiers, decisions and open questions. "
+    "Do not add anything that was not said. Only output the summary itself."
+)
+
+
+class ConversationSummarizer(metaclass=Singleton):
+    """
+    Fold older turns of long conversations into a running summary in the background.
+    Once a session holds more than CHAT_SUMMARY_TRIGGER_TURNS turns, everything but the last
+    CHAT_SUMMARY_KEEP_TURNS turns is summarized together with the previous summary. The summary
+    replaces those turns in the history store and is persisted in chat_summaries so it survives
+    eviction. At most one summarization runs per session at a time.
+    """
+
+    def __init__(self, history_store, db_manager):
+        self.enabled = os.getenv("CHAT_SUMMARY_ENABLED", "false").lower() == "true"
+        self.keep_turns = int(os.getenv("CHAT_SUMMARY_KEEP_TURNS", 4))
+        self.trigger_turns = int(os.getenv("CHAT_SUMMARY_TRIGGER_TURNS", 12))
+        self.history_store = history_store
+        self.db_manager = db_manager
+        self._in_flight = set()
+        self._tasks = set()
+        logger.info(f"ConversationSummarizer initialized (enabled={self.enabled}, keep_turns={self.keep_turns}, trigger_turns={self.trigger_turns})")
+
+    def load(self, customer_guid, chat_id, max_turns):
+        """
+        History loader for the store: the persisted summary plus the last unsummarized messages.
+        Returns (summary, offset, messages) with the database message rows oldest first.
+        """
+        summary_row = self.db_manager.get_chat_summary(customer_guid, chat_id)
+        summarized_count = summary_row["summarized_count"] if summary_row else 0
+        total = self.db_manager.count_chat_messages(customer_guid, chat_id)
+        if total is None:
+            # Without a count the coverage of the summary is unknown; fall back to plain history
+            summary_row, summarized_count, total = None, 0, max_turns * 2
+        limit = min(max_turns * 2, max(total - summarized_count, 0))
+        messages = self.db_manager.get_last_chat_messages(customer_guid, chat_id, limit=limit) if limit else []
+        return (summary_row["summary"] if summary_row else None), total - len(messages), messages
+
+    def maybe_schedule(self, session_id, customer_guid, chat_id, invoke):
+        """
+        Start a background summarization of the session if it is long enough.
+        `invoke` is an async callable taking LangChain messages and returning an AI message.
+        """
+        if not self.enabled or session_id in self._in_flight:
+            return
+        candidates = self.history_store.summary_candidates(session_id, self.keep_turns * 2)
+        if candidates is None:
+            return
+        summary, offset, older = candidates
+        if len(older) < (self.trigger_turns - self.keep_turns) * 2:
+            return
+
+        self._in_flight.add(session_id)
+        task = asyncio.create_task(self._summarize(session_id, customer_guid, chat_id, summary, offset, older, invoke))
+        self._tasks.add(task)  # Keep a reference so the task is not garbage collected
+        task.add_done_callback(self._tasks.discard)
+
+    async def _summarize(self, session_id, customer_guid, chat_id, summary, offset, older, invoke):
+        try:
+            transcript = "\n".join(f"{'Customer' if role == HUMAN else 'Agent'}: {content}" for role, content in older)
+            prompt = [
+                SystemMessage(content=SUMMARY_INSTRUCTIONS),
+                HumanMessage(content=f"Existing summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}")
+            ]
+            response = await invoke(prompt)
+            new_summary = response.content.strip()
+            if not new_summary:
+                return
+
+            summarized_count = self.history_store.apply_summary(session_id, new_summary, offset, len(older))
+            if summarized_count is None:
+                logger.debug(f"Session {session_id} changed during summarization. Summary discarded.")
+                return
+            await asyncio.to_thread(self.db_manager.upsert_chat_summary, customer_guid, chat_id, new_summary, summarized_count)
+            logger.info(f"Summarized {len(older)} messages of session_id: {session_id}")
+        except Exception as e:
+            logger.error(f"Conversation summarization failed for session_id {session_id}: {e}")
+        finally:
+            self._in_flight.discard(session_id)
@@ -0,0 +1,195 @@
+import os
+import sys
+import threading
+from collections import OrderedDict, deque
+
+from src.backend.lib.singleton_class import Singleton
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+HUMAN = "human"
+AI = "ai"
+
+# Approximate cost of the tuple and deque slot holding one message
+MESSAGE_OVERHEAD_BYTES = 120
+
+
+class _Session:
+    __slots__ = ("messages", "size_bytes", "loaded", "summary", "offset", "lock")
+
+    def __init__(self, max_messages):
+        self.messages = deque(maxlen=max_messages)
+        self.size_bytes = 0
+        self.loaded = False
+        self.summary = None  # Running summary of the messages before `offset`
+        self.offset = 0  # Number of chat messages that precede messages[0]
+        self.lock = threading.Lock()
+
+
+def _message_bytes(content):
+    return sys.getsizeof(content) + MESSAGE_OVERHEAD_BYTES
+
+
+class ConversationHistoryStore(metaclass=Singleton):
+    """
+    In-memory conversation histories bounded by total bytes.
+    Messages are kept as compact (role, content) tuples, the last CHAT_HISTORY_MAX_TURNS turns per
+    session. Sessions are evicted least recently used first once the store exceeds
+    CHAT_HISTORY_MAX_BYTES. A global lock guards the session index and byte accounting; each
+    session has its own lock so concurrent requests on one chat load and append in order.
+    A session may also carry a running summary of the messages before its window.
+    """
+
+    def __init__(self, max_bytes=None, max_turns=None):
+        self.max_bytes = max_bytes or int(os.getenv("CHAT_HISTORY_MAX_BYTES", 64 * 1024 * 1024))
+        self.max_turns = max_turns or int(os.getenv("CHAT_HISTORY_MAX_TURNS", 32))
+        self._sessions = OrderedDict()  # session_id -> _Session, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        logger.info(f"ConversationHistoryStore initialized (max_bytes={self.max_bytes}, max_turns={self.max_turns})")
+
+    @property
+    def max_messages(self):
+        return self.max_turns * 2
+
+    def _session(self, session_id):
+        """Return the session entry, creating an empty unloaded one if needed."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = _Session(self.max_messages)
+                self._sessions[session_id] = session
+            else:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def _append_locked(self, session_id, session, role, content):
+        """Append to a session whose lock is held and update the byte accounting."""
+        evicted_bytes = 0
+        if len(session.messages) == session.messages.maxlen:
+            evicted_bytes = _message_bytes(session.messages[0][1])
+            session.offset += 1
+        session.messages.append((role, content))
+        self._account_locked(session_id, session, _message_bytes(content) - evicted_bytes)
+
+    def _account_locked(self, session_id, session, added):
+        session.size_bytes += added
+        with self._lock:
+            if self._sessions.get(session_id) is session:
+                self._total_bytes += added
+            self._evict_if_needed(keep=session_id)
+
+    def _evict_if_needed(self, keep):
+        """Evict least recently used sessions until the store fits max_bytes. Caller holds _lock."""
+        for session_id in list(self._sessions):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if session_id == keep:
+                continue
+            evicted = self._sessions.pop(session_id)
+            self._total_bytes -= evicted.size_bytes
+            logger.debug(f"Evicted conversation {session_id} ({evicted.size_bytes} bytes)")
+
+    def get_or_load(self, session_id, loader):
+        """
+        Return (summary, messages) for the session. On a miss, `loader(max_turns)` is called once
+        under the session lock and must return (summary, offset, messages) where messages are
+        (role, content) tuples oldest first and offset is the number of chat messages before them.
+        """
+        while True:
+            session = self._session(session_id)
+            with session.lock:
+                with self._lock:
+                    evicted = self._sessions.get(session_id) is not session
+                if evicted:
+                    continue  # Evicted while waiting for the lock; start over
+                if not session.loaded:
+                    summary, offset, messages = loader(self.max_turns)
+                    session.offset = offset
+                    if summary:
+                        session.summary = summary
+                        self._account_locked(session_id, session, sys.getsizeof(summary))
+                    for role, content in messages:
+                        self._append_locked(session_id, session, role, content)
+                    session.loaded = True
+                    logger.debug(f"Loaded {len(session.messages)} messages for session_id: {session_id}")
+                return session.summary, list(session.messages)
+
+    def append(self, session_id, role, content, skip_duplicate=False):
+        """
+        Append a message to a loaded session. Sessions that are not in memory are left alone; they
+        are loaded from the database, which already has the message, on their next access. With
+        skip_duplicate the message is dropped if it equals the last one, which happens when the
+        loader already read it from the database.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            return
+        with session.lock:
+            if not session.loaded:
+                return
+            if skip_duplicate and session.messages and session.messages[-1] == (role, content):
+                return
+            self._append_locked(session_id, session, role, content)
+
+    def summary_candidates(self, session_id, keep_messages):
+        """
+        Return (summary, offset, messages) where messages are all but the last keep_messages of the
+        session, i.e. what a summarizer should fold into the summary. None if the session is unknown.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            if not session.loaded:
+                return None
+            older = list(session.messages)[:max(len(session.messages) - keep_messages, 0)]
+            return session.summary, session.offset, older
+
+    def apply_summary(self, session_id, summary, offset, folded_count):
+        """
+        Replace the first folded_count messages of the session with the new summary. Ignored when
+        the session changed underneath (evicted, reloaded or trimmed) since the candidates were read.
+        Returns the new offset, or None if the summary was not applied.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            if session.offset != offset or len(session.messages) < folded_count:
+                return None
+            freed = sum(_message_bytes(session.messages.popleft()[1]) for _ in range(folded_count))
+            freed += sys.getsizeof(session.summary) if session.summary else 0
+            session.summary = summary
+            session.offset += folded_count
+            self._account_locked(session_id, session, sys.getsizeof(summary) - freed)
+            return session.offset
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            return list(session.messages)
+
+    def remove_chat(self, customer_guid, chat_id):
+        """Drop every session of a chat, e.g. after its messages were deleted."""
+        suffix = f":{customer_guid}:{chat_id}"
+        with self._lock:
+            for session_id in [s for s in self._sessions if s.endswith(suffix)]:
+                self._total_bytes -= self._sessions.pop(session_id).size_bytes
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._sessions), "total_bytes": self._total_bytes, "max_bytes": self.max_bytes}
@@ -0,0 +1,166 @@
+import os
+import asyncio
+import importlib.util
+import threading
+
+import httpx
+
+from src.backend.lib.singleton_class import Singleton
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+
+# ---------------------------------------
+# HTTPX logging hooks shared by the pooled clients
+# ---------------------------------------
+def _log_request(request: httpx.Request):
+    logger.debug(f"HTTPX Request ▶ {request.method} {request.url}")
+    logger.debug(f"Request headers: {dict(request.headers)}")
+    if request.content:
+        try:
+            logger.debug(f"Request body: {request.content.decode()}")
+        except Exception:
+            logger.debug(f"Request body (bytes): {request.content}")
+
+def _log_response(response: httpx.Response):
+    logger.debug(f"HTTPX Response ◀ {response.status_code} {response.url}")
+    logger.debug(f"Response headers: {dict(response.headers)}")
+    return response
+
+async def _alog_request(request: httpx.Request):
+    _log_request(request)
+
+async def _alog_response(response: httpx.Response):
+    _log_response(response)
+
+
+class LLMHttpClientPool(metaclass=Singleton):
+    """
+    One managed pair of sync and async HTTPX clients per LLM provider base_url.
+    Clients keep connections alive across requests, use HTTP/2 for https endpoints when the
+    h2 package is installed, and share the connect/read timeouts configured below. Pairs are
+    reference counted: acquire() on provider initialization, release() on switch, aclose_all()
+    on shutdown.
+    """
+
+    def __init__(self):
+        self.timeout = httpx.Timeout(
+            connect=float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", 5)),
+            read=float(os.getenv("LLM_HTTP_READ_TIMEOUT", 60)),
+            write=float(os.getenv("LLM_HTTP_WRITE_TIMEOUT", 10)),
+            pool=float(os.getenv("LLM_HTTP_POOL_TIMEOUT", 5)),
+        )
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)),
+            keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", 30)),
+        )
+        self.http2_enabled = (os.getenv("LLM_HTTP2_ENABLED", "true").lower() == "true"
+                              and importlib.util.find_spec("h2") is not None)
+        # Let streams that started on a released client finish before closing it
+        self.close_grace_seconds = float(os.getenv("LLM_HTTP_CLOSE_GRACE_SECONDS", 120))
+        self._clients = {}  # base_url -> {"sync": Client, "async": AsyncClient, "refs": int}
+        self._closing = {}  # pending delayed-close task -> (base_url, pair)
+        self._lock = threading.Lock()
+        logger.info(f"LLMHttpClientPool initialized (http2={self.http2_enabled}, timeout={self.timeout}, limits={self.limits})")
+
+    def _create_pair(self, base_url):
+        # HTTP/2 needs TLS (ALPN); plain http endpoints such as a local Ollama stay on HTTP/1.1
+        http2 = self.http2_enabled and base_url.startswith("https://")
+        sync_client = httpx.Client(
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=http2,
+            event_hooks={"request": [_log_request], "response": [_log_response]},
+        )
+        async_client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=http2,
+            event_hooks={"request": [_alog_request], "response": [_alog_response]},
+        )
+        logger.info(f"Created pooled HTTP clients for {base_url} (http2={http2})")
+        # "loop" is the event loop the async client's connections belong to
+        return {"sync": sync_client, "async": async_client, "refs": 0, "loop": None}
+
+    @staticmethod
+    def _running_loop():
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    def acquire(self, base_url):
+        """Return the (sync, async) client pair for base_url, creating it on first use."""
+        loop = self._running_loop()
+        with self._lock:
+            pair = self._clients.get(base_url)
+            if pair is None:
+                pair = self._create_pair(base_url)
+                self._clients[base_url] = pair
+            if pair["loop"] is None:
+                pair["loop"] = loop
+            pair["refs"] += 1
+            return pair["sync"], pair["async"]
+
+    def release(self, base_url):
+        """Drop a reference to the base_url clients and close them once unused."""
+        with self._lock:
+            pair = self._clients.get(base_url)
+            if pair is None:
+                return
+            pair["refs"] -= 1
+            if pair["refs"] > 0:
+                return
+            del self._clients[base_url]
+        loop = pair["loop"]
+        if loop is None:
+            # Acquired outside any event loop (e.g. during startup), so the async client never connected
+            pair["sync"].close()
+            logger.info(f"Closed pooled HTTP clients for {base_url}")
+        elif loop.is_closed() or not loop.is_running():
+            # Its connections belong to a loop that is gone; closing them on another loop fails or hangs
+            pair["sync"].close()
+            logger.warning(f"Event loop of the {base_url} async client is gone, dropping it without closing")
+        elif loop is self._running_loop():
+            self._schedule_close(base_url, pair)
+        else:
+            loop.call_soon_threadsafe(self._schedule_close, base_url, pair)
+
+    def _schedule_close(self, base_url, pair):
+        """Close the pair after the grace period; runs on the loop that owns the async client."""
+        task = asyncio.get_running_loop().create_task(self._close_pair(base_url, pair, self.close_grace_seconds))
+        # Keep a reference so the task is not garbage collected before it finishes
+        self._closing[task] = (base_url, pair)
+        task.add_done_callback(self._close_done)
+
+    def _close_done(self, task):
+        self._closing.pop(task, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Closing pooled HTTP clients failed: {task.exception()}")
+
+    @staticmethod
+    async def _close_pair(base_url, pair, delay):
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            pair["sync"].close()
+            await pair["async"].aclose()
+            logger.info(f"Closed pooled HTTP clients for {base_url}")
+        except Exception as e:
+            logger.error(f"Error closing HTTP clients for {base_url}: {e}")
+
+    async def aclose_all(self):
+        """Close every pooled client immediately (application shutdown), including released ones still in their grace period."""
+        with self._lock:
+            pairs = list(self._clients.items())
+            self._clients.clear()
+        closing = list(self._closing.items())
+        for task, _ in closing:
+            task.cancel()
+        await asyncio.gather(*(task for task, _ in closing), return_exceptions=True)
+        pairs.extend(pair for _, pair in closing)
+        for base_url, pair in pairs:
+            await self._close_pair(base_url, pair, 0)
@@ -0,0 +1,249 @@
+import os
+import time
+import asyncio
+from collections import deque
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+
+class ProviderStats:
+    """
+    Rolling time-to-first-token samples and failure state of one provider. Samples are
+    (seconds, censored) pairs; a censored sample comes from a cancelled hedge loser and is only
+    a lower bound, so it is left out of the average.
+    """
+
+    def __init__(self, window):
+        self.ttft_samples = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    def rolling_ttft(self):
+        observed = [seconds for seconds, censored in self.ttft_samples if not censored]
+        if observed:
+            return sum(observed) / len(observed)
+        if self.ttft_samples:
+            # Only lower bounds so far: rank by the largest one rather than as unmeasured
+            return max(seconds for seconds, _ in self.ttft_samples)
+        return None
+
+    def is_healthy(self, now):
+        return now >= self.unhealthy_until
+
+
+class LLMRouter:
+    """
+    Route LLM calls across several initialized providers.
+    Providers are ranked by rolling time-to-first-token; providers without samples rank first so
+    they get measured, and ties keep the configured order. A provider is taken out of rotation for
+    `cooldown_seconds` after `failure_threshold` consecutive failures. Streams fail over to the next
+    provider when a provider errors before its first token and, when `hedge_delay_seconds` is set,
+    a second provider is started if the first token has not arrived by then; the loser is cancelled.
+
+    The first token is the first chunk with content; leading chunks without any (such as the
+    OpenAI role-only delta) do not stop the clock.
+
+    Providers are duck-typed: anything with `astream(messages)` and `ainvoke(messages)` works, which
+    keeps the router testable against local stubs. `stream_fn`/`invoke_fn` let the caller wrap the
+    calls (e.g. with concurrency limits).
+    """
+
+    def __init__(self, providers, hedge_delay_seconds=None, window=None, failure_threshold=None,
+                 cooldown_seconds=None, stream_fn=None, invoke_fn=None):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.providers = dict(providers)
+        self.hedge_delay_seconds = hedge_delay_seconds
+        self.failure_threshold = failure_threshold or int(os.getenv("LLM_ROUTER_FAILURE_THRESHOLD", 3))
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else float(os.getenv("LLM_ROUTER_COOLDOWN_SECONDS", 30))
+        window = window or int(os.getenv("LLM_ROUTER_TTFT_WINDOW", 20))
+        self.stats = {name: ProviderStats(window) for name in self.providers}
+        self.stream_fn = stream_fn or (lambda name, llm, messages: llm.astream(messages))
+        self.invoke_fn = invoke_fn or (lambda name, llm, messages: llm.ainvoke(messages))
+
+    # ---------------------------------------
+    # Health and ranking
+    # ---------------------------------------
+    def record_ttft(self, name, seconds):
+        stats = self.stats[name]
+        stats.ttft_samples.append((seconds, False))
+        stats.consecutive_failures = 0
+
+    def record_censored_ttft(self, name, seconds):
+        """Record that a cancelled request had no first token after `seconds`."""
+        self.stats[name].ttft_samples.append((seconds, True))
+
+    def record_failure(self, name):
+        stats = self.stats[name]
+        stats.consecutive_failures += 1
+        if stats.consecutive_failures >= self.failure_threshold:
+            stats.unhealthy_until = time.monotonic() + self.cooldown_seconds
+            logger.warning(f"Provider {name} marked unhealthy for {self.cooldown_seconds}s after {stats.consecutive_failures} failures")
+
+    def mark_unhealthy(self, name, seconds=None):
+        self.stats[name].unhealthy_until = time.monotonic() + (self.cooldown_seconds if seconds is None else seconds)
+
+    def mark_healthy(self, name):
+        stats = self.stats[name]
+        stats.unhealthy_until = 0.0
+        stats.consecutive_failures = 0
+
+    def ranked_providers(self):
+        """Healthy providers ordered fastest first, followed by unhealthy ones as a last resort."""
+        now = time.monotonic()
+        order = list(self.providers)
+
+        def sort_key(name):
+            ttft = self.stats[name].rolling_ttft()
+            return (ttft is not None, ttft or 0.0, order.index(name))
+
+        healthy = sorted((n for n in order if self.stats[n].is_healthy(now)), key=sort_key)
+        unhealthy = sorted((n for n in order if not self.stats[n].is_healthy(now)),
+                           key=lambda n: self.stats[n].unhealthy_until)
+        return healthy + unhealthy
+
+    def snapshot(self):
+        now = time.monotonic()
+        return {
+            name: {
+                "healthy": stats.is_healthy(now),
+                "rolling_ttft_seconds": stats.rolling_ttft(),
+                "samples": len(stats.ttft_samples),
+                "censored_samples": sum(1 for _, censored in stats.ttft_samples if censored),
+                "consecutive_failures": stats.consecutive_failures,
+            }
+            for name, stats in self.stats.items()
+        }
+
+    # ---------------------------------------
+    # Calls
+    # ---------------------------------------
+    async def ainvoke(self, messages, route_info=None):
+        """Invoke the fastest healthy provider, failing over on errors."""
+        last_error = None
+        for name in self.ranked_providers():
+            start = time.monotonic()
+            try:
+                result = await self.invoke_fn(name, self.providers[name], messages)
+            except Exception as e:
+                logger.error(f"Provider {name} failed to invoke: {e}")
+                self.record_failure(name)
+                last_error = e
+                continue
+            self.stats[name].consecutive_failures = 0
+            if route_info is not None:
+                route_info.update({"provider": name, "latency_seconds": time.monotonic() - start})
+            return result
+        raise RuntimeError(f"All LLM providers failed: {last_error}")
+
+    @staticmethod
+    def _has_content(chunk):
+        """Whether a stream chunk carries answer text."""
+        content = getattr(getattr(chunk, "message", chunk), "content", chunk)
+        if isinstance(content, dict):
+            choices = content.get("choices") or [{}]
+            content = (choices[0].get("delta") or {}).get("content")
+        return bool(content)
+
+    async def _first_token(self, iterator):
+        """Read a stream up to its first chunk with content; returns the chunks read (all of them if it ends first)."""
+        chunks = []
+        while True:
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                return chunks
+            chunks.append(chunk)
+            if self._has_content(chunk):
+                return chunks
+
+    def _start(self, name, messages):
+        """Open a provider stream and schedule the fetch of its first token."""
+        iterator = self.stream_fn(name, self.providers[name], messages).__aiter__()
+        return {"name": name, "iterator": iterator, "started": time.monotonic(),
+                "first": asyncio.ensure_future(self._first_token(iterator))}
+
+    @staticmethod
+    async def _cancel(attempt):
+        attempt["first"].cancel()
+        try:
+            await attempt["first"]
+        except BaseException:
+            pass
+        aclose = getattr(attempt["iterator"], "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
+
+    async def astream(self, messages, route_info=None):
+        """
+        Stream from the fastest healthy provider. Fails over before the first token and, with
+        hedging enabled, races a second provider when the first token misses the deadline.
+        """
+        candidates = self.ranked_providers()
+        running = []
+        winner, first_chunks = None, []
+
+        try:
+            while winner is None:
+                if not running:
+                    if not candidates:
+                        raise RuntimeError("All LLM providers failed before the first token")
+                    running.append(self._start(candidates.pop(0), messages))
+
+                can_hedge = self.hedge_delay_seconds is not None and candidates and len(running) == 1
+                timeout = None
+                if can_hedge:
+                    timeout = max(self.hedge_delay_seconds - (time.monotonic() - running[0]["started"]), 0)
+                done, _ = await asyncio.wait([a["first"] for a in running], timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    hedge = candidates.pop(0)
+                    logger.info(f"No first token from {running[0]['name']} within {self.hedge_delay_seconds}s. Hedging with {hedge}.")
+                    running.append(self._start(hedge, messages))
+                    if route_info is not None:
+                        route_info["hedged"] = True
+                    continue
+
+                for attempt in [a for a in running if a["first"] in done]:
+                    running.remove(attempt)
+                    try:
+                        chunks = attempt["first"].result()
+                    except Exception as e:
+                        logger.error(f"Provider {attempt['name']} failed before the first token: {e}")
+                        self.record_failure(attempt["name"])
+                        continue
+                    if winner is None:
+                        winner, first_chunks = attempt, chunks
+                    else:
+                        running.append(attempt)  # Lost a same-tick race; cancelled below
+        finally:
+            for loser in running:
+                # A cancelled request is a censored sample: its first token took at least this long
+                self.record_censored_ttft(loser["name"], time.monotonic() - loser["started"])
+                await self._cancel(loser)
+
+        ttft = time.monotonic() - winner["started"]
+        self.record_ttft(winner["name"], ttft)
+        if route_info is not None:
+            route_info.update({"provider": winner["name"], "ttft_seconds": ttft})
+        logger.debug(f"Routed stream to {winner['name']} (ttft={ttft:.3f}s)")
+
+        try:
+            for chunk in first_chunks:
+                yield chunk
+            async for chunk in winner["iterator"]:
+                yield chunk
+        except Exception:
+            self.record_failure(winner["name"])
+            raise
+        finally:
+            aclose = getattr(winner["iterator"], "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -1,14 +1,12 @@
 import os
+import re
+import time
+import asyncio
 import logging
-import httpx
-import json
 
-from collections import OrderedDict
 from typing import AsyncGenerator, Optional
 from fastapi import APIRouter, HTTPException
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from langchain.memory import ConversationBufferWindowMemory
-from langchain_community.chat_models import ChatOllama
 from langchain_openai import ChatOpenAI
 from src.backend.db.database_manager import DatabaseManager, SenderType
 from src.backend.lib.logging_config import get_primitivechat_logger
@@ -17,51 +15,151 @@ from src.backend.lib.default_ai_response import DEFAULTAIRESPONSE
 from fastapi import Request
 from pathlib import Path
 from src.backend.lib.singleton_class import Singleton
-from src.backend.weaviate.weaviate_manager import WeaviateManager
+from src.backend.weaviate.vector_backend import get_vector_manager
+from src.backend.chat_service.answer_cache import AnswerCache
+from src.backend.chat_service.context_packer import ContextPacker, make_token_counter
+from src.backend.chat_service.http_client_pool import LLMHttpClientPool
+from src.backend.chat_service.llm_router import LLMRouter
+from src.backend.chat_service.history_store import ConversationHistoryStore, HUMAN, AI
+from src.backend.chat_service.conversation_summarizer import ConversationSummarizer
+from src.backend.chat_service.admission_controller import AdmissionController
+from src.backend.chat_service.provider_health import ProviderHealthMonitor
+from src.backend.chat_service.chat_metrics import record_turn_metrics
+from src.backend.chat_service.mock_llm import MockChatModel
 
 # Configure logging
 logger = get_primitivechat_logger(__name__)
 
 db_manager = DatabaseManager()
-weaviate_manager = WeaviateManager()
-
-# ---------------------------------------
-# Add these HTTPX logging hooks below your imports
-# ---------------------------------------
-def _log_request(request: httpx.Request):
-    logger.debug(f"HTTPX Request ▶ {request.method} {request.url}")
-    logger.debug(f"Request headers: {dict(request.headers)}")
-    if request.content:
-        try:
-            logger.debug(f"Request body: {request.content.decode()}")
-        except Exception:
-            logger.debug(f"Request body (bytes): {request.content}")
+weaviate_manager = get_vector_manager()
+answer_cache = AnswerCache()
+history_store = ConversationHistoryStore()
+summarizer = ConversationSummarizer(history_store, db_manager)
 
-def _log_response(response: httpx.Response):
-    logger.debug(f"HTTPX Response ◀ {response.status_code} {response.url}")
-    logger.debug(f"Response headers: {dict(response.headers)}")
-    logger.debug(f"Response body: {response.text}")
-    return response
+http_client_pool = LLMHttpClientPool()
+health_monitor = ProviderHealthMonitor()
 
 class LLMService(metaclass=Singleton):
     """
     Service to manage interactions with the LLM and maintain conversation history.
     """
     llm_response = "NONLLM"  # Static variable to toggle response mode
-    max_conversations = 200
-    buffer_size = 32
-    histories = OrderedDict()
+    system_prompt = "You are a customer support agent. You will be provided context from RAG system to provide answers to user's questions .If there is no context, you can answer from your knowledge. Do not hallucinate. If the user is enabling greetings, then you can talk without context. Make the tone a bit professional. Avoid Inner monologue or first-person thoughts. Keep the <think> tags within 1 or 2 sentences."
     llm = None
     LLMProvider = "GEMINI"  # Default provider
     model = os.getenv("GEMINI_MODEL")  # Default model name
-
-    def __init__(self, max_conversations=200, buffer_size=32):
+    default_max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", 8))  # Per-provider in-flight LLM calls
+    provider_semaphores = {}
+    token_counters = {}  # provider -> token counting function of its model
+    speculative_retrieval = os.getenv("LLM_SPECULATIVE_RETRIEVAL", "false").lower() == "true"
+    speculative_reuse_threshold = float(os.getenv("LLM_SPECULATIVE_REUSE_THRESHOLD", 0.6))
+    router = None  # LLMRouter over LLM_ROUTER_PROVIDERS; None routes everything to `llm`
+    rewrite_llm = None  # Dedicated query rewrite model; None rewrites with the answer model
+    rewrite_provider = os.getenv("LLM_REWRITE_PROVIDER")
+    rewrite_model = os.getenv("LLM_REWRITE_MODEL")
+    rewrite_timeout_seconds = float(os.getenv("LLM_REWRITE_TIMEOUT_SECONDS", 5))
+
+    def __init__(self):
         logger.info("Initializing LLMService")
-        LLMService.max_conversations = max_conversations
-        LLMService.buffer_size = buffer_size
 
         # Initialize LLM
         LLMService.llm = self._initialize_llm(LLMService.LLMProvider, LLMService.model)
+        health_monitor.register(LLMService.LLMProvider, LLMService.llm)
+        LLMService.router = self._initialize_router()
+        LLMService.rewrite_llm = self._initialize_rewrite_llm()
+        self._register_health_providers()
+
+    def _initialize_rewrite_llm(self):
+        """
+        Initialize the query rewrite model from LLM_REWRITE_PROVIDER and LLM_REWRITE_MODEL,
+        e.g. a small local Ollama model. Returns None if unset or if initialization fails.
+        """
+        provider = LLMService.rewrite_provider
+        if not provider:
+            return None
+        try:
+            llm = self._initialize_llm(provider.upper(), LLMService.rewrite_model or os.getenv(f"{provider.upper()}_MODEL"))
+            health_monitor.register(f"{provider.upper()}_REWRITE", llm)
+            logger.info(f"Query rewriting uses provider {provider} (timeout={LLMService.rewrite_timeout_seconds}s)")
+            return llm
+        except Exception as e:
+            logger.error(f"Failed to initialize the query rewrite model, using the answer model: {e}")
+            return None
+
+    def _register_health_providers(self):
+        """
+        Watch the endpoints of the router's providers and of every provider listed in
+        LLM_HEALTH_PROVIDERS, so switching to them does not need a probe first.
+        Health results take routed providers in and out of rotation.
+        """
+        if LLMService.router is not None:
+            for provider, llm in LLMService.router.providers.items():
+                health_monitor.register(provider, llm)
+            health_monitor.add_listener(self._on_provider_health)
+
+        for provider in self._health_providers():
+            if provider in health_monitor.providers:
+                continue
+            try:
+                llm = self._initialize_llm(provider, os.getenv(f"{provider}_MODEL"))
+            except Exception as e:
+                logger.error(f"Skipping health monitoring of provider {provider}: {e}")
+                continue
+            health_monitor.register(provider, llm)
+            self._release_llm(llm)  # The monitor holds its own reference on the endpoint
+
+    @staticmethod
+    def _health_providers():
+        return [p.strip().upper() for p in os.getenv("LLM_HEALTH_PROVIDERS", "").split(",") if p.strip()]
+
+    def _watched_provider(self, provider):
+        """Whether the provider is monitored on its own account: routed or listed in LLM_HEALTH_PROVIDERS."""
+        router = LLMService.router
+        return (router is not None and provider in router.providers) or provider in self._health_providers()
+
+    @staticmethod
+    def _on_provider_health(provider, healthy, changed):
+        router = LLMService.router
+        if router is None or provider not in router.providers:
+            return
+        if not healthy:
+            # Keep it out of rotation until the next probe says otherwise
+            router.mark_unhealthy(provider, seconds=health_monitor.interval_seconds + health_monitor.timeout_seconds)
+        elif changed:
+            router.mark_healthy(provider)
+
+    def _initialize_router(self):
+        """
+        Initialize every provider listed in LLM_ROUTER_PROVIDERS (model from <PROVIDER>_MODEL)
+        and build a router over them. Providers that fail to initialize are skipped.
+        Returns None when fewer than two providers are available.
+        """
+        provider_names = [p.strip().upper() for p in os.getenv("LLM_ROUTER_PROVIDERS", "").split(",") if p.strip()]
+        if not provider_names:
+            return None
+
+        providers = {}
+        for provider in provider_names:
+            try:
+                providers[provider] = self._initialize_llm(provider, os.getenv(f"{provider}_MODEL"))
+            except Exception as e:
+                logger.error(f"Skipping provider {provider} for routing: {e}")
+
+        if len(providers) < 2:
+            logger.warning(f"LLM routing disabled: only {list(providers)} could be initialized")
+            for llm in providers.values():
+                self._release_llm(llm)
+            return None
+
+        hedge_delay = float(os.getenv("LLM_ROUTER_HEDGE_DELAY_SECONDS", 0))
+        router = LLMRouter(
+            providers,
+            hedge_delay_seconds=hedge_delay or None,
+            stream_fn=lambda name, llm, messages: self.astream(messages, llm=llm, provider=name),
+            invoke_fn=lambda name, llm, messages: self.ainvoke(messages, llm=llm, provider=name),
+        )
+        logger.info(f"LLM routing enabled across {list(providers)} (hedge_delay={hedge_delay or None})")
+        return router
 
     def _initialize_llm(self, provider, model_name):
         """
@@ -76,12 +174,18 @@ class LLMService(metaclass=Singleton):
             return self._initialize_gemini(model_name)
         elif provider == "OPENAI":
             return self._initialize_openai(model_name)
+        elif provider == "MOCK":
+            return self._initialize_mock(model_name)
         else:
             logger.error(f"Unsupported LLM provider: {provider}")
             raise ValueError(f"Unsupported LLM provider: {provider}")
     
    
     def _initialize_ollama(self, model_name):
+        """
+        Delegate Ollama setup to the shared OpenAI initializer through Ollama's
+        OpenAI-compatible /v1 endpoint, so it uses the same pooled HTTP clients.
+        """
         ollama_host = os.getenv("OLLAMA_HOST")
         ollama_port = os.getenv("OLLAMA_PORT")
         model_name = os.getenv("OLLAMA_MODEL")
@@ -90,17 +194,12 @@ class LLMService(metaclass=Singleton):
             logger.error("Environment variables OLLAMA_HOST, OLLAMA_PORT, and OLLAMA_MODEL must be set.")
             raise ValueError("Missing required environment variables.")
 
-        try:
-            llm = ChatOllama(
-                model=model_name,
-                base_url=f"http://{ollama_host}:{ollama_port}",
-                temperature=0.7
-            )
-            logger.info("ChatOllama initialized successfully")
-            return llm
-        except Exception as e:
-            logger.error(f"Failed to initialize ChatOllama: {e}")
-            raise RuntimeError(f"Failed to initialize ChatOllama: {e}")
+        return self._initialize_openai_llm(
+            api_key=os.getenv("OLLAMA_API_KEY", "ollama"),  # Ollama ignores the key but the client requires one
+            model_name=model_name,
+            base_url=f"http://{ollama_host}:{ollama_port}/v1",
+            temperature=0.7
+        )
 
  # ...existing code...
 
@@ -113,17 +212,15 @@ class LLMService(metaclass=Singleton):
             logger.error("API key and model name must be provided.")
             raise ValueError("Missing required credentials for OpenAI LLM.")
 
+        # Pooled keep-alive clients shared by every model on this base_url
+        sync_client, async_client = http_client_pool.acquire(base_url)
         try:
-            client = httpx.Client(
-                event_hooks={
-                    "request": [_log_request],
-                },
-            )
             init_kwargs = {
                 "api_key": api_key,
                 "model": model_name,
                 "base_url": base_url,
-                "http_client": client,
+                "http_client": sync_client,
+                "http_async_client": async_client,
             }
             if temperature is not None:
                 init_kwargs["temperature"] = temperature
@@ -134,19 +231,12 @@ class LLMService(metaclass=Singleton):
                 llm.max_tokens = max_tokens
             if model_kwargs:
                 llm.model_kwargs = model_kwargs
-            
-             # ▶️ Validate LLM by sending a dummy "ping"
-            try:
-                llm([HumanMessage(content="ping")])
-                logger.info(f"✅ LLM '{model_name}' endpoint validated at {base_url}")
-            except Exception as e:
-                logger.error(f"❌ LLM '{model_name}' validation failed: {e}")
-                raise RuntimeError(f"LLM validation failed for model '{model_name}': {e}")
-
 
+            # Endpoint availability is checked by ProviderHealthMonitor, not here
             logger.info(f"OpenAI model '{model_name}' initialized at {base_url}")
             return llm
         except Exception as e:
+            http_client_pool.release(base_url)
             logger.error(f"Failed to initialize OpenAI LLM: {e}")
             raise RuntimeError(f"Failed to initialize OpenAI LLM: {e}")
 
@@ -206,6 +296,24 @@ class LLMService(metaclass=Singleton):
             model_kwargs=krutrim_kwargs
         )
 
+    def _initialize_mock(self, model_name):
+        """
+        Initialize the local MOCK provider for offline load and latency tests.
+        Reads MOCK_LLM_TTFT_SECONDS, MOCK_LLM_INTER_TOKEN_SECONDS, MOCK_LLM_ERROR_RATE, MOCK_LLM_SEED,
+        MOCK_LLM_RESPONSE and MOCK_LLM_RESPONSE_TOKENS.
+        """
+        llm = MockChatModel(
+            model_name=model_name or os.getenv("MOCK_MODEL", "mock"),
+            ttft_seconds=float(os.getenv("MOCK_LLM_TTFT_SECONDS", 0.2)),
+            inter_token_seconds=float(os.getenv("MOCK_LLM_INTER_TOKEN_SECONDS", 0.02)),
+            error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", 0)),
+            seed=int(os.getenv("MOCK_LLM_SEED", 42)),
+            response_text=os.getenv("MOCK_LLM_RESPONSE") or None,
+            response_tokens=int(os.getenv("MOCK_LLM_RESPONSE_TOKENS", 64)),
+        )
+        logger.info(f"Mock model '{llm.model_name}' initialized (ttft={llm.ttft_seconds}s, inter_token={llm.inter_token_seconds}s, error_rate={llm.error_rate})")
+        return llm
+
 # ...existing code...
     @classmethod
     def set_llm_response(cls, mode):
@@ -236,177 +344,400 @@ class LLMService(metaclass=Singleton):
     def get_model(cls):
         return cls.model
 
-    def _evict_if_needed(self):
-        while len(LLMService.histories) > LLMService.max_conversations:
-            oldest_key, _ = LLMService.histories.popitem(last=False)
-            logger.debug(f"Evicted LRU conversation: {oldest_key}")
+    @classmethod
+    def get_provider_semaphore(cls, provider):
+        """
+        Return the semaphore gating concurrent calls to the given provider.
+        The limit is read from <PROVIDER>_MAX_CONCURRENCY and falls back to LLM_MAX_CONCURRENCY.
+        """
+        if provider not in cls.provider_semaphores:
+            limit = int(os.getenv(f"{provider}_MAX_CONCURRENCY", cls.default_max_concurrency))
+            cls.provider_semaphores[provider] = asyncio.Semaphore(limit)
+            logger.info(f"Concurrency limit for provider {provider} set to {limit}")
+        return cls.provider_semaphores[provider]
 
-    def get_or_create_history(self, session_id, user_id, customer_guid, chat_id):
-        logger.debug(f"Getting or creating history for session_id: {session_id}")
-        if session_id not in LLMService.histories:
-            logger.debug(f"[NEW] Creating new history for session_id: {session_id}")
-            history = ConversationBufferWindowMemory(k=self.buffer_size)
-            history.chat_memory.add_message(SystemMessage(content="You are a customer support agent. You will be provided context from RAG system to provide answers to user's questions .If there is no context, you can answer from your knowledge. Do not hallucinate. If the user is enabling greetings, then you can talk without context. Make the tone a bit professional. Avoid Inner monologue or first-person thoughts. Keep the <think> tags within 1 or 2 sentences."))
-
-            # Fetch messages from the database
-            messages = db_manager.get_paginated_chat_messages(customer_guid, chat_id, page=1, page_size=self.buffer_size * 3)
-            
-            messages.sort(key=lambda msg: msg['timestamp'])
-            logger.debug(f"DB Messages: {messages}")
-
-            # Add messages to chat memory
-            for msg in messages:
-                if msg['sender_type'] == SenderType.CUSTOMER.value:
-                    history.chat_memory.add_message(HumanMessage(content=msg['message']))
-                elif msg['sender_type'] == SenderType.SYSTEM.value:
-                    history.chat_memory.add_message(AIMessage(content=msg['message']))
-
-            LLMService.histories[session_id] = history
-            self._evict_if_needed()
-            logger.debug("New buffered conversation history created for session_id: %s", session_id)  # Fixed logging
+    async def ainvoke(self, messages, llm=None, provider=None):
+        """
+        Invoke the LLM asynchronously while holding a slot of the provider's semaphore.
+        """
+        llm = llm or LLMService.llm
+        provider = provider or LLMService.LLMProvider
+        async with self.get_provider_semaphore(provider):
+            return await llm.ainvoke(messages)
+
+    async def astream(self, messages, llm=None, provider=None):
+        """
+        Stream from the LLM asynchronously, holding a slot of the provider's semaphore
+        until the stream is exhausted or closed.
+        """
+        llm = llm or LLMService.llm
+        provider = provider or LLMService.LLMProvider
+        async with self.get_provider_semaphore(provider):
+            async for chunk in llm.astream(messages):
+                yield chunk
+
+    @staticmethod
+    def _load_history(customer_guid, chat_id, max_turns):
+        """
+        Read a chat's history from the database for the history store: the running summary, if
+        summarization is enabled, and the last max_turns turns as (role, content) tuples.
+        """
+        if summarizer.enabled:
+            summary, offset, messages = summarizer.load(customer_guid, chat_id, max_turns)
         else:
-            logger.debug(f"[SKIP] Session {session_id} already exists in memory.")
-            LLMService.histories.move_to_end(session_id)
-        return LLMService.histories[session_id]
+            summary, offset = None, 0
+            messages = db_manager.get_last_chat_messages(customer_guid, chat_id, limit=max_turns * 2)
+        roles = {SenderType.CUSTOMER.value: HUMAN, SenderType.SYSTEM.value: AI}
+        turns = [(roles[msg['sender_type']], msg['message']) for msg in messages if msg['sender_type'] in roles]
+        return summary, offset, turns
 
-    async def get_response(self, question, user_id, customer_guid, chat_id) -> AsyncGenerator[dict, None]:
+    @classmethod
+    def _to_messages(cls, summary, turns):
+        """Build LangChain messages for a prompt from the running summary and stored (role, content) tuples."""
+        system_prompt = cls.system_prompt
+        if summary:
+            system_prompt += f"\n\nSummary of the earlier conversation:\n{summary}"
+        messages = [SystemMessage(content=system_prompt)]
+        for role, content in turns:
+            messages.append(HumanMessage(content=content) if role == HUMAN else AIMessage(content=content))
+        return messages
+
+    async def get_or_create_history(self, session_id, customer_guid, chat_id):
+        """
+        Return (summary, turns) of a session, loading the last turns from the database on a miss.
+        The load runs off the event loop under the session's lock.
+        """
+        logger.debug(f"Getting or creating history for session_id: {session_id}")
+        return await asyncio.to_thread(
+            history_store.get_or_load,
+            session_id,
+            lambda max_turns: self._load_history(customer_guid, chat_id, max_turns)
+        )
+
+    async def get_response(self, question, user_id, customer_guid, chat_id, debug=False) -> AsyncGenerator[dict, None]:
+        """
+        Stream the answer to a question as chat.completion chunks. In LLM mode the duration of each
+        phase is exported as metrics; with debug set it is also attached to the final chunk.
+        """
         session_id = f"{user_id}:{customer_guid}:{chat_id}"
-        history = self.get_or_create_history(session_id, user_id, customer_guid, chat_id)
+        turn_start = time.perf_counter()
+        timings = {}
+        summary, turns = await self.get_or_create_history(session_id, customer_guid, chat_id)
+        timings["history_load_seconds"] = time.perf_counter() - turn_start
 
-        if not (history.chat_memory.messages and
-                isinstance(history.chat_memory.messages[-1], HumanMessage) and
-                history.chat_memory.messages[-1].content == question):
-            history.chat_memory.add_message(HumanMessage(content=question))
+        # The question is usually already loaded, since the caller stores it before answering
+        if not (turns and turns[-1] == (HUMAN, question)):
+            history_store.append(session_id, HUMAN, question, skip_duplicate=True)
+            turns.append((HUMAN, question))
 
         llm_response_mode = LLMService.get_llm_response()
         if llm_response_mode == "NONLLM":
             response_content = DEFAULTAIRESPONSE
             logger.debug("LLM_RESPONSE set to NONLLM. Returning default response for session_id: %s", session_id)
-            response = AIMessage(content=response_content)
-            history.chat_memory.add_message(response)
-            yield {
-                "chat_id": chat_id,
-                "customer_guid": customer_guid,
-                "user_id": user_id,
-                "object": "chat.completion",
-                "choices": [
-                    {
-                        "delta": {
-                            "role": "assistant",
-                            "content": response_content
-                        },
-                        "index": 0,
-                        "finish_reason": "stop"
-                    }
-                ]
-            }
+            history_store.append(session_id, AI, response_content)
+            yield self._completion_chunk(chat_id, customer_guid, user_id, response_content, finish_reason="stop")
         else:
-            messages = history.chat_memory.messages
+            # Pin the provider for the whole turn so a concurrent switch cannot split it
+            llm = LLMService.llm
+            provider = LLMService.LLMProvider
+            router = LLMService.router
+            if router is not None:
+                # Budget the prompt with the tokenizer of the provider most likely to serve it
+                provider = router.ranked_providers()[0]
+                llm = router.providers[provider]
+            messages = self._to_messages(summary, turns)
             logger.debug(f"Messages: {messages}")
 
             # --- Query Rewriting ---
-            rewrite_prompt = messages + [
-                SystemMessage(
-                    content=(
-                        "Based on our conversation so far, please rewrite the last user question "
-                        "to be a concise, self-contained query suitable for a vector database search. "
-                        "Only output the rewritten query itself, with no preamble or explanation "
-                        "and when we query the RAG database it should give the right relevant answer"
-                    )
+            # On the first turn there is no history to resolve, so the question is used as is
+            is_first_turn = not summary and not any(isinstance(msg, HumanMessage) for msg in messages[:-1])
+
+            # Start retrieval on the raw question while the rewrite is in flight
+            speculative_search, speculative_timings = None, {}
+            if LLMService.speculative_retrieval and not is_first_turn:
+                speculative_search = asyncio.create_task(
+                    asyncio.to_thread(weaviate_manager.search_query_advanced, customer_guid, question,
+                                      timings=speculative_timings, include_chunks=True)
                 )
-            ]
-            try:
-                rewrite_resp = LLMService.llm.invoke(rewrite_prompt)
-                rewritten_query = rewrite_resp.content.strip()
-            except Exception as e:
-                logger.error(f"Query rewrite failed: {e}")
+
+            if is_first_turn:
+                logger.debug("First turn of the conversation. Skipping query rewrite.")
                 rewritten_query = question
+            else:
+                rewrite_messages = messages
+                if summarizer.enabled:
+                    # The summary carries the older turns; only the most recent ones are sent verbatim
+                    rewrite_messages = messages[:1] + messages[1:][-(summarizer.keep_turns * 2 + 1):]
+                rewrite_prompt = rewrite_messages + [
+                    SystemMessage(
+                        content=(
+                            "Based on our conversation so far, please rewrite the last user question "
+                            "to be a concise, self-contained query suitable for a vector database search. "
+                            "Only output the rewritten query itself, with no preamble or explanation "
+                            "and when we query the RAG database it should give the right relevant answer"
+                        )
+                    )
+                ]
+                # The deadline only bounds a dedicated rewrite model; the answer model is not cut short
+                rewrite_timeout = (LLMService.rewrite_timeout_seconds or None) if LLMService.rewrite_llm is not None else None
+                phase_start = time.perf_counter()
+                try:
+                    rewrite_resp = await asyncio.wait_for(self._rewrite(rewrite_prompt, llm, provider, router),
+                                                          timeout=rewrite_timeout)
+                    rewritten_query = rewrite_resp.content.strip() or question
+                except asyncio.TimeoutError:
+                    logger.warning(f"Query rewrite missed its {rewrite_timeout}s deadline. Using the raw question.")
+                    rewritten_query = question
+                except Exception as e:
+                    logger.error(f"Query rewrite failed: {e}")
+                    rewritten_query = question
+                timings["rewrite_seconds"] = time.perf_counter() - phase_start
 
             logger.debug(f"Rewritten query: {rewritten_query}")
 
+            # --- Answer Cache ---
+            cache_embedding, knowledge_version = None, None
+            if answer_cache.enabled:
+                phase_start = time.perf_counter()
+                cache_embedding, knowledge_version = await self._get_answer_cache_key(customer_guid, rewritten_query)
+                cached_answer = None
+                if knowledge_version is not None:
+                    cached_answer = answer_cache.lookup(customer_guid, cache_embedding, knowledge_version)
+                timings["cache_lookup_seconds"] = time.perf_counter() - phase_start
+                if cached_answer is not None:
+                    logger.info(f"Serving cached answer for session_id: {session_id}")
+                    self._discard_search(speculative_search)
+                    history_store.append(session_id, AI, cached_answer)
+                    # The caller persists the streamed answer through add_message as for a generated one
+                    yield self._completion_chunk(chat_id, customer_guid, user_id, cached_answer, role="assistant")
+                    timings["first_token_seconds"] = timings["total_seconds"] = time.perf_counter() - turn_start
+                    timings["answer_cache_hit"] = True
+                    yield self._final_chunk(chat_id, customer_guid, user_id, timings, provider, LLMService.model, debug)
+                    return
+
             # --- Document Retrieval ---
-            search_results = weaviate_manager.search_query_advanced(customer_guid, rewritten_query)
-            search_context = json.dumps(search_results)
+            phase_start = time.perf_counter()
+            search_results = await self._retrieve(customer_guid, question, rewritten_query, speculative_search,
+                                                  timings=timings, speculative_timings=speculative_timings)
+            timings["retrieval_seconds"] = time.perf_counter() - phase_start
 
             # --- Final Answer Generation ---
-            final_prompt = messages + [
-                SystemMessage(
-                    content=(
-                        "Use the following search results to answer the user's last question.\n"
-                        "- If the search results are relevant to the user's question, base your answer primarily on them.\n"
-                        "- If they are irrelevant or insufficient, or if the query is general (e.g., a greeting), respond using your own knowledge in only 2 or 3 sentences max and keep it concise. In such cases, clearly state that the documents or knowledge base did not contain the necessary information for you to answer the query\n"
-                        "- If the query is not related to the documents or knowledge base (e.g., small talk), respond appropriately using general knowledge.\n"
-                        "- Do not hallucinate.\n"
-                        "- Maintain a professional tone and avoid internal commentary.\n\n"
-                        "Search Result:\n"
-                        f"{search_context}"
-                    )
-                )
-            ]
+            final_prompt = self._build_final_prompt(messages, search_results, llm, provider)
 
             first_chunk = True
             full_content = ""
+            route_info = {}
+
+            llm_start = time.perf_counter()
+            if router is not None:
+                stream = router.astream(final_prompt, route_info=route_info)
+            else:
+                stream = self.astream(final_prompt, llm=llm, provider=provider)
 
-            async for chunk in LLMService.llm.astream(final_prompt):
+            async for chunk in stream:
                 content_piece = chunk.message.content if hasattr(chunk, "message") else chunk.content
                 if not content_piece:
                     continue
 
+                if first_chunk:
+                    first_token_at = time.perf_counter()
+                    timings["llm_first_token_seconds"] = first_token_at - llm_start
+                    timings["first_token_seconds"] = first_token_at - turn_start
                 full_content += content_piece
 
-                yield {
-                    "chat_id": chat_id,
-                    "customer_guid": customer_guid,
-                    "user_id": user_id,
-                    "object": "chat.completion",
-                    "choices": [
-                        {
-                            "delta": {
-                                "role": "assistant" if first_chunk else None,
-                                "content": content_piece
-                            },
-                            "index": 0,
-                            "finish_reason": None
-                        }
-                    ]
-                }
+                yield self._completion_chunk(chat_id, customer_guid, user_id, content_piece,
+                                             role="assistant" if first_chunk else None)
 
                 first_chunk = False
 
-            history.chat_memory.add_message(AIMessage(content=full_content))
-
-            yield {
-                "chat_id": chat_id,
-                "customer_guid": customer_guid,
-                "user_id": user_id,
-                "object": "chat.completion",
-                "choices": [
-                    {
-                        "delta": {
-                            "role": "assistant",
-                            "content": ""
-                        },
-                        "index": 0,
-                        "finish_reason": "stop"
-                    }
-                ]
+            end = time.perf_counter()
+            if not first_chunk:
+                # The model's own tokenizer, so tokens/sec is comparable across providers of a model
+                served_by = route_info.get("provider", provider)
+                served_llm = router.providers[served_by] if router is not None else llm
+                output_tokens = self._get_token_counter(served_llm, served_by)(full_content)
+                timings["generation_seconds"] = end - first_token_at
+                timings["output_tokens"] = output_tokens
+                if end > first_token_at:
+                    timings["tokens_per_second"] = output_tokens / (end - first_token_at)
+            timings["total_seconds"] = end - turn_start
+
+            history_store.append(session_id, AI, full_content)
+            summarizer.maybe_schedule(session_id, customer_guid, chat_id, self._summary_invoke(llm, provider, router))
+            if knowledge_version is not None:
+                answer_cache.store(customer_guid, rewritten_query, cache_embedding, full_content, knowledge_version)
+
+            if router is not None:
+                provider = route_info.get("provider", provider)
+                model = getattr(router.providers[provider], "model_name", None)
+                timings["hedged"] = bool(route_info.get("hedged"))
+            else:
+                model = LLMService.model
+            yield self._final_chunk(chat_id, customer_guid, user_id, timings, provider, model, debug)
+
+    def _final_chunk(self, chat_id, customer_guid, user_id, timings, provider, model, debug):
+        """Export the turn's timings and build the closing chunk, carrying them when debug is set."""
+        record_turn_metrics(timings, provider, model, customer_guid)
+        chunk = self._completion_chunk(chat_id, customer_guid, user_id, "", finish_reason="stop")
+        if debug:
+            chunk["debug"] = {
+                "provider": provider,
+                "model": model,
+                "timings": {key: round(value, 4) if isinstance(value, float) else value for key, value in timings.items()},
             }
+        return chunk
+
+    def _rewrite(self, rewrite_prompt, llm, provider, router):
+        """Call the dedicated rewrite model if configured, else the turn's answer model or the router."""
+        if LLMService.rewrite_llm is not None:
+            return self.ainvoke(rewrite_prompt, llm=LLMService.rewrite_llm, provider="LLM_REWRITE")
+        if router is not None:
+            return router.ainvoke(rewrite_prompt)
+        return self.ainvoke(rewrite_prompt, llm=llm, provider=provider)
+
+    def _summary_invoke(self, llm, provider, router):
+        """Return the async LLM call used for summarization, on the turn's provider or the router."""
+        if router is not None:
+            return router.ainvoke
+        return lambda messages: self.ainvoke(messages, llm=llm, provider=provider)
+
+    @classmethod
+    def _get_token_counter(cls, llm, provider):
+        if provider not in cls.token_counters:
+            cls.token_counters[provider] = make_token_counter(llm)
+        return cls.token_counters[provider]
+
+    def _build_final_prompt(self, messages, search_results, llm, provider):
+        """
+        Assemble the answer prompt: the system prompt, as much recent history as the token budget
+        allows, the current question and the packed search context.
+        """
+        instructions = (
+            "Use the following search results to answer the user's last question.\n"
+            "- If the search results are relevant to the user's question, base your answer primarily on them.\n"
+            "- If they are irrelevant or insufficient, or if the query is general (e.g., a greeting), respond using your own knowledge in only 2 or 3 sentences max and keep it concise. In such cases, clearly state that the documents or knowledge base did not contain the necessary information for you to answer the query\n"
+            "- If the query is not related to the documents or knowledge base (e.g., small talk), respond appropriately using general knowledge.\n"
+            "- Do not hallucinate.\n"
+            "- Maintain a professional tone and avoid internal commentary.\n\n"
+            "Search Result:\n"
+        )
+        system_message, history_messages, question_message = messages[0], messages[1:-1], messages[-1]
+        packer = ContextPacker(self._get_token_counter(llm, provider))
+        packed_history, search_context = packer.pack(
+            [system_message, question_message, SystemMessage(content=instructions)],
+            history_messages,
+            search_results
+        )
+        return [system_message] + packed_history + [question_message, SystemMessage(content=instructions + search_context)]
+
+    @staticmethod
+    def _completion_chunk(chat_id, customer_guid, user_id, content, role="assistant", finish_reason=None):
+        return {
+            "chat_id": chat_id,
+            "customer_guid": customer_guid,
+            "user_id": user_id,
+            "object": "chat.completion",
+            "choices": [
+                {
+                    "delta": {
+                        "role": role,
+                        "content": content
+                    },
+                    "index": 0,
+                    "finish_reason": finish_reason
+                }
+            ]
+        }
+
+    @staticmethod
+    def _discard_search(search_task):
+        """
+        Drop a search that is no longer needed. The search thread cannot be interrupted,
+        so its outcome is consumed to keep errors from being reported as unhandled.
+        """
+        if search_task is not None:
+            search_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def _get_answer_cache_key(self, customer_guid, query):
+        """
+        Embed the query and read the customer's knowledge version concurrently.
+        Returns (None, None) when either fails so the turn bypasses the cache.
+        """
+        try:
+            embedding, knowledge_version = await asyncio.gather(
+                asyncio.to_thread(weaviate_manager.encode_query, query),
+                asyncio.to_thread(db_manager.get_knowledge_version, customer_guid)
+            )
+            return embedding, knowledge_version
+        except Exception as e:
+            logger.error(f"Answer cache key computation failed: {e}")
+            return None, None
+
+    @staticmethod
+    def _query_differs_materially(question, rewritten_query):
+        """
+        Compare the raw and rewritten queries by token overlap (Jaccard similarity).
+        Queries below LLM_SPECULATIVE_REUSE_THRESHOLD are considered materially different.
+        """
+        question_tokens = set(re.findall(r"\w+", question.lower()))
+        rewritten_tokens = set(re.findall(r"\w+", rewritten_query.lower()))
+        if not question_tokens and not rewritten_tokens:
+            return False
+        overlap = len(question_tokens & rewritten_tokens) / len(question_tokens | rewritten_tokens)
+        return overlap < LLMService.speculative_reuse_threshold
+
+    async def _retrieve(self, customer_guid, question, rewritten_query, speculative_search=None,
+                        timings=None, speculative_timings=None):
+        """
+        Run the hybrid search off the event loop. When a speculative search on the raw
+        question is already running, reuse it unless the rewritten query differs materially.
+        Search phase durations are written to timings.
+        """
+        if speculative_search is not None:
+            if not self._query_differs_materially(question, rewritten_query):
+                try:
+                    results = await speculative_search
+                    logger.debug("Reusing speculative retrieval for the raw question")
+                    if timings is not None and speculative_timings:
+                        timings.update(speculative_timings)
+                        timings["speculative_retrieval_reused"] = True
+                    return results
+                except Exception as e:
+                    logger.error(f"Speculative retrieval failed: {e}")
+            else:
+                logger.debug("Rewritten query differs materially. Discarding speculative retrieval.")
+                self._discard_search(speculative_search)
+        return await asyncio.to_thread(weaviate_manager.search_query_advanced, customer_guid, rewritten_query,
+                                       timings=timings, include_chunks=True)
 
     def get_conversation_history(self, user_id, customer_guid, chat_id):
         session_id = f"{user_id}:{customer_guid}:{chat_id}"
-        return LLMService.histories.get(session_id)
-    
+        return history_store.get(session_id)
+
+    def forget_chat(self, customer_guid, chat_id):
+        """Drop the in-memory history of a deleted chat for all users."""
+        history_store.remove_chat(customer_guid, chat_id)
+
     def clear_histories(self):
         """
         Clear all conversation histories.
         """
-        LLMService.histories.clear()
+        history_store.clear()
         logger.info("All conversation histories have been cleared.")
 
-    def changing_llm(self, provider, model_name):
+    @staticmethod
+    def _release_llm(llm):
+        """Release the pooled HTTP clients held by an LLM that is no longer in use."""
+        base_url = getattr(llm, "openai_api_base", None)
+        if base_url:
+            http_client_pool.release(base_url)
+
+    async def changing_llm(self, provider, model_name):
         """
         Change the LLM provider and model if they differ from the current ones.
         Initialize the LLM and handle errors if the provider or model is unsupported.
+        The switch is immediate when the health monitor already knows the endpoint is healthy;
+        otherwise the endpoint is probed once and an unreachable one is refused.
         Raise exceptions for API use.
         """
         if LLMService.LLMProvider == provider and LLMService.model == model_name:
@@ -416,7 +747,22 @@ class LLMService(metaclass=Singleton):
         # Attempt to initialize the LLM with the new provider and model
         try:
             result = self._initialize_llm(provider, model_name)
+            previous_health = health_monitor.providers.get(provider)
+            monitored = health_monitor.register(provider, result)  # Local models have no endpoint to probe
+            if monitored and not health_monitor.is_healthy(provider) and not await health_monitor.probe(provider):
+                self._release_llm(result)
+                error = health_monitor.providers[provider].last_error
+                # The switch is refused, so stop probing the rejected endpoint
+                health_monitor.unregister(provider, previous_health)
+                raise RuntimeError(f"LLM validation failed for model '{model_name}': {error}")
+            previous_llm = LLMService.llm
+            previous_provider = LLMService.LLMProvider
             LLMService.llm = result
+            LLMService.token_counters.pop(provider, None)
+            self._release_llm(previous_llm)
+            if previous_provider != provider and not self._watched_provider(previous_provider):
+                # The previous answer model is no longer used, so stop probing its endpoint
+                health_monitor.unregister(previous_provider)
             LLMService.LLMProvider = provider
             LLMService.model = model_name
             logger.info(f"LLM provider and model updated to: {LLMService.LLMProvider}, {LLMService.model}")
@@ -449,12 +795,50 @@ async def get_llm_response_mode():
     logger.debug("Entering get_llm_response_mode()")
     try:
         mode = LLMService.get_llm_response()
-        return {"llm_response_mode": mode, "llmprovider": LLMService.get_llm_provider(), "model": LLMService.get_model()}
+        response = {"llm_response_mode": mode, "llmprovider": LLMService.get_llm_provider(), "model": LLMService.get_model()}
+        if LLMService.rewrite_llm is not None:
+            response["rewrite"] = {"llmprovider": LLMService.rewrite_provider,
+                                   "model": getattr(LLMService.rewrite_llm, "model_name", LLMService.rewrite_model),
+                                   "timeout_seconds": LLMService.rewrite_timeout_seconds}
+        if LLMService.router is not None:
+            response["router"] = {
+                "providers": LLMService.router.snapshot(),
+                "ranking": LLMService.router.ranked_providers(),
+                "hedge_delay_seconds": LLMService.router.hedge_delay_seconds,
+            }
+        return response
     except Exception as e:
         logger.error(f"Unexpected error in get_llm_response_mode(): {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
     
 
+@app.get("/provider_health", tags=["LLM Management"])
+async def get_provider_health():
+    """
+    Get the availability and probe latency of the monitored LLM provider endpoints.
+    """
+    logger.debug("Entering get_provider_health()")
+    try:
+        return {"interval_seconds": health_monitor.interval_seconds, "providers": health_monitor.snapshot()}
+    except Exception as e:
+        logger.error(f"Unexpected error in get_provider_health(): {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@app.get("/admission_status", tags=["LLM Management"])
+async def get_admission_status():
+    """
+    Get the chat admission queue state: in-flight turns, queue depth overall and per customer,
+    and the current queue-time estimate.
+    """
+    logger.debug("Entering get_admission_status()")
+    try:
+        return AdmissionController().status()
+    except Exception as e:
+        logger.error(f"Unexpected error in get_admission_status(): {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
 @app.post("/clear_histories", tags=["LLM Management"])
 async def clear_histories():
     """
@@ -482,7 +866,7 @@ async def use_llm_response(request: LLMModeRequest):
             llmprovider = request.llmprovider if request.llmprovider else "OLLAMA"  
             model = request.model if request.model else os.getenv("OLLAMA_MODEL")
             logger.debug("Changing LLM provider and model to: %s, %s", llmprovider, model)
-            llm_service.changing_llm(llmprovider, model)
+            await llm_service.changing_llm(llmprovider, model)
             LLMService.set_llm_response("LLM")
             return {"message": "LLM response mode enabled", "llmprovider": LLMService.get_llm_provider(), "model": LLMService.get_model()}
         else:
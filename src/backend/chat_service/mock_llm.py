@@ -0,0 +1,139 @@
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+FILLER_TEXT = (
+    "This answer was generated by the mock provider for load and latency testing. "
+    "It does not depend on the retrieved context and is repeated until the configured length is reached. "
+)
+
+
+class MockLLMError(RuntimeError):
+    """Injected failure of the mock provider."""
+
+
+class MockChatModel(BaseChatModel):
+    """
+    Local chat model that needs no network, for benchmarking the chat and ticket pipelines.
+    It answers after `ttft_seconds`, then streams word tokens every `inter_token_seconds`, and fails
+    with probability `error_rate` using a random generator seeded with `seed`, so a run is
+    reproducible. Answers echo the question padded to `response_tokens` tokens unless
+    `response_text` is set; query rewrite, summarization and ticket extraction prompts get
+    well-formed answers (the ticket prompt receives a JSON object).
+    """
+
+    model_name: str = "mock"
+    ttft_seconds: float = 0.2
+    inter_token_seconds: float = 0.02
+    error_rate: float = 0.0
+    seed: int = 42
+    response_text: Optional[str] = None
+    response_tokens: int = 64
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name}
+
+    def get_num_tokens(self, text: str) -> int:
+        # Word tokens, matching how the answers are streamed; avoids downloading a tokenizer
+        return len(self._tokenize(text))
+
+    @staticmethod
+    def _tokenize(text):
+        return re.findall(r"\S+\s*", text)
+
+    @staticmethod
+    def _last_content(messages, message_type):
+        for message in reversed(messages):
+            if isinstance(message, message_type):
+                return message.content
+        return ""
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        system_text = " ".join(m.content for m in messages if isinstance(m, SystemMessage))
+        question = self._last_content(messages, HumanMessage)
+
+        if "support ticket" in system_text and "JSON" in system_text:
+            transcript_lines = [line for line in question.splitlines()[1:] if line.strip()]
+            first_line = transcript_lines[0].split(":", 1)[-1].strip() if transcript_lines else "Conversation"
+            return json.dumps({
+                "title": f"Support request: {first_line[:60]}",
+                "description": f"Ticket created from a conversation of {len(transcript_lines)} messages.",
+                "priority": "Medium",
+            })
+        if "rewrite the last user question" in system_text:
+            return question
+        if "running summary" in system_text:
+            return f"The customer and the agent discussed: {question[-200:]}"
+
+        if self.response_text:
+            return self.response_text
+        answer = f"Mock answer to: {question.strip()} "
+        while len(self._tokenize(answer)) < self.response_tokens:
+            answer += FILLER_TEXT
+        return "".join(self._tokenize(answer)[:self.response_tokens]).strip()
+
+    def _maybe_fail(self):
+        with self._rng_lock:
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            logger.debug("Mock LLM injecting a failure")
+            raise MockLLMError("Mock LLM injected failure")
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._maybe_fail()
+        text = self._answer(messages)
+        time.sleep(self.ttft_seconds + self.inter_token_seconds * max(len(self._tokenize(text)) - 1, 0))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._maybe_fail()
+        text = self._answer(messages)
+        await asyncio.sleep(self.ttft_seconds + self.inter_token_seconds * max(len(self._tokenize(text)) - 1, 0))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self._maybe_fail()
+        time.sleep(self.ttft_seconds)
+        for index, token in enumerate(self._tokenize(self._answer(messages))):
+            if index:
+                time.sleep(self.inter_token_seconds)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        self._maybe_fail()
+        await asyncio.sleep(self.ttft_seconds)
+        for index, token in enumerate(self._tokenize(self._answer(messages))):
+            if index:
+                await asyncio.sleep(self.inter_token_seconds)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
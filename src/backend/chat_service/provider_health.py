@@ -0,0 +1,177 @@
+import os
+import time
+import asyncio
+
+from src.backend.lib.singleton_class import Singleton
+from src.backend.lib.logging_config import get_primitivechat_logger
+from src.backend.chat_service.http_client_pool import LLMHttpClientPool
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+http_client_pool = LLMHttpClientPool()
+
+
+class ProviderHealth:
+    """Availability and probe latency of one provider endpoint."""
+
+    def __init__(self, base_url, api_key):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.healthy = None  # None until the first probe finished
+        self.last_latency_seconds = None
+        self.avg_latency_seconds = None
+        self.consecutive_failures = 0
+        self.last_checked = None
+        self.last_error = None
+
+    def to_dict(self):
+        return {
+            "base_url": self.base_url,
+            "healthy": self.healthy,
+            "last_latency_seconds": self.last_latency_seconds,
+            "avg_latency_seconds": self.avg_latency_seconds,
+            "consecutive_failures": self.consecutive_failures,
+            "seconds_since_check": None if self.last_checked is None else round(time.monotonic() - self.last_checked, 1),
+            "last_error": self.last_error,
+        }
+
+
+class ProviderHealthMonitor(metaclass=Singleton):
+    """
+    Probe registered LLM provider endpoints in the background.
+    Every LLM_HEALTH_CHECK_INTERVAL_SECONDS each endpoint gets a cheap GET <base_url>/models through
+    the pooled async client, with LLM_HEALTH_CHECK_TIMEOUT_SECONDS as deadline. Results are kept per
+    provider and passed to listeners as (provider, healthy, changed).
+    """
+
+    def __init__(self):
+        self.interval_seconds = float(os.getenv("LLM_HEALTH_CHECK_INTERVAL_SECONDS", 30))
+        self.timeout_seconds = float(os.getenv("LLM_HEALTH_CHECK_TIMEOUT_SECONDS", 5))
+        self.providers = {}  # provider -> ProviderHealth
+        self.listeners = []
+        self._task = None
+        logger.info(f"ProviderHealthMonitor initialized (interval={self.interval_seconds}s, timeout={self.timeout_seconds}s)")
+
+    @staticmethod
+    def _endpoint(llm):
+        base_url = getattr(llm, "openai_api_base", None)
+        api_key = getattr(llm, "openai_api_key", None)
+        if api_key is not None and hasattr(api_key, "get_secret_value"):
+            api_key = api_key.get_secret_value()
+        return base_url, api_key
+
+    def register(self, provider, llm):
+        """
+        Watch the endpoint of an initialized LLM. Holds its own reference on the pooled clients.
+        Returns False for models without an HTTP endpoint, which are not monitored.
+        """
+        base_url, api_key = self._endpoint(llm)
+        if not base_url:
+            return False
+        current = self.providers.get(provider)
+        if current is not None and current.base_url == base_url and current.api_key == api_key:
+            return True
+        http_client_pool.acquire(base_url)
+        self.providers[provider] = ProviderHealth(base_url, api_key)
+        if current is not None:
+            http_client_pool.release(current.base_url)
+        logger.info(f"Health monitoring registered for provider {provider} at {base_url}")
+        return True
+
+    def unregister(self, provider, previous=None):
+        """
+        Stop watching the endpoint registered for a provider. With previous (the ProviderHealth
+        that was registered before), that registration is put back instead.
+        """
+        current = self.providers.get(provider)
+        if current is previous:
+            return
+        if previous is not None:
+            http_client_pool.acquire(previous.base_url)
+            self.providers[provider] = previous
+        else:
+            del self.providers[provider]
+        if current is not None:
+            http_client_pool.release(current.base_url)
+        logger.info(f"Health monitoring unregistered for provider {provider}")
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def is_healthy(self, provider):
+        health = self.providers.get(provider)
+        return bool(health and health.healthy)
+
+    async def probe(self, provider):
+        """Probe one provider now and return whether it is healthy."""
+        health = self.providers.get(provider)
+        if health is None:
+            return False
+        _, async_client = http_client_pool.acquire(health.base_url)
+        start = time.monotonic()
+        try:
+            response = await async_client.get(
+                health.base_url.rstrip("/") + "/models",
+                headers={"Authorization": f"Bearer {health.api_key}"} if health.api_key else None,
+                timeout=self.timeout_seconds,
+            )
+            response.raise_for_status()
+            healthy, error = True, None
+        except Exception as e:
+            healthy, error = False, str(e) or type(e).__name__
+        finally:
+            http_client_pool.release(health.base_url)
+
+        latency = time.monotonic() - start
+        changed = health.healthy != healthy
+        health.healthy = healthy
+        health.last_checked = time.monotonic()
+        health.last_error = error
+        if healthy:
+            health.consecutive_failures = 0
+            health.last_latency_seconds = round(latency, 4)
+            previous = health.avg_latency_seconds
+            health.avg_latency_seconds = round(latency if previous is None else previous + 0.2 * (latency - previous), 4)
+        else:
+            health.consecutive_failures += 1
+
+        if changed:
+            log = logger.info if healthy else logger.warning
+            log(f"Provider {provider} is {'healthy' if healthy else 'unhealthy'} ({error or f'{latency:.3f}s'})")
+        for listener in self.listeners:
+            try:
+                listener(provider, healthy, changed)
+            except Exception as e:
+                logger.error(f"Health listener failed for provider {provider}: {e}")
+        return healthy
+
+    async def probe_all(self):
+        if self.providers:
+            await asyncio.gather(*(self.probe(provider) for provider in list(self.providers)))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Provider health check round failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start the background probe loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("Provider health monitor started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self):
+        return {provider: health.to_dict() for provider, health in self.providers.items()}
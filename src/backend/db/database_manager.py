@@ -7,7 +7,7 @@ from http import HTTPStatus
 from datetime import datetime
 
 from fastapi import HTTPException
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError, DatabaseError
 from sqlalchemy.orm import sessionmaker
 from src.backend.lib.singleton_class import Singleton
@@ -22,6 +22,22 @@ class SenderType(Enum):
     SYSTEM = "system"
 
 
+# Running conversation summaries; summarized_count is the number of leading chat messages covered
+CREATE_CHAT_SUMMARIES_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS chat_summaries (
+    chat_id VARCHAR(255) PRIMARY KEY,
+    summary MEDIUMTEXT NOT NULL,
+    summarized_count INT NOT NULL,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+);
+"""
+
+
+def is_missing_table(error):
+    """Whether a SQLAlchemyError is MySQL's "table doesn't exist" (ER_NO_SUCH_TABLE)."""
+    return getattr(getattr(error, "orig", None), "errno", None) == 1146
+
+
 class DatabaseManager(metaclass=Singleton):
     _session_factory = None
 
@@ -76,6 +92,16 @@ class DatabaseManager(metaclass=Singleton):
                         delete_timestamp TIMESTAMP(6) NULL  -- Timestamp when the customer GUID was deleted
                     )
                 '''))
+
+            # Knowledge version per customer, bumped whenever the vectorized files change
+            session.execute(text('''
+                    CREATE TABLE IF NOT EXISTS customer_knowledge_version (
+                        customer_guid VARCHAR(255) PRIMARY KEY,
+                        version BIGINT NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+                    )
+                '''))
+
             session.commit()
             logger.info("Database and table initialized successfully.")
 
@@ -277,6 +303,9 @@ class DatabaseManager(metaclass=Singleton):
             """
             session.execute(text(create_ticket_comments_table_query))
 
+            # Creating chat_summaries table if not exists
+            session.execute(text(CREATE_CHAT_SUMMARIES_TABLE_QUERY))
+
             session.commit()
 
             logger.info(f"Customer added with GUID: {customer_guid}")
@@ -380,6 +409,100 @@ class DatabaseManager(metaclass=Singleton):
             logger.debug("Exiting get_paginated_chat_messages method")
             session.close()
 
+    def get_last_chat_messages(self, customer_guid, chat_id, limit=10):
+        """
+        Return the last `limit` messages of a chat, oldest first.
+        Walks the chat_id index backwards by primary key, so only `limit` rows are read.
+        """
+        logger.debug("Entering get_last_chat_messages method")
+        customer_db_name = self.get_customer_db(customer_guid)
+        session = DatabaseManager._session_factory()
+        try:
+            session.execute(text(f"USE `{customer_db_name}`"))
+            select_messages_query = """
+            SELECT message, sender_type FROM chat_messages
+            WHERE chat_id = :chat_id
+            ORDER BY id DESC
+            LIMIT :limit
+            """
+            result = session.execute(text(select_messages_query), {'chat_id': chat_id, 'limit': limit})
+            messages_list = [{'message': msg.message, 'sender_type': msg.sender_type} for msg in result.fetchall()]
+            messages_list.reverse()
+
+            logger.debug(f"Retrieved last {len(messages_list)} messages for chat ID: {chat_id}")
+            return messages_list
+
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving last chat messages: {e}")
+            return []
+        finally:
+            logger.debug("Exiting get_last_chat_messages method")
+            session.close()
+
+    def count_chat_messages(self, customer_guid, chat_id):
+        """Return the number of messages in a chat, or None on error."""
+        customer_db_name = self.get_customer_db(customer_guid)
+        session = DatabaseManager._session_factory()
+        try:
+            session.execute(text(f"USE `{customer_db_name}`"))
+            result = session.execute(text("SELECT COUNT(*) FROM chat_messages WHERE chat_id = :chat_id"),
+                                     {'chat_id': chat_id}).scalar()
+            return result or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Error counting chat messages for chat ID {chat_id}: {e}")
+            return None
+        finally:
+            session.close()
+
+    def get_chat_summary(self, customer_guid, chat_id):
+        """Return {'summary', 'summarized_count'} of a chat, or None if it has no summary."""
+        customer_db_name = self.get_customer_db(customer_guid)
+        session = DatabaseManager._session_factory()
+        try:
+            session.execute(text(f"USE `{customer_db_name}`"))
+            row = session.execute(text("SELECT summary, summarized_count FROM chat_summaries WHERE chat_id = :chat_id"),
+                                  {'chat_id': chat_id}).fetchone()
+            if row is None:
+                return None
+            return {'summary': row.summary, 'summarized_count': row.summarized_count}
+        except SQLAlchemyError as e:
+            if is_missing_table(e):
+                return None  # No summary stored for this customer yet
+            logger.error(f"Error retrieving summary for chat ID {chat_id}: {e}")
+            return None
+        finally:
+            session.close()
+
+    def upsert_chat_summary(self, customer_guid, chat_id, summary, summarized_count):
+        """Store the running summary of a chat covering its first summarized_count messages."""
+        customer_db_name = self.get_customer_db(customer_guid)
+        session = DatabaseManager._session_factory()
+        try:
+            session.execute(text(f"USE `{customer_db_name}`"))
+            upsert_query = """
+            INSERT INTO chat_summaries (chat_id, summary, summarized_count)
+            VALUES (:chat_id, :summary, :summarized_count)
+            ON DUPLICATE KEY UPDATE summary = VALUES(summary), summarized_count = VALUES(summarized_count)
+            """
+            params = {'chat_id': chat_id, 'summary': summary, 'summarized_count': summarized_count}
+            try:
+                session.execute(text(upsert_query), params)
+            except SQLAlchemyError as e:
+                if not is_missing_table(e):
+                    raise
+                # Customers created before chat summaries existed get the table with their first summary
+                session.execute(text(CREATE_CHAT_SUMMARIES_TABLE_QUERY))
+                session.execute(text(upsert_query), params)
+            session.commit()
+            logger.debug(f"Stored summary for chat ID {chat_id} covering {summarized_count} messages")
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error storing summary for chat ID {chat_id}: {e}")
+            session.rollback()
+            return False
+        finally:
+            session.close()
+
     def get_all_chat_ids(self, customer_guid, user_id, page=1, page_size=10):
         session = DatabaseManager._session_factory()
         customer_db_name = self.get_customer_db(customer_guid)
@@ -428,6 +551,11 @@ class DatabaseManager(metaclass=Singleton):
             WHERE chat_id = :chat_id
             """
             session.execute(text(delete_messages_query), {'chat_id': chat_id})
+            try:
+                session.execute(text("DELETE FROM chat_summaries WHERE chat_id = :chat_id"), {'chat_id': chat_id})
+            except SQLAlchemyError as e:
+                if not is_missing_table(e):
+                    raise
             session.commit()
 
             logger.info(f"Deleted all messages for chat ID: {chat_id}")
@@ -1819,6 +1947,34 @@ class DatabaseManager(metaclass=Singleton):
         finally:
             session.close()
 
+    def get_file_embedding_statuses_from_file_ids(self, customer_guid: str, file_ids: list):
+        """Fetch filename and status for many file_ids with a single IN (...) query."""
+        if not file_ids:
+            return []
+        session = self._session_factory()
+        try:
+            customer_db = self.get_customer_db(customer_guid)
+            query = text(f"""
+                    SELECT file_id, filename, status, error_retry
+                    FROM `{customer_db}`.uploadedfile_status
+                    WHERE customer_guid = :customer_guid AND file_id IN :file_ids
+                """).bindparams(bindparam("file_ids", expanding=True))
+            result = session.execute(query, {"customer_guid": customer_guid, "file_ids": list(file_ids)}).fetchall()
+            return [
+                {
+                    "file_id": row.file_id,
+                    "filename": row.filename,
+                    "status": row.status,
+                    "error_retry": row.error_retry
+                }
+                for row in result
+            ]
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching bulk file embedding status: {e}")
+            return None
+        finally:
+            session.close()
+
     def get_paginated_files(self, customer_guid: str, page: int = 1, page_size: int = 10):
 
         logger.debug("Entering get_paginated_files method")
@@ -2094,6 +2250,41 @@ class DatabaseManager(metaclass=Singleton):
         finally:
             session.close()
             
+    def bump_knowledge_version(self, customer_guid: str):
+        """Increment the customer's knowledge version after a file is vectorized or deleted."""
+        session = self._session_factory()
+        try:
+            query = """
+                INSERT INTO common_db.customer_knowledge_version (customer_guid, version)
+                VALUES (:customer_guid, 1)
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """
+            session.execute(text(query), {"customer_guid": customer_guid})
+            session.commit()
+            logger.debug(f"Knowledge version bumped for customer_guid: {customer_guid}")
+        except SQLAlchemyError as e:
+            logger.error(f"Error bumping knowledge version for {customer_guid}: {e}")
+            session.rollback()
+        finally:
+            session.close()
+
+    def get_knowledge_version(self, customer_guid: str):
+        """Return the customer's knowledge version, 0 if no file was ever vectorized or deleted."""
+        session = self._session_factory()
+        try:
+            query = """
+                SELECT version
+                FROM common_db.customer_knowledge_version
+                WHERE customer_guid = :customer_guid
+            """
+            result = session.execute(text(query), {"customer_guid": customer_guid}).scalar()
+            return result or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching knowledge version for {customer_guid}: {e}")
+            return None
+        finally:
+            session.close()
+
     def get_files_with_deletion_status(self, customer_guid: str, page: int = 1, page_size: int = 10):
         session = self._session_factory()
         try:
@@ -0,0 +1,84 @@
+import os
+import time
+import socket
+import threading
+
+import numpy as np
+
+from src.backend.embedding.embedding_service.protocol import encode_frame, read_frame_sync
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+
+class EmbeddingServerError(RuntimeError):
+    """The embedding server could not encode a request."""
+
+
+class EmbeddingClient:
+    """
+    Drop-in replacement for SentenceTransformer.encode backed by the node-local embedding server.
+    Each thread keeps its own connection to EMBEDDING_SERVER_SOCKET; the server is waited for up
+    to EMBEDDING_SERVER_CONNECT_TIMEOUT_SECONDS, e.g. while it is still loading its models.
+    """
+
+    def __init__(self, model_name, socket_path=None):
+        self.model_name = model_name
+        self.socket_path = socket_path or os.getenv("EMBEDDING_SERVER_SOCKET")
+        self.connect_timeout_seconds = float(os.getenv("EMBEDDING_SERVER_CONNECT_TIMEOUT_SECONDS", 120))
+        self._local = threading.local()
+        self.dimensions = None  # learned from the first response
+        logger.info(f"Using embedding server at {self.socket_path} for model {model_name}")
+
+    def _connect(self):
+        deadline = time.monotonic() + self.connect_timeout_seconds
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+    def _request(self, texts, normalize):
+        frame = encode_frame({"model": self.model_name, "texts": texts, "normalize": normalize})
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None)
+            if sock is None:
+                sock = self._local.sock = self._connect()
+            try:
+                sock.sendall(frame)
+                return read_frame_sync(sock)
+            except (ConnectionError, OSError):
+                # The server restarted; reconnect once
+                sock.close()
+                self._local.sock = None
+                if attempt:
+                    raise
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=None, convert_to_numpy=True,
+               convert_to_tensor=False, normalize_embeddings=False, **kwargs):
+        """
+        Encode a string or a list of strings; returns a float32 array shaped like SentenceTransformer.encode.
+        normalize_embeddings is applied by the server; batch_size and show_progress_bar are accepted
+        and have no effect, since the server batches requests itself. Tensor output and other
+        keyword arguments of SentenceTransformer.encode raise TypeError.
+        """
+        if kwargs:
+            raise TypeError(f"EmbeddingClient.encode() does not support: {', '.join(sorted(kwargs))}")
+        if convert_to_tensor or not convert_to_numpy:
+            raise TypeError("EmbeddingClient.encode() only returns numpy arrays")
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts and self.dimensions is not None:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+        header, payload = self._request(texts, bool(normalize_embeddings))
+        if header.get("error"):
+            raise EmbeddingServerError(header["error"])
+        vectors = np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
+        self.dimensions = vectors.shape[1]
+        return vectors[0] if single else vectors
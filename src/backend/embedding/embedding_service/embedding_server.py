@@ -0,0 +1,183 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.backend.embedding.embedding_service.protocol import encode_frame, read_frame
+from src.backend.embedding.lib.model_loader import EmbeddingModelRegistry
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+
+class _Request:
+    def __init__(self, texts, future):
+        self.texts = texts
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class ModelBatcher:
+    """
+    Coalesce concurrent encode requests for one model. The first request of a batch waits at
+    most EMBEDDING_BATCH_WINDOW_MS for others to join, up to EMBEDDING_MAX_BATCH_TEXTS texts,
+    then the whole batch is encoded in one forward pass on the model's worker thread. A request
+    with nothing queued behind it and no other request in flight is encoded without waiting.
+    """
+
+    def __init__(self, name, model, window_seconds, max_batch_texts):
+        self.name = name
+        self.model = model
+        self.window_seconds = window_seconds
+        self.max_batch_texts = max_batch_texts
+        self.queue = asyncio.Queue()
+        # One thread per model: forward passes of a model never run concurrently
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"embed-{name}")
+        self.dimensions = model.get_sentence_embedding_dimension()
+        self.in_flight = 0  # requests received and not yet answered
+        self.batches = 0
+        self.texts = 0
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def encode(self, texts):
+        if not texts:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight += 1
+        try:
+            await self.queue.put(_Request(texts, future))
+            return await future
+        finally:
+            self.in_flight -= 1
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        size = len(batch[0].texts)
+        if self.queue.empty() and self.in_flight <= 1:
+            # A lone caller (e.g. the chunker encoding sentence by sentence) has nobody to batch with
+            return batch
+        deadline = time.perf_counter() + self.window_seconds
+        while size < self.max_batch_texts:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self.queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = await loop.run_in_executor(
+                    self.executor, lambda: np.asarray(self.model.encode(texts), dtype=np.float32))
+            except Exception as e:
+                logger.error(f"Encoding a batch of {len(texts)} texts with {self.name} failed: {e}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_result(vectors[offset:offset + len(request.texts)])
+                offset += len(request.texts)
+            logger.debug(f"Encoded {len(texts)} texts from {len(batch)} requests with {self.name}")
+
+
+class EmbeddingServer:
+    """
+    Node-local embedding service on a UNIX socket. Each model is loaded once and shared by every
+    process on the node (chat service and file vectorizer), and concurrent requests are encoded
+    together in micro-batches.
+    """
+
+    def __init__(self, socket_path, window_seconds, max_batch_texts, preload):
+        self.socket_path = socket_path
+        self.window_seconds = window_seconds
+        self.max_batch_texts = max_batch_texts
+        self.preload = preload
+        self.batchers = {}  # model name -> ModelBatcher
+        self._loading = {}  # model name -> asyncio.Task loading it
+
+    async def _batcher(self, name):
+        if name in self.batchers:
+            return self.batchers[name]
+        if name not in self._loading:
+            logger.info(f"Loading embedding model {name}")
+            self._loading[name] = asyncio.get_running_loop().create_task(asyncio.to_thread(EmbeddingModelRegistry().get, name, None, True))
+        try:
+            model = await self._loading[name]
+        finally:
+            self._loading.pop(name, None)
+        if name not in self.batchers:
+            self.batchers[name] = ModelBatcher(name, model, self.window_seconds, self.max_batch_texts)
+            logger.info(f"Embedding model {name} ready")
+        return self.batchers[name]
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    header, _ = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    return
+                try:
+                    batcher = await self._batcher(header["model"])
+                    vectors = await batcher.encode(header["texts"])
+                    if header.get("normalize"):
+                        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                        vectors = vectors / np.where(norms == 0, 1.0, norms)
+                    response = encode_frame({"shape": list(vectors.shape), "dtype": "float32"}, vectors.tobytes())
+                except Exception as e:
+                    response = encode_frame({"error": str(e) or type(e).__name__})
+                writer.write(response)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        for name in self.preload:
+            await self._batcher(name)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"Embedding server listening on {self.socket_path} "
+                    f"(window={self.window_seconds * 1000:.1f}ms, max_batch_texts={self.max_batch_texts})")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    socket_path = os.getenv("EMBEDDING_SERVER_SOCKET")
+    if not socket_path:
+        logger.info("EMBEDDING_SERVER_SOCKET is not set, embedding server disabled")
+        return
+    preload = [name.strip() for name in os.getenv("EMBEDDING_SERVER_PRELOAD", os.getenv("MODEL_DIR", "")).split(",")
+               if name.strip()]
+    server = EmbeddingServer(
+        socket_path,
+        window_seconds=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", 3)) / 1000,
+        max_batch_texts=int(os.getenv("EMBEDDING_MAX_BATCH_TEXTS", 64)),
+        preload=preload,
+    )
+    asyncio.run(server.serve())
+
+
+if __name__ == "__main__":
+    main()
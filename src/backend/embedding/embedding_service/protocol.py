@@ -0,0 +1,36 @@
+import json
+import struct
+
+# A frame is a 4-byte big-endian JSON header length, the JSON header, then header["bytes"] raw bytes.
+# Requests:  {"model": str, "texts": [str], "normalize": bool, "bytes": 0}
+# Responses: {"shape": [rows, dims], "dtype": "float32", "bytes": n} or {"error": str, "bytes": 0}
+HEADER_LENGTH = struct.Struct(">I")
+
+
+def encode_frame(header, payload=b""):
+    header = dict(header, bytes=len(payload))
+    header_bytes = json.dumps(header).encode("utf-8")
+    return HEADER_LENGTH.pack(len(header_bytes)) + header_bytes + payload
+
+
+def read_exactly_sync(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame_sync(sock):
+    (header_length,) = HEADER_LENGTH.unpack(read_exactly_sync(sock, HEADER_LENGTH.size))
+    header = json.loads(read_exactly_sync(sock, header_length))
+    return header, read_exactly_sync(sock, header["bytes"]) if header["bytes"] else b""
+
+
+async def read_frame(reader):
+    (header_length,) = HEADER_LENGTH.unpack(await reader.readexactly(HEADER_LENGTH.size))
+    header = json.loads(await reader.readexactly(header_length))
+    return header, await reader.readexactly(header["bytes"]) if header["bytes"] else b""
@@ -0,0 +1,165 @@
+import os
+import re
+import time
+import threading
+
+from sentence_transformers import SentenceTransformer
+
+from src.backend.lib.singleton_class import Singleton
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+TORCH = "torch"
+ONNX = "onnx"
+ONNX_INT8 = "onnx-int8"
+BACKENDS = (TORCH, ONNX, ONNX_INT8)
+
+
+def _intra_op_threads():
+    threads = int(os.getenv("EMBEDDING_INTRA_OP_THREADS", 0))
+    return threads if threads > 0 else None
+
+
+def _session_options(threads):
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+def _quantized_model_dir(model_name, quantization_config):
+    """
+    Export the model to ONNX and quantize it dynamically to int8, once. The result is kept under
+    EMBEDDING_ONNX_CACHE_DIR and reused by later loads.
+    """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    cache_dir = os.getenv("EMBEDDING_ONNX_CACHE_DIR", "/tmp/primitivechat_onnx")
+    model_dir = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name.strip("/")))
+    file_name = f"onnx/model_qint8_{quantization_config}.onnx"
+    if not os.path.exists(os.path.join(model_dir, file_name)):
+        logger.info(f"Quantizing {model_name} to int8 ({quantization_config}) into {model_dir}")
+        model = SentenceTransformer(model_name, backend=ONNX)
+        model.save_pretrained(model_dir)
+        export_dynamic_quantized_onnx_model(model, quantization_config, model_dir)
+    return model_dir, file_name
+
+
+def load_embedding_model(model_name, backend=None):
+    """
+    Load a SentenceTransformer on the backend selected by EMBEDDING_BACKEND:
+    "torch" (default), "onnx" (ONNX Runtime) or "onnx-int8" (ONNX Runtime with dynamic int8
+    quantization, EMBEDDING_QUANTIZATION_CONFIG = avx512_vnni, avx512, avx2 or arm64).
+    EMBEDDING_INTRA_OP_THREADS sets the intra-op threads of either runtime (0 = runtime default).
+    An ONNX backend that fails to load falls back to torch.
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", TORCH)).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported embedding backend: {backend}")
+    threads = _intra_op_threads()
+
+    if backend != TORCH:
+        try:
+            model_kwargs = {"provider": "CPUExecutionProvider", "session_options": _session_options(threads)}
+            if backend == ONNX_INT8:
+                model_dir, file_name = _quantized_model_dir(
+                    model_name, os.getenv("EMBEDDING_QUANTIZATION_CONFIG", "avx512_vnni"))
+                model = SentenceTransformer(model_dir, backend=ONNX, model_kwargs=dict(model_kwargs, file_name=file_name))
+            else:
+                model = SentenceTransformer(model_name, backend=ONNX, model_kwargs=model_kwargs)
+            logger.info(f"Loaded embedding model {model_name} with backend {backend} (intra_op_threads={threads})")
+            return model
+        except Exception as e:
+            logger.error(f"Loading {model_name} with backend {backend} failed, falling back to torch: {e}")
+
+    if threads:
+        import torch
+
+        torch.set_num_threads(threads)
+    model = SentenceTransformer(model_name)
+    logger.info(f"Loaded embedding model {model_name} with backend torch (intra_op_threads={threads})")
+    return model
+
+
+class EmbeddingModelRegistry(metaclass=Singleton):
+    """
+    Process-wide cache of embedding models keyed by model identity, so every caller asking for the
+    same model shares one instance (and one tokenizer). Names are resolved through
+    EMBEDDING_MODEL_ALIASES ("name=path,...") and normalized: the
+    "sentence-transformers/" hub prefix is dropped and local paths are made absolute. When
+    EMBEDDING_SERVER_SOCKET is set, models are served by the embedding server instead of loaded.
+    """
+
+    def __init__(self):
+        self.aliases = {}
+        for pair in os.getenv("EMBEDDING_MODEL_ALIASES", "").split(","):
+            if "=" in pair:
+                alias, target = pair.split("=", 1)
+                self.aliases[alias.strip()] = target.strip()
+        self.models = {}  # (identity, backend) -> model
+        self._locks = {}  # (identity, backend) -> lock held while loading
+        self._lock = threading.Lock()
+        logger.info(f"EmbeddingModelRegistry initialized (aliases={self.aliases})")
+
+    def identity(self, model_name):
+        """Canonical identity of a model name or path."""
+        name = self.aliases.get(model_name, model_name).strip()
+        if os.path.isdir(name):
+            return os.path.realpath(name)
+        return re.sub(r"^sentence-transformers/", "", name)
+
+    def get(self, model_name, backend=None, local=False):
+        """
+        Return the shared model for a name, loading it on first use. With local=True the model is
+        loaded in this process even if an embedding server is configured (used by the server itself).
+        """
+        identity = self.identity(model_name)
+        socket_path = os.getenv("EMBEDDING_SERVER_SOCKET")
+        if socket_path and not local:
+            backend = "server"
+        else:
+            backend = (backend or os.getenv("EMBEDDING_BACKEND", TORCH)).lower()
+        key = (identity, backend)
+
+        model = self.models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            load_lock = self._locks.setdefault(key, threading.Lock())
+        with load_lock:
+            model = self.models.get(key)
+            if model is None:
+                if backend == "server":
+                    from src.backend.embedding.embedding_service.embedding_client import EmbeddingClient
+
+                    model = EmbeddingClient(identity, socket_path)
+                else:
+                    model = load_embedding_model(identity, backend)
+                self.models[key] = model
+                if identity != model_name:
+                    logger.info(f"Embedding model {model_name} resolved to {identity}")
+        return model
+
+    def warm_up(self, model_names=None):
+        """
+        Load the models and run one encode each, so the first real request does not pay for
+        initialization. Defaults to MODEL_DIR.
+        """
+        if model_names is None:
+            model_names = [os.getenv("MODEL_DIR")]
+        for model_name in filter(None, model_names):
+            start = time.perf_counter()
+            try:
+                self.get(model_name).encode(["warm-up"])
+                logger.info(f"Warmed up embedding model {model_name} in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                logger.error(f"Warm-up of embedding model {model_name} failed: {e}")
+
+    def stats(self):
+        return {"models": [{"identity": identity, "backend": backend} for identity, backend in self.models]}
@@ -1,10 +1,11 @@
+import os
 import json
 import spacy
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import logging
 from src.backend.minio.minio_manager import MinioManager
 from src.backend.embedding.lib.download_and_upload_file import LocalFileDownloadAndUpload
+from src.backend.embedding.lib.model_loader import EmbeddingModelRegistry
 
 from src.backend.lib.singleton_class import Singleton
 
@@ -43,8 +44,10 @@ class ProcessAndUploadBucket(metaclass=Singleton):
             raise Exception(f"Failed to upload file.{e}")
 
 class SemanticChunkProcessor(metaclass=Singleton):
-    def __init__(self, model_name='all-mpnet-base-v2', max_tokens=300, similarity_threshold=0.4):
+    def __init__(self, model_name=None, max_tokens=300, similarity_threshold=0.4):
         try:
+            # Sentence-similarity model for chunk boundaries; the indexer embeds chunks with MODEL_DIR
+            model_name = model_name or os.getenv("CHUNKING_MODEL", "all-mpnet-base-v2")
             self.model = self.load_model(model_name)
             self.max_tokens = max_tokens
             self.similarity_threshold = similarity_threshold
@@ -55,7 +58,7 @@ class SemanticChunkProcessor(metaclass=Singleton):
 
     def load_model(self, model_name):
         try:
-            return SentenceTransformer(model_name)
+            return EmbeddingModelRegistry().get(model_name)
         except Exception as e:
             logger.error(f"Error loading SentenceTransformer model '{model_name}': {e}")
             raise Exception(f"Model loading failed: {e}")
@@ -5,7 +5,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.backend.db.database_manager import DatabaseManager
 from src.backend.embedding.extract_file.extract_file import UploadFileForChunks
 from src.backend.embedding.semantic_chunk.semantic_chunk import ProcessAndUploadBucket
-from src.backend.weaviate.weaviate_manager import WeaviateManager
+from src.backend.weaviate.vector_backend import get_vector_manager
 from src.backend.minio.minio_manager import MinioManager
 from src.backend.lib.singleton_class import Singleton
 
@@ -32,7 +32,7 @@ class FileVectorizer(metaclass=Singleton):
         self.minio=MinioManager()
         self.extracted = UploadFileForChunks()
         self.chunked = ProcessAndUploadBucket()
-        self.vectorizer= WeaviateManager()
+        self.vectorizer= get_vector_manager()
 
         logger.info("FileVectorizer initialized components successfully.")
 
@@ -106,6 +106,8 @@ class FileVectorizer(metaclass=Singleton):
                 try:
                     if self.vectorize_file(customer_guid, filename):
                         db_manager.update_status(customer_guid, filename, "completed", "", error_retry)
+                        # Invalidate cached answers built on the previous knowledge
+                        db_manager.bump_knowledge_version(customer_guid)
                         # Delete extracted and chunked files from MinIO
                         extracted_file = f"{filename}.txt"
                         chunked_file = f"{filename}.chunked.txt"
@@ -162,6 +164,7 @@ class FileVectorizer(metaclass=Singleton):
 
                 # Finalize success
                 db_manager.finalize_deletion(customer_guid, file_id, error=False)
+                db_manager.bump_knowledge_version(customer_guid)
                 logger.info(f"Completed deletion for {file_id}")
 
         except Exception as e:
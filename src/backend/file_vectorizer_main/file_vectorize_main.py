@@ -1,6 +1,8 @@
+import os
 import logging
 import time
 from src.backend.file_vectorizer.file_vectorizer import FileVectorizer
+from src.backend.embedding.lib.model_loader import EmbeddingModelRegistry
 from src.backend.lib.logging_config import get_primitivechat_logger
 
 # Configure logging
@@ -8,6 +10,8 @@ logger = get_primitivechat_logger(__name__)
 
 def main():
     logger.info("Starting file vectorizer process...")
+    # Load the chunker and indexer models once, before the first file is picked up
+    EmbeddingModelRegistry().warm_up([os.getenv("CHUNKING_MODEL", "all-mpnet-base-v2"), os.getenv("MODEL_DIR")])
     vectorizer = FileVectorizer()
     while True:
         try:
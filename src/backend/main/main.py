@@ -1,16 +1,23 @@
 import logging
+import os
 import uuid
+import asyncio
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.openapi.docs import get_swagger_ui_html
+from prometheus_client import make_asgi_app
 
 from src.backend.chat_service.chat_service import app as chat_router
 from src.backend.ticket_service.ticket_service import app as ticket_router
 from src.backend.auth_router.auth_router import app as auth_router
 from src.backend.lib.logging_config import get_primitivechat_logger
 from src.backend.chat_service.llm_service import app as llm_service_router  # Import the LLMService router
+from src.backend.chat_service.http_client_pool import LLMHttpClientPool
+from src.backend.chat_service.provider_health import ProviderHealthMonitor
+from src.backend.embedding.lib.model_loader import EmbeddingModelRegistry
+from src.backend.ticket_service.ticket_job_manager import TicketJobManager
 
 # Create the main FastAPI app
 main_app = FastAPI()
@@ -23,6 +30,9 @@ main_app.include_router(ticket_router)
 main_app.include_router(auth_router)
 main_app.include_router(llm_service_router, prefix="/llm_service")  # Include the LLMService router
 
+# Prometheus metrics (admission queue depth, rejections, ...)
+main_app.mount("/metrics", make_asgi_app())
+
 main_app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -43,6 +53,23 @@ async def add_correlation_id(request: Request, call_next):
     response.headers['X-Correlation-ID'] = correlation_id
     return response
 
+@main_app.on_event("startup")
+async def start_llm_health_monitor():
+    # Probe LLM provider endpoints in the background instead of at initialization
+    ProviderHealthMonitor().start()
+
+@main_app.on_event("startup")
+async def warm_up_embedding_models():
+    # Run a first encode so the first /chat query does not pay for model initialization
+    await asyncio.to_thread(EmbeddingModelRegistry().warm_up, [os.getenv("MODEL_DIR")])
+
+@main_app.on_event("shutdown")
+async def close_llm_http_clients():
+    # Finish or cancel the ticket jobs, stop probing, then close the pooled LLM provider connections cleanly
+    await TicketJobManager().stop()
+    await ProviderHealthMonitor().stop()
+    await LLMHttpClientPool().aclose_all()
+
 # Health check endpoint at the root path to verify the server is up
 @main_app.get("/", tags=["Health Check"])
 async def check_server_status(request: Request):
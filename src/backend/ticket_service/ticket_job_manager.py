@@ -0,0 +1,186 @@
+import os
+import time
+import uuid
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+
+from src.backend.lib.singleton_class import Singleton
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+TERMINAL_STATES = (COMPLETED, FAILED)
+
+
+class TicketJobQueueFull(Exception):
+    """Raised when no more ticket jobs can be queued; carries the suggested Retry-After in seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TicketJob:
+    def __init__(self, customer_guid, chat_id, run):
+        self.job_id = str(uuid.uuid4())
+        self.customer_guid = customer_guid
+        self.chat_id = chat_id
+        self.run = run  # Coroutine factory returning the ticket_id
+        self.status = QUEUED
+        self.ticket_id = None
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = self.created_at
+        self.finished_at = None  # time.monotonic() once terminal, for retention
+        self.changed = asyncio.Event()
+
+    def set_status(self, status, ticket_id=None, error=None):
+        self.status = status
+        self.ticket_id = ticket_id
+        self.error = error
+        self.updated_at = datetime.now(timezone.utc)
+        if status in TERMINAL_STATES:
+            self.finished_at = time.monotonic()
+        # Wake everyone watching, then re-arm for the next change
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "chat_id": self.chat_id,
+            "status": self.status,
+            "ticket_id": self.ticket_id,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class TicketJobManager(metaclass=Singleton):
+    """
+    Run ticket-from-conversation extraction as background jobs on a pool of asyncio workers.
+    Jobs live in memory: TICKET_JOB_WORKERS workers take them from a queue of at most
+    TICKET_JOB_MAX_QUEUE entries, and finished jobs are kept for TICKET_JOB_RETENTION_SECONDS so
+    clients can fetch the result. Submitting a chat that already has a queued or running job
+    returns that job instead of starting a second one. On shutdown, stop() drains the queue for
+    up to TICKET_JOB_DRAIN_SECONDS before cancelling the workers.
+    """
+
+    def __init__(self):
+        self.worker_count = int(os.getenv("TICKET_JOB_WORKERS", 4))
+        self.max_queue = int(os.getenv("TICKET_JOB_MAX_QUEUE", 100))
+        self.retention_seconds = float(os.getenv("TICKET_JOB_RETENTION_SECONDS", 3600))
+        self.drain_seconds = float(os.getenv("TICKET_JOB_DRAIN_SECONDS", 30))
+        self.jobs = {}  # job_id -> TicketJob
+        self.in_flight = {}  # (customer_guid, chat_id) -> job_id
+        self._queue = None
+        self._workers = []
+        self._stopping = False
+        logger.info(f"TicketJobManager initialized (workers={self.worker_count}, max_queue={self.max_queue})")
+
+    def _ensure_workers(self):
+        """Start the worker pool on the running event loop on first use."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.worker_count:
+            self._workers.append(asyncio.get_running_loop().create_task(self._worker(len(self._workers))))
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.retention_seconds]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def submit(self, customer_guid, chat_id, run):
+        """Queue a job, or return the in-flight job of the same chat. Returns (job, coalesced)."""
+        if self._stopping:
+            raise TicketJobQueueFull("The server is shutting down. Please retry shortly.", retry_after=5)
+        self._ensure_workers()
+        self._prune()
+
+        key = (customer_guid, chat_id)
+        existing = self.jobs.get(self.in_flight.get(key))
+        if existing is not None and existing.status not in TERMINAL_STATES:
+            logger.info(f"Coalescing ticket job request for chat_id {chat_id} into job {existing.job_id}")
+            return existing, True
+
+        if self._queue.qsize() >= self.max_queue:
+            raise TicketJobQueueFull("Too many ticket jobs queued. Please retry shortly.", retry_after=5)
+
+        job = TicketJob(customer_guid, chat_id, run)
+        self.jobs[job.job_id] = job
+        self.in_flight[key] = job.job_id
+        self._queue.put_nowait(job)
+        logger.info(f"Queued ticket job {job.job_id} for chat_id {chat_id}")
+        return job, False
+
+    def get(self, job_id, customer_guid):
+        """Return a job of the customer, or None if it does not exist or belongs to another customer."""
+        job = self.jobs.get(job_id)
+        if job is None or job.customer_guid != customer_guid:
+            return None
+        return job
+
+    async def watch(self, job):
+        """Yield the job state now and after every change, until it is finished."""
+        while True:
+            changed = job.changed
+            state = job.to_dict()
+            state["created_at"] = state["created_at"].isoformat()
+            state["updated_at"] = state["updated_at"].isoformat()
+            yield state
+            if job.status in TERMINAL_STATES:
+                return
+            await changed.wait()
+
+    async def stop(self):
+        """
+        Stop taking jobs, let the workers finish the queued ones for up to drain_seconds, then
+        cancel them. Jobs that did not finish are marked failed.
+        """
+        self._stopping = True
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.drain_seconds)
+            except asyncio.TimeoutError:
+                logger.warning(f"Ticket jobs still pending after {self.drain_seconds}s, cancelling them")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self.jobs.values():
+            if job.status not in TERMINAL_STATES:
+                job.set_status(FAILED, error="The server shut down before the job finished.")
+        self.in_flight.clear()
+        logger.info("TicketJobManager stopped")
+
+    async def _worker(self, index):
+        while True:
+            job = await self._queue.get()
+            try:
+                job.set_status(RUNNING)
+                ticket_id = await job.run()
+                job.set_status(COMPLETED, ticket_id=ticket_id)
+                logger.info(f"Ticket job {job.job_id} completed with ticket_id {ticket_id}")
+            except HTTPException as e:
+                job.set_status(FAILED, error=str(e.detail))
+                logger.error(f"Ticket job {job.job_id} failed: {e.detail}")
+            except Exception as e:
+                job.set_status(FAILED, error=f"An unexpected error occurred: {e}")
+                logger.error(f"Ticket job {job.job_id} failed: {e}", exc_info=True)
+            finally:
+                key = (job.customer_guid, job.chat_id)
+                if self.in_flight.get(key) == job.job_id:
+                    del self.in_flight[key]
+                job.run = None
+                self._queue.task_done()
@@ -0,0 +1,108 @@
+import weaviate
+from weaviate.classes.query import Filter, MetadataQuery
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+
+class WeaviateGrpcTransport:
+    """
+    gRPC code path for queries and batch imports (weaviate-client v4 collections API).
+    Results are returned in the GraphQL shape of the v3 client, {"data": {"Get": {class: [...]}}},
+    with `_additional` holding the requested metadata, so callers do not depend on the transport.
+    """
+
+    def __init__(self, host, http_port, grpc_port):
+        self.client = weaviate.connect_to_custom(
+            http_host=host,
+            http_port=int(http_port),
+            http_secure=False,
+            grpc_host=host,
+            grpc_port=int(grpc_port),
+            grpc_secure=False,
+        )
+        logger.info(f"Connected to Weaviate over gRPC at {host}:{grpc_port}")
+
+    def close(self):
+        self.client.close()
+
+    @classmethod
+    def to_filter(cls, where):
+        """Convert a v3 where-filter dict (Equal, ContainsAny, And, Or) to a v4 Filter."""
+        operator = where["operator"]
+        if operator in ("And", "Or"):
+            operands = [cls.to_filter(operand) for operand in where["operands"]]
+            return Filter.all_of(operands) if operator == "And" else Filter.any_of(operands)
+
+        path = where["path"][0]
+        prop = Filter.by_id() if path == "id" else Filter.by_property(path)
+        value = next(value for key, value in where.items() if key.startswith("value"))
+        if operator == "Equal":
+            return prop.equal(value)
+        if operator == "ContainsAny":
+            return prop.contains_any(value)
+        raise ValueError(f"Unsupported where operator for gRPC transport: {operator}")
+
+    @staticmethod
+    def _to_graphql_shape(class_name, objects, additional):
+        rows = []
+        for obj in objects:
+            row = dict(obj.properties)
+            if additional:
+                extra = {}
+                if "id" in additional:
+                    extra["id"] = str(obj.uuid)
+                if "distance" in additional:
+                    extra["distance"] = obj.metadata.distance
+                if "score" in additional:
+                    extra["score"] = obj.metadata.score
+                if "vector" in additional:
+                    vector = obj.vector
+                    extra["vector"] = vector.get("default") if isinstance(vector, dict) else vector
+                row["_additional"] = extra
+            rows.append(row)
+        return {"data": {"Get": {class_name: rows}}}
+
+    def _collection(self, class_name, tenant=None):
+        collection = self.client.collections.get(class_name)
+        return collection.with_tenant(tenant) if tenant else collection
+
+    def hybrid(self, class_name, properties, question, alpha, vector, additional=None, limit=None, tenant=None):
+        additional = additional or []
+        collection = self._collection(class_name, tenant)
+        response = collection.query.hybrid(
+            query=question,
+            alpha=alpha,
+            vector=vector,
+            limit=limit,
+            return_properties=properties,
+            include_vector="vector" in additional,
+            return_metadata=MetadataQuery(distance="distance" in additional, score="score" in additional),
+        )
+        return self._to_graphql_shape(class_name, response.objects, additional)
+
+    def fetch(self, class_name, properties, where, limit=None, additional=None, tenant=None, offset=None, after=None):
+        collection = self._collection(class_name, tenant)
+        response = collection.query.fetch_objects(
+            filters=self.to_filter(where) if where else None,
+            limit=limit,
+            offset=offset,
+            after=after,
+            return_properties=properties,
+            include_vector="vector" in (additional or []),
+        )
+        return self._to_graphql_shape(class_name, response.objects, additional)
+
+    def insert_objects(self, class_name, objects, vectors, batch_size=100, tenant=None, uuids=None):
+        """Import objects with their vectors through a gRPC batch. Raises if any object failed."""
+        collection = self._collection(class_name, tenant)
+        uuids = uuids or [None] * len(objects)
+        with collection.batch.fixed_size(batch_size=batch_size) as batch:
+            for properties, vector, object_id in zip(objects, vectors, uuids):
+                batch.add_object(properties=properties, vector=vector, uuid=object_id)
+        failed = collection.batch.failed_objects
+        if failed:
+            logger.error(f"{len(failed)} objects failed to import into {class_name}: {failed[0].message}")
+            raise RuntimeError(f"{len(failed)} objects failed to import into {class_name}")
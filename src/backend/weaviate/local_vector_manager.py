@@ -0,0 +1,82 @@
+import os
+import threading
+
+from src.backend.weaviate.local_vector_store import LocalCollection
+from src.backend.weaviate.vector_manager_base import VectorManagerBase
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+
+class LocalVectorManager(VectorManagerBase):
+    """
+    In-process replacement for WeaviateManager, for small tenants, local development and
+    benchmarks. Each customer's chunks live in a LocalCollection under LOCAL_VECTOR_DIR and are
+    searched by brute force with the same hybrid alpha as Weaviate. Ingestion, search and result
+    shapes are shared with WeaviateManager through VectorManagerBase, so the weaviate client
+    does not need to be installed.
+    """
+
+    def __init__(self):
+        try:
+            self.directory = os.getenv("LOCAL_VECTOR_DIR", "/tmp/primitivechat_vectors")
+            os.makedirs(self.directory, exist_ok=True)
+            self.transport = "local"
+            self.grpc = None
+            self.multi_tenancy = False
+            self.collections = {}  # class name -> LocalCollection
+            self._collections_lock = threading.Lock()
+            self._init_embedding()
+            logger.info(f"Using the local vector store in {self.directory}")
+        except Exception as e:
+            logger.error(f"Failed to initialize the local vector store: {e}")
+            raise e
+
+    def _collection(self, class_name):
+        with self._collections_lock:
+            if class_name not in self.collections:
+                self.collections[class_name] = LocalCollection(os.path.join(self.directory, class_name))
+            return self.collections[class_name]
+
+    def _hybrid_query(self, class_name, properties, question, alpha, vector, additional=None, limit=None, tenant=None):
+        rows = self._collection(class_name).hybrid(properties, question, vector, alpha, limit, additional)
+        return {"data": {"Get": {class_name: rows}}}
+
+    def _filtered_query(self, class_name, properties, where_filter, limit, tenant=None, additional=None, offset=None):
+        rows = self._collection(class_name).fetch(properties, where_filter, limit, offset, additional)
+        return {"data": {"Get": {class_name: rows}}}
+
+    def _cursor_query(self, class_name, properties, limit, after=None, tenant=None):
+        rows = self._collection(class_name).scan(properties, limit, after, additional=["id"])
+        return {"data": {"Get": {class_name: rows}}}
+
+    def _upsert_objects(self, class_name, tenant, chunks, vectors, batch_size):
+        self._collection(class_name).upsert([object_id for object_id, _ in chunks],
+                                            [properties for _, properties in chunks], vectors)
+
+    def _delete_object_ids(self, class_name, tenant, object_ids, batch_size=100):
+        if object_ids:
+            self._collection(class_name).delete({"path": ["id"], "operator": "ContainsAny", "valueTextArray": object_ids})
+
+    def add_weaviate_customer_class(self, customer_guid):
+        class_name = self.generate_weaviate_class_name(customer_guid)
+        if os.path.isdir(os.path.join(self.directory, class_name)):
+            logger.info(f"Local collection '{class_name}' already exists, skipping creation.")
+            return "schema already exists"
+        self._collection(class_name)
+        logger.info(f"Local collection '{class_name}' created successfully!")
+
+    def delete_objects_by_customer_and_filename(self, customer_guid, filename):
+        try:
+            class_name = self.generate_weaviate_class_name(customer_guid)
+            deleted = self._collection(class_name).delete({
+                "operator": "And",
+                "operands": [
+                    {"path": ["customer_guid"], "operator": "Equal", "valueText": customer_guid},
+                    {"path": ["filename"], "operator": "Equal", "valueText": filename}
+                ]
+            })
+            logger.info(f"Successfully deleted {deleted} objects for customer_guid: {customer_guid} and filename: {filename}")
+        except Exception as e:
+            logger.error(f"Error executing deletion for customer_guid: {customer_guid} and filename: {filename} - {str(e)}")
@@ -0,0 +1,276 @@
+import os
+import re
+import json
+import math
+import fcntl
+import threading
+from collections import Counter
+
+import numpy as np
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+METADATA_FILE = "objects.json"
+LOCK_FILE = ".lock"
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Weaviate's BM25 defaults
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def matches(where, object_id, properties):
+    """Evaluate a v3 where-filter dict (Equal, ContainsAny, And, Or) against one object."""
+    operator = where["operator"]
+    if operator == "And":
+        return all(matches(operand, object_id, properties) for operand in where["operands"])
+    if operator == "Or":
+        return any(matches(operand, object_id, properties) for operand in where["operands"])
+
+    path = where["path"][0]
+    actual = object_id if path == "id" else properties.get(path)
+    expected = next(value for key, value in where.items() if key.startswith("value"))
+    if operator == "Equal":
+        return actual == expected
+    if operator == "ContainsAny":
+        actual_values = actual if isinstance(actual, list) else [actual]
+        return any(value in actual_values for value in expected)
+    raise ValueError(f"Unsupported where operator for the local vector store: {operator}")
+
+
+class LocalCollection:
+    """
+    Chunks of one tenant on local disk: float32 vectors appended to a memory-mapped file and the
+    object properties in a JSON file, written atomically after each change. Replaced or deleted
+    rows are dropped by compaction into a new vectors file. Other processes pick up changes on
+    their next read; writers are serialized with a file lock.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._mtime = None
+        self._reset({"vectors_file": None, "dimensions": None, "rows": 0, "generation": 0, "objects": []})
+        self._reload_if_changed()
+
+    # ---- persistence -------------------------------------------------------------------------
+
+    def _reset(self, metadata):
+        self.metadata = metadata
+        self.objects = metadata["objects"]  # live objects: {"id", "row", "properties"}
+        self.index = {obj["id"]: position for position, obj in enumerate(self.objects)}
+        dimensions = metadata["dimensions"]
+        if metadata["rows"] and metadata["vectors_file"]:
+            self.vectors = np.memmap(os.path.join(self.directory, metadata["vectors_file"]), dtype=np.float32,
+                                     mode="r", shape=(metadata["rows"], dimensions))
+        else:
+            self.vectors = np.empty((0, dimensions or 0), dtype=np.float32)
+        rows = np.asarray([obj["row"] for obj in self.objects], dtype=np.int64)
+        if len(rows) == len(self.vectors) and np.array_equal(rows, np.arange(len(rows))):
+            self.matrix = self.vectors  # no replaced rows: search the mapping directly
+        else:
+            self.matrix = self.vectors[rows] if len(rows) else np.empty((0, dimensions or 0), dtype=np.float32)
+        norms = np.linalg.norm(self.matrix, axis=1) if len(rows) else np.empty(0, dtype=np.float32)
+        self.norms = np.where(norms == 0, 1.0, norms)
+        self._build_bm25()
+
+    def _build_bm25(self):
+        self.term_frequencies = [Counter(tokenize(obj["properties"].get("text"))) for obj in self.objects]
+        self.doc_lengths = np.asarray([sum(tf.values()) for tf in self.term_frequencies], dtype=np.float32)
+        self.avg_doc_length = float(self.doc_lengths.mean()) if len(self.doc_lengths) else 0.0
+        self.document_frequency = Counter(term for tf in self.term_frequencies for term in tf)
+
+    def _metadata_path(self):
+        return os.path.join(self.directory, METADATA_FILE)
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self._metadata_path()).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            with open(self._metadata_path(), "r", encoding="utf-8") as file:
+                metadata = json.load(file)
+            self._mtime = mtime
+            self._reset(metadata)
+
+    def _write_metadata(self, metadata):
+        tmp_path = self._metadata_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(metadata, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self._metadata_path())
+
+    def _write(self, mutate):
+        """Apply `mutate(metadata, append_vectors)` under the cross-process lock and persist the result."""
+        with self._lock, open(os.path.join(self.directory, LOCK_FILE), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._reload_if_changed()
+                metadata = json.loads(json.dumps(self.metadata))  # work on a copy until it is persisted
+                appended = []
+
+                def append_vectors(vectors):
+                    vectors = np.asarray(vectors, dtype=np.float32)
+                    if metadata["dimensions"] is None:
+                        metadata["dimensions"] = int(vectors.shape[1])
+                    elif vectors.shape[1] != metadata["dimensions"]:
+                        raise ValueError(f"Vector dimensions {vectors.shape[1]} do not match {metadata['dimensions']}")
+                    first_row = metadata["rows"] + sum(len(v) for v in appended)
+                    appended.append(vectors)
+                    return range(first_row, first_row + len(vectors))
+
+                mutate(metadata, append_vectors)
+                if appended:
+                    if metadata["vectors_file"] is None:
+                        metadata["vectors_file"] = f"vectors.{metadata['generation']}.f32"
+                    with open(os.path.join(self.directory, metadata["vectors_file"]), "ab") as file:
+                        # Drop rows of an earlier write that never made it into the metadata
+                        file.truncate(metadata["rows"] * metadata["dimensions"] * 4)
+                        for vectors in appended:
+                            file.write(vectors.tobytes())
+                        file.flush()
+                        os.fsync(file.fileno())
+                    metadata["rows"] += sum(len(v) for v in appended)
+                if metadata["rows"] > 2 * len(metadata["objects"]) + 1024:
+                    self._compact(metadata)
+                self._write_metadata(metadata)
+                self._mtime = os.stat(self._metadata_path()).st_mtime_ns
+                self._reset(metadata)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _compact(self, metadata):
+        """Copy the live rows into a new vectors file; readers of the old file keep their mapping."""
+        old_file = os.path.join(self.directory, metadata["vectors_file"])
+        old = np.memmap(old_file, dtype=np.float32, mode="r", shape=(metadata["rows"], metadata["dimensions"]))
+        metadata["generation"] += 1
+        new_name = f"vectors.{metadata['generation']}.f32"
+        with open(os.path.join(self.directory, new_name), "wb") as file:
+            for new_row, obj in enumerate(metadata["objects"]):
+                file.write(np.asarray(old[obj["row"]], dtype=np.float32).tobytes())
+                obj["row"] = new_row
+            file.flush()
+            os.fsync(file.fileno())
+        del old
+        # Older generations are no longer referenced; the previous one stays for readers that just loaded it
+        for name in os.listdir(self.directory):
+            if name.startswith("vectors.") and name not in (new_name, metadata["vectors_file"]):
+                os.unlink(os.path.join(self.directory, name))
+        metadata["vectors_file"] = new_name
+        metadata["rows"] = len(metadata["objects"])
+        logger.info(f"Compacted {self.directory} to {metadata['rows']} rows")
+
+    # ---- writes ------------------------------------------------------------------------------
+
+    def upsert(self, ids, properties, vectors):
+        """Insert objects, replacing existing objects with the same id."""
+        def mutate(metadata, append_vectors):
+            rows = append_vectors(vectors)
+            index = {obj["id"]: position for position, obj in enumerate(metadata["objects"])}
+            for object_id, props, row in zip(ids, properties, rows):
+                entry = {"id": object_id, "row": row, "properties": props}
+                if object_id in index:
+                    metadata["objects"][index[object_id]] = entry
+                else:
+                    index[object_id] = len(metadata["objects"])
+                    metadata["objects"].append(entry)
+        if ids:
+            self._write(mutate)
+
+    def delete(self, where):
+        """Delete the objects matching a where-filter; returns how many were deleted."""
+        deleted = []
+
+        def mutate(metadata, append_vectors):
+            kept = [obj for obj in metadata["objects"] if not matches(where, obj["id"], obj["properties"])]
+            deleted.append(len(metadata["objects"]) - len(kept))
+            metadata["objects"] = kept
+        self._write(mutate)
+        return deleted[0]
+
+    # ---- reads -------------------------------------------------------------------------------
+
+    def _row(self, position, properties, additional):
+        obj = self.objects[position]
+        row = {name: obj["properties"].get(name) for name in properties}
+        if additional:
+            extra = {}
+            if "id" in additional:
+                extra["id"] = obj["id"]
+            if "vector" in additional:
+                extra["vector"] = self.matrix[position].tolist()
+            if "distance" in additional:
+                extra["distance"] = None
+            row["_additional"] = extra
+        return row
+
+    def fetch(self, properties, where, limit=None, offset=0, additional=None):
+        with self._lock:
+            self._reload_if_changed()
+            positions = [position for position, obj in enumerate(self.objects)
+                         if matches(where, obj["id"], obj["properties"])]
+            positions = positions[offset or 0:][:limit]
+            return [self._row(position, properties, additional) for position in positions]
+
+    def scan(self, properties, limit, after=None, additional=None):
+        """Page through all objects in id order, starting after the id `after` (like Weaviate's cursor API)."""
+        with self._lock:
+            self._reload_if_changed()
+            positions = sorted((obj["id"], position) for position, obj in enumerate(self.objects)
+                               if after is None or obj["id"] > after)[:limit]
+            return [self._row(position, properties, additional) for _, position in positions]
+
+    def _bm25_scores(self, query):
+        scores = np.zeros(len(self.objects), dtype=np.float32)
+        count = len(self.objects)
+        for term in set(tokenize(query)):
+            df = self.document_frequency.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            tf = np.asarray([frequencies.get(term, 0) for frequencies in self.term_frequencies], dtype=np.float32)
+            denominator = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths / (self.avg_doc_length or 1.0))
+            scores += idf * tf * (BM25_K1 + 1) / denominator
+        return scores
+
+    def hybrid(self, properties, query, vector, alpha=0.5, limit=None, additional=None):
+        """
+        Brute-force hybrid search: cosine similarity and BM25 are min-max normalized and fused as
+        alpha * vector + (1 - alpha) * keyword, like Weaviate's relative score fusion.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            if not self.objects:
+                return []
+            query_vector = np.asarray(vector, dtype=np.float32)
+            cosine = self.matrix @ query_vector / (self.norms * (np.linalg.norm(query_vector) or 1.0))
+            fused = alpha * self._min_max(cosine) + (1 - alpha) * self._min_max(self._bm25_scores(query))
+            limit = min(limit or 50, len(self.objects))
+            top = np.argpartition(-fused, limit - 1)[:limit]
+            top = top[np.argsort(-fused[top], kind="stable")]
+            rows = []
+            for position in top:
+                row = self._row(int(position), properties, additional)
+                if additional and "score" in additional:
+                    row["_additional"]["score"] = float(fused[position])
+                rows.append(row)
+            return rows
+
+    @staticmethod
+    def _min_max(scores):
+        if not len(scores):
+            return scores
+        low, high = float(scores.min()), float(scores.max())
+        if high == low:
+            return np.ones_like(scores) if high > 0 else np.zeros_like(scores)
+        return (scores - low) / (high - low)
@@ -0,0 +1,105 @@
+import os
+import argparse
+
+from weaviate import Client
+from weaviate.schema.crud_schema import Tenant, TenantActivityStatus
+
+from src.backend.weaviate.weaviate_manager import multi_tenant_class_schema
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+CLASS_PREFIX = "Customer_"
+
+
+def customer_guid_from_class(class_name):
+    """Invert WeaviateManager.generate_weaviate_class_name."""
+    return class_name[len(CLASS_PREFIX):].replace("_", "-")
+
+
+def count_objects(client, class_name, tenant=None):
+    query = client.query.aggregate(class_name).with_meta_count()
+    if tenant:
+        query = query.with_tenant(tenant)
+    result = query.do()
+    return result["data"]["Aggregate"][class_name][0]["meta"]["count"]
+
+
+def migrate_class(client, source_class, target_class, batch_size, cold):
+    """Copy every object of a per-customer class, with its id and vector, into the customer's tenant."""
+    tenant = customer_guid_from_class(source_class)
+    existing = {t.name for t in client.schema.get_class_tenants(target_class)}
+    if tenant not in existing:
+        client.schema.add_class_tenants(target_class, [Tenant(name=tenant)])
+    else:
+        client.schema.update_class_tenants(target_class, [Tenant(name=tenant, activity_status=TenantActivityStatus.HOT)])
+
+    copied = 0
+    cursor = None
+    client.batch.configure(batch_size=batch_size)
+    while True:
+        page = client.data_object.get(class_name=source_class, with_vector=True, limit=batch_size, after=cursor)
+        objects = page.get("objects") or []
+        if not objects:
+            break
+        with client.batch as batch:
+            for obj in objects:
+                properties = obj["properties"]
+                if properties.get("customer_guid") != tenant:
+                    raise ValueError(f"Object {obj['id']} of {source_class} belongs to customer {properties.get('customer_guid')}")
+                batch.add_data_object(properties, class_name=target_class, uuid=obj["id"],
+                                      vector=obj.get("vector"), tenant=tenant)
+        copied += len(objects)
+        cursor = objects[-1]["id"]
+
+    source_count = count_objects(client, source_class)
+    target_count = count_objects(client, target_class, tenant)
+    if target_count < source_count:
+        raise RuntimeError(f"Tenant {tenant} has {target_count} objects, expected at least {source_count}")
+    if cold:
+        client.schema.update_class_tenants(target_class, [Tenant(name=tenant, activity_status=TenantActivityStatus.COLD)])
+    logger.info(f"Migrated {copied} objects from {source_class} to tenant {tenant} of {target_class}")
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Move the per-customer Customer_<guid> classes into one multi-tenant class, one tenant per customer.")
+    parser.add_argument("--target-class", default=os.getenv("WEAVIATE_MULTI_TENANT_CLASS", "CustomerChunks"))
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--customer", action="append", help="Only migrate this customer_guid (repeatable)")
+    parser.add_argument("--delete-source", action="store_true", help="Delete each per-customer class once its copy is verified")
+    parser.add_argument("--cold", action="store_true", help="Leave migrated tenants COLD until their first query")
+    args = parser.parse_args()
+
+    client = Client(f"http://{os.getenv('WEAVIATE_HOST')}:{os.getenv('WEAVIATE_PORT')}")
+    if not client.schema.exists(args.target_class):
+        client.schema.create_class(multi_tenant_class_schema(args.target_class))
+        logger.info(f"Created multi-tenant class {args.target_class}")
+
+    source_classes = [c["class"] for c in client.schema.get().get("classes", [])
+                      if c["class"].startswith(CLASS_PREFIX)
+                      and not (c.get("multiTenancyConfig") or {}).get("enabled")]
+    if args.customer:
+        wanted = set(args.customer)
+        source_classes = [c for c in source_classes if customer_guid_from_class(c) in wanted]
+    logger.info(f"Migrating {len(source_classes)} classes into {args.target_class}")
+
+    failures = 0
+    for source_class in source_classes:
+        try:
+            migrate_class(client, source_class, args.target_class, args.batch_size, args.cold)
+            if args.delete_source:
+                client.schema.delete_class(source_class)
+                logger.info(f"Deleted source class {source_class}")
+        except Exception as e:
+            failures += 1
+            logger.error(f"Migration of {source_class} failed: {e}")
+
+    logger.info(f"Migration finished: {len(source_classes) - failures} succeeded, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from prometheus_client import Counter
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+QUERY_EMBEDDING_CACHE_REQUESTS = Counter("query_embedding_cache_requests_total",
+                                         "Query embedding lookups by outcome", ["result"])
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU of query embeddings, keyed by model id and whitespace-normalized query text.
+    Vectors are stored as read-only float32 arrays. A size of 0 disables the cache.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 2048)) if max_entries is None else max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        logger.info(f"QueryEmbeddingCache initialized (max_entries={self.max_entries})")
+
+    @staticmethod
+    def _key(model_id, text):
+        # Whitespace does not change the tokenization, so collapsing it keeps the vectors identical
+        return model_id, " ".join(text.split())
+
+    def get_or_encode(self, model_id, text, encode):
+        """Return the cached vector for the query, or encode it with `encode(text)` and cache it."""
+        if self.max_entries <= 0:
+            return np.asarray(encode(text), dtype=np.float32)
+
+        key = self._key(model_id, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if vector is not None:
+            QUERY_EMBEDDING_CACHE_REQUESTS.labels(result="hit").inc()
+            return vector
+
+        # Encode outside the lock; concurrent misses of the same query only cost a duplicate forward pass
+        vector = np.asarray(encode(key[1]), dtype=np.float32)
+        vector.setflags(write=False)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        QUERY_EMBEDDING_CACHE_REQUESTS.labels(result="miss").inc()
+        return vector
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+            }
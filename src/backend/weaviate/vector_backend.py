@@ -0,0 +1,28 @@
+import os
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Configure logging
+logger = get_primitivechat_logger(__name__)
+
+WEAVIATE = "weaviate"
+LOCAL = "local"
+
+
+def get_vector_manager():
+    """
+    Return the vector store selected by VECTOR_BACKEND: "weaviate" (default) or "local", the
+    in-process LocalVectorManager, which does not need the weaviate client. Both share the
+    VectorManagerBase interface.
+    """
+    backend = os.getenv("VECTOR_BACKEND", WEAVIATE).lower()
+    if backend == LOCAL:
+        from src.backend.weaviate.local_vector_manager import LocalVectorManager
+
+        return LocalVectorManager()
+    if backend != WEAVIATE:
+        raise ValueError(f"Unsupported VECTOR_BACKEND: {backend}")
+
+    from src.backend.weaviate.weaviate_manager import WeaviateManager
+
+    return WeaviateManager()
@@ -0,0 +1,489 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import numpy as np
+from src.backend.embedding.lib.download_and_upload_file import LocalFileDownloadAndUpload
+from src.backend.lib.singleton_class import Singleton
+from src.backend.weaviate.query_embedding_cache import QueryEmbeddingCache
+from src.backend.embedding.lib.model_loader import EmbeddingModelRegistry
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+
+#config logging
+logger = get_primitivechat_logger(__name__)
+
+# Properties of a chunk object, shared by the per-customer classes and the multi-tenant class
+CHUNK_PROPERTIES = [
+    {
+        "name": "text",
+        "dataType": ["text"],
+        "description": "The chunked text content from the document.",
+        "indexInverted": True
+    },
+    {
+        "name": "chunk_number",
+        "dataType": ["int"],
+        "description": "An object containing metadata like chunk number",
+        "indexInverted": False
+    },
+    {
+        "name": "page_numbers",
+        "dataType": ["int[]"],
+        "description": "An object containing metadata like page number",
+        "indexFilterable": True
+    },
+    {
+        "name": "customer_guid",
+        "dataType": ["text"],
+        "description": "A unique identifier for the customer (namespace-like isolation).",
+        "indexInverted": True
+    },
+    {
+        "name": "filename",
+        "dataType": ["text"],
+        "description": "The name of the file this chunk originates from.",
+        "indexInverted": True
+    },
+    {
+        "name": "max_page",
+        "dataType": ["int"],
+        "description": "Maximum page number in this file.",
+        "indexFilterable": True
+    }
+]
+
+# Namespace of the deterministic chunk object ids
+CHUNK_ID_NAMESPACE = uuid.UUID("8f0b6a52-3c1e-5d4b-9a7e-2f6c1d0e4b31")
+
+
+def chunk_object_id(customer_guid, filename, text, occurrence=0):
+    """Object id of a chunk: uuid5 of the customer, filename, content hash and occurrence of that content in the file."""
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{customer_guid}/{filename}/{content_hash}/{occurrence}"))
+
+
+class VectorManagerBase(metaclass=Singleton):
+    """
+    Ingestion, search and re-ranking shared by the vector stores, without any weaviate import.
+    Subclasses implement the storage calls: _hybrid_query, _filtered_query, _cursor_query,
+    _upsert_objects and _delete_object_ids (all returning the GraphQL result shape), plus
+    add_weaviate_customer_class and delete_objects_by_customer_and_filename.
+    """
+
+    def _init_embedding(self):
+        """Load the indexer model and the helpers used by ingestion and search."""
+        self.model = self.load_model()
+        self.model_id = EmbeddingModelRegistry().identity(os.getenv('MODEL_DIR'))
+        self.query_embedding_cache = QueryEmbeddingCache()
+        self.download = LocalFileDownloadAndUpload()
+        self.query_maximum_results = int(os.getenv('WEAVIATE_QUERY_MAXIMUM_RESULTS', 10000))
+
+    def load_model(self):
+        try:
+            model_dir = os.getenv('MODEL_DIR')  # Get the model path from env variable
+            logger.info(f"Loading model from {model_dir}...")
+            return EmbeddingModelRegistry().get(model_dir)  # Shared instance of the model saved at this path
+        except Exception as e:
+            logger.error(f"Error loading model: {e}")
+            raise e
+
+    def encode_query(self, question):
+        """Return the float32 embedding of a search query, served from the query embedding LRU when possible."""
+        return self.query_embedding_cache.get_or_encode(self.model_id, question, self.model.encode)
+
+    def _hybrid_query(self, class_name, properties, question, alpha, vector, additional=None, limit=None, tenant=None):
+        raise NotImplementedError
+
+    def _filtered_query(self, class_name, properties, where_filter, limit, tenant=None, additional=None, offset=None):
+        raise NotImplementedError
+
+    def _cursor_query(self, class_name, properties, limit, after=None, tenant=None):
+        raise NotImplementedError
+
+    def _upsert_objects(self, class_name, tenant, chunks, vectors, batch_size):
+        raise NotImplementedError
+
+    def _delete_object_ids(self, class_name, tenant, object_ids, batch_size=100):
+        raise NotImplementedError
+
+    def _target(self, customer_guid):
+        """Return (class_name, tenant) holding the customer's chunks."""
+        return self.generate_weaviate_class_name(customer_guid), None
+
+    def generate_weaviate_class_name(self,customer_guid):
+
+        return f"Customer_{customer_guid.replace('-', '_')}"
+
+    def insert_data(self, customer_guid: str, file_path: str):
+        """
+        Vectorize a chunked file incrementally. Chunk ids are derived from the customer, filename and
+        chunk content, so on re-ingestion only new chunks are embedded and inserted, chunks whose
+        metadata moved are rewritten with their stored vector and chunks that disappeared are deleted.
+        """
+        try:
+            # Ensure the class schema is created before inserting data
+            class_names, tenant = self._target(customer_guid)
+
+            # Download and save file locally
+            local_path = self.download.download_and_save_file(customer_guid, file_path)
+
+            filename = os.path.basename(file_path).replace(".chunked.txt", "")
+
+            # Read and validate data
+            with open(local_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+
+            if not isinstance(data, list):
+                raise ValueError("Invalid JSON format: Expected a list of objects.")
+
+            # 🔹 Compute max page number
+            max_page_for_file = 0
+            for entry in data:
+                metadata = entry.get("metadata", {})
+                pages = metadata.get("page_numbers", [])
+                if pages:
+                    max_page_for_file = max(max_page_for_file, max(pages))
+
+            logger.info(f"Max page for file '{filename}' is {max_page_for_file}")
+
+            chunks = []  # (object_id, properties) in file order
+            occurrences = {}  # identical chunks of a file get distinct ids through their occurrence index
+            for index, entry in enumerate(data):
+                metadata = entry["metadata"]
+                if not metadata.get("filename"):
+                    raise ValueError(f"Missing filename in metadata for entry {index}")
+
+                text = entry["text"].strip()
+                occurrence = occurrences.get(text, 0)
+                occurrences[text] = occurrence + 1
+                chunks.append((chunk_object_id(customer_guid, filename, text, occurrence), {
+                    "text": text,
+                    "customer_guid": customer_guid,
+                    "filename": metadata["filename"],
+                    "chunk_number": metadata["chunk_number"],
+                    "page_numbers": metadata["page_numbers"],
+                    "max_page": max_page_for_file
+                }))
+
+            existing = self._get_file_objects(class_names, tenant, customer_guid, filename)
+            new_ids = {object_id for object_id, _ in chunks}
+            to_embed = [(object_id, properties) for object_id, properties in chunks
+                        if object_id not in existing or existing[object_id][1] is None]
+            to_rewrite = [(object_id, properties, existing[object_id][1]) for object_id, properties in chunks
+                          if object_id in existing and existing[object_id][1] is not None
+                          and {key: existing[object_id][0].get(key) for key in properties} != properties]
+            stale_ids = [object_id for object_id in existing if object_id not in new_ids]
+            logger.info(f"Re-vectorizing '{filename}': {len(chunks)} chunks, {len(to_embed)} to embed, "
+                        f"{len(to_rewrite)} with moved metadata, {len(stale_ids)} stale")
+
+            batch_size = 100
+            # Process data in batches
+            for i in range(0, len(to_embed), batch_size):
+                batch_data = to_embed[i:i + batch_size]
+                embeddings = self.model.encode([properties["text"] for _, properties in batch_data]).tolist()
+                self._upsert_objects(class_names, tenant, batch_data, embeddings, batch_size)
+                logger.info(f"Processed batch {len(batch_data)} for {class_names}")
+
+            for i in range(0, len(to_rewrite), batch_size):
+                batch_data = to_rewrite[i:i + batch_size]
+                self._upsert_objects(class_names, tenant, [(object_id, properties) for object_id, properties, _ in batch_data],
+                                     [vector for _, _, vector in batch_data], batch_size)
+
+            # Stale chunks go last, so the file stays searchable during re-ingestion
+            self._delete_object_ids(class_names, tenant, stale_ids)
+
+            logger.info(f"Bulk data inserted for {class_names} successfully!")
+            return {"embedded": len(to_embed), "rewritten": len(to_rewrite), "deleted": len(stale_ids),
+                    "unchanged": len(chunks) - len(to_embed) - len(to_rewrite)}
+
+        except Exception as e:
+            logger.error(f"Unexpected error inserting data for {customer_guid}: {e}")
+            raise e
+
+    def _get_file_objects(self, class_name, tenant, customer_guid, filename, page_size=1000):
+        """
+        Return {object_id: (properties, vector)} of the stored chunks of a file, with one filtered
+        query. Only a file reaching QUERY_MAXIMUM_RESULTS chunks is listed with the cursor API,
+        which is not bounded by it but cannot filter.
+        """
+        properties = [prop["name"] for prop in CHUNK_PROPERTIES]
+        where_filter = {
+            "operator": "And",
+            "operands": [
+                {"path": ["customer_guid"], "operator": "Equal", "valueText": customer_guid},
+                {"path": ["filename"], "operator": "Equal", "valueText": filename}
+            ]
+        }
+        result = self._filtered_query(class_name, properties, where_filter, self.query_maximum_results, tenant=tenant,
+                                      additional=["id", "vector"])
+        if result.get("errors"):
+            raise RuntimeError(f"Fetching the objects of '{filename}' failed: {result['errors']}")
+        rows = (result.get("data", {}).get("Get", {}).get(class_name)) or []
+        if len(rows) < self.query_maximum_results:
+            return self._file_objects(rows)
+
+        logger.info(f"'{filename}' has at least {len(rows)} chunks, listing them with the cursor API")
+        object_ids = self._scan_file_object_ids(class_name, tenant, customer_guid, filename, page_size)
+        objects = {}
+        for i in range(0, len(object_ids), page_size):
+            batch_ids = object_ids[i:i + page_size]
+            where_filter = {"path": ["id"], "operator": "ContainsAny", "valueTextArray": batch_ids}
+            result = self._filtered_query(class_name, properties, where_filter, len(batch_ids), tenant=tenant,
+                                          additional=["id", "vector"])
+            if result.get("errors"):
+                raise RuntimeError(f"Fetching the objects of '{filename}' failed: {result['errors']}")
+            objects.update(self._file_objects((result.get("data", {}).get("Get", {}).get(class_name)) or []))
+        return objects
+
+    def _scan_file_object_ids(self, class_name, tenant, customer_guid, filename, page_size):
+        """Ids of a file's objects, found by walking the whole class or tenant with the cursor API."""
+        object_ids = []
+        after = None
+        while True:
+            result = self._cursor_query(class_name, ["filename", "customer_guid"], page_size, after=after, tenant=tenant)
+            if result.get("errors"):
+                raise RuntimeError(f"Listing the objects of {class_name} failed: {result['errors']}")
+            rows = (result.get("data", {}).get("Get", {}).get(class_name)) or []
+            for row in rows:
+                if row.get("filename") == filename and row.get("customer_guid") == customer_guid:
+                    object_ids.append(row["_additional"]["id"])
+            if len(rows) < page_size:
+                return object_ids
+            after = rows[-1]["_additional"]["id"]
+
+    @staticmethod
+    def _file_objects(rows):
+        """{object_id: (properties, vector)} of query rows fetched with _additional id and vector."""
+        objects = {}
+        for row in rows:
+            additional = row.pop("_additional", None) or {}
+            objects[additional["id"]] = (row, additional.get("vector"))
+        return objects
+
+    def search_query(self, customer_guid, question, alpha=0.5):
+        try:
+            # Get the query vector for the question
+            query_vector = self.encode_query(question).tolist()
+
+            class_names, tenant = self._target(customer_guid)
+
+            # Perform the query with the provided vector
+            result = self._hybrid_query(
+               class_names, ["text", "chunk_number", "page_numbers", "filename", "customer_guid"],
+               question, alpha, query_vector, tenant=tenant
+            )
+
+            if not result or "data" not in result or "Get" not in result["data"]:
+                raise ValueError(f"Unexpected search result format: {result}")
+
+            if class_names not in result["data"]["Get"]:
+                raise ValueError(f"No results found for customer: {class_names}")
+
+            for obj in result["data"]["Get"][class_names]:
+                if obj["customer_guid"] != customer_guid:
+                    raise ValueError("Internal server error: Customer GUID mismatch detected!")
+
+            logger.info(f"Search query successful for {customer_guid} with query '{question}'")
+            return result
+
+        except Exception as e:
+            logger.error(f"Unexpected error in search query for {customer_guid}: {e}")
+            raise e
+
+    def search_query_advanced(self, customer_guid: str, question: str, top_k: int = 3, alpha: float = 0.5,
+                              timings: dict = None, include_chunks: bool = False):
+        """Return extended context for a question using page level retrieval.
+
+        This method performs a hybrid search in Weaviate to obtain candidate
+        chunks, re-ranks them by cosine similarity between the query embedding
+        and the chunk vectors stored at ingestion time and then expands the highest ranked chunks to their full page
+        context (including neighbouring pages).  The combined context for the
+        top ranked chunks is returned in a JSON serialisable format.
+
+        If a `timings` dict is given, the duration in seconds of each phase is
+        stored in it (embedding, hybrid_query, rerank, page_expansion).
+        With `include_chunks`, each result also lists the chunks its text was
+        built from, for the prompt's ContextPacker.
+        """
+        timings = {} if timings is None else timings
+        try:
+            logger.info(
+                f"[ADVANCED SEARCH] Query: '{question}' | customer_guid: {customer_guid} | top_k: {top_k} | alpha: {alpha}")
+            phase_start = time.perf_counter()
+            query_embedding = self.encode_query(question)
+            query_vector = query_embedding.tolist()
+            class_name, tenant = self._target(customer_guid)
+            timings["embedding_seconds"] = time.perf_counter() - phase_start
+            phase_start = time.perf_counter()
+
+            raw_result = self._hybrid_query(
+                class_name,
+                ["text", "chunk_number", "page_numbers", "filename", "customer_guid", "max_page"],
+                question, alpha, query_vector,
+                additional=["distance", "vector"],
+                limit=max(top_k * 2, 10),
+                tenant=tenant,
+            )
+            timings["hybrid_query_seconds"] = time.perf_counter() - phase_start
+
+            if not raw_result or "data" not in raw_result or "Get" not in raw_result["data"]:
+                logger.error(f"[ADVANCED SEARCH] Unexpected search result format: {raw_result}")
+                raise ValueError(f"Unexpected search result format: {raw_result}")
+
+            if class_name not in raw_result["data"]["Get"]:
+                logger.warning(f"[ADVANCED SEARCH] No results found for customer: {class_name}")
+                return {"results": []}
+
+            candidates = raw_result.get("data", {}).get("Get", {}).get(class_name, [])
+            if not candidates:
+                logger.warning(f"[ADVANCED SEARCH] No candidates found for customer: {class_name}")
+                return {"results": []}
+
+            for obj in candidates:
+                if obj.get("customer_guid") != customer_guid:
+                    logger.error("[ADVANCED SEARCH] Customer GUID mismatch detected!")
+                    raise ValueError("Internal server error: Customer GUID mismatch detected!")
+            # Re-rank candidates
+            phase_start = time.perf_counter()
+            scores = self._rerank_scores(query_embedding, candidates)
+            for cand, score in zip(candidates, scores):
+                cand["relevance_score"] = float(score)
+
+            ranked = sorted(candidates, key=lambda x: x["relevance_score"], reverse=True)[:top_k]
+            timings["rerank_seconds"] = time.perf_counter() - phase_start
+            phase_start = time.perf_counter()
+
+            # Extract max_page directly from candidates
+            page_count_cache = {}
+            for item in ranked:
+                filename = item["filename"]
+                max_page = item.get("max_page", 0)
+                if filename not in page_count_cache or max_page > page_count_cache[filename]:
+                    page_count_cache[filename] = max_page
+            logger.info(f"[ADVANCED SEARCH] Page count cache: {page_count_cache}")
+
+            def expand_pages(pages, page_count):
+                expanded_pages = set()
+                for page in pages:
+                    if page_count == 1:
+                        expanded_pages.update([1])
+                    elif page == 1:
+                        expanded_pages.update([1, 2, 3][:page_count])
+                    elif page == page_count:
+                        expanded_pages.update([p for p in [page_count - 2, page_count - 1, page_count] if p >= 1])
+                    else:
+                        expanded_pages.update([p for p in [page - 1, page, page + 1] if 1 <= p <= page_count])
+                return expanded_pages
+
+            def fetch_page_chunks(pages_by_file):
+                """
+                Fetch the chunks of all requested pages of all files in one query, budgeting 100
+                chunks per (file, page) and paging on if a page of results comes back full.
+                """
+                operands = [
+                    {
+                        "operator": "And",
+                        "operands": [
+                            {"path": ["filename"], "operator": "Equal", "valueText": filename},
+                            {"path": ["page_numbers"], "operator": "ContainsAny", "valueInt": sorted(pages)},
+                        ],
+                    }
+                    for filename, pages in pages_by_file.items()
+                ]
+                where_filter = operands[0] if len(operands) == 1 else {"operator": "Or", "operands": operands}
+                limit = min(100 * sum(len(pages) for pages in pages_by_file.values()), self.query_maximum_results)
+                rows = []
+                while True:
+                    res = self._filtered_query(
+                        class_name,
+                        ["text", "chunk_number", "page_numbers", "filename"],
+                        where_filter, limit, tenant=tenant, offset=len(rows) or None,
+                    )
+                    if res.get("errors"):
+                        raise RuntimeError(f"Fetching page chunks failed: {res['errors']}")
+                    page = res.get("data", {}).get("Get", {}).get(class_name) or []
+                    rows.extend(page)
+                    if len(page) < limit:
+                        return rows
+                    if len(rows) + limit > self.query_maximum_results:
+                        logger.warning(f"[ADVANCED SEARCH] Page expansion stopped at {len(rows)} chunks (QUERY_MAXIMUM_RESULTS)")
+                        return rows
+
+            def safe_min_page(chunk):
+                pages = chunk.get("page_numbers", [])
+                return min(pages) if pages else 0
+
+            # Merge the page requests of all ranks per file, so overlapping pages are fetched once
+            expanded_by_rank = []
+            pages_by_file = {}
+            for idx, item in enumerate(ranked, start=1):
+                pages = item.get("page_numbers", [])
+                filename = item["filename"]
+                page_count = page_count_cache.get(filename, 0)
+                expanded_pages = expand_pages(pages, page_count)
+                logger.info(f"Rank {idx} → Expanding pages {pages} of file {filename} (page_count={page_count}) to {sorted(expanded_pages)}")
+                expanded_by_rank.append(expanded_pages)
+                if expanded_pages:
+                    pages_by_file.setdefault(filename, set()).update(expanded_pages)
+
+            shared_chunks = fetch_page_chunks(pages_by_file) if pages_by_file else []
+            chunks_by_file = {}
+            for chunk in shared_chunks:
+                chunks_by_file.setdefault(chunk.get("filename"), []).append(chunk)
+            for file_chunks in chunks_by_file.values():
+                file_chunks.sort(key=lambda c: (safe_min_page(c), c.get("chunk_number", 0)))
+
+            final_results = []
+            for idx, (item, expanded_pages) in enumerate(zip(ranked, expanded_by_rank), start=1):
+                filename = item["filename"]
+                chunks = [c for c in chunks_by_file.get(filename, [])
+                          if expanded_pages.intersection(c.get("page_numbers") or [])]
+                combined_text = " ".join(c.get("text", "") for c in chunks)
+
+                result = {
+                    "rank": idx,
+                    "relevance_score": item["relevance_score"],
+                    "filename": filename,
+                    "page_numbers": sorted(expanded_pages),
+                    "text": combined_text,
+                }
+                if include_chunks:
+                    result["chunks"] = [
+                        {
+                            "chunk_number": c.get("chunk_number"),
+                            "page_numbers": c.get("page_numbers", []),
+                            "text": c.get("text", ""),
+                        }
+                        for c in chunks
+                    ]
+                final_results.append(result)
+
+                logger.info(f"[ADVANCED SEARCH] Final result {idx}: file={filename}, pages={sorted(expanded_pages)}")
+
+            timings["page_expansion_seconds"] = time.perf_counter() - phase_start
+            return {"results": final_results}
+
+        except Exception as e:
+            logger.error(f"Unexpected error in advanced search query: {e}")
+            raise
+
+    def _rerank_scores(self, query_embedding, candidates):
+        """
+        Cosine similarity of the query to each candidate, using the vectors stored with the chunks
+        (returned through `_additional { vector }`). Only candidates without a stored vector are encoded.
+        """
+        stored = [(c.get("_additional") or {}).get("vector") for c in candidates]
+        missing = [i for i, vector in enumerate(stored) if not vector]
+        if missing:
+            logger.warning(f"[ADVANCED SEARCH] {len(missing)} candidates have no stored vector, encoding them")
+            encoded = self.model.encode([candidates[i].get("text", "") for i in missing])
+            for i, vector in zip(missing, encoded):
+                stored[i] = vector
+
+        matrix = np.asarray(stored, dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        return matrix @ query / np.where(norms == 0, 1.0, norms)
@@ -3,10 +3,12 @@ import weaviate
 from weaviate import Client
 import os
 import json
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from src.backend.embedding.lib.download_and_upload_file import LocalFileDownloadAndUpload
-from src.backend.lib.singleton_class import Singleton
+import time
+import threading
+from src.backend.weaviate.grpc_transport import WeaviateGrpcTransport
+from src.backend.weaviate.vector_manager_base import (  # re-exported for existing importers
+    CHUNK_PROPERTIES, CHUNK_ID_NAMESPACE, VectorManagerBase, chunk_object_id
+)
 
 from src.backend.lib.logging_config import get_primitivechat_logger
 
@@ -14,7 +16,19 @@ from src.backend.lib.logging_config import get_primitivechat_logger
 #config logging
 logger = get_primitivechat_logger(__name__)
 
-class WeaviateManager(metaclass=Singleton):
+
+def multi_tenant_class_schema(class_name):
+    """Schema of the single class holding every customer's chunks, one tenant per customer_guid."""
+    return {
+        "class": class_name,
+        "description": "Schema for storing semantic chunks of all customers, one tenant per customer",
+        "multiTenancyConfig": {"enabled": True, "autoTenantCreation": True, "autoTenantActivation": True},
+        "properties": CHUNK_PROPERTIES,
+    }
+
+class WeaviateManager(VectorManagerBase):
+    """Vector store on a Weaviate server, over REST/GraphQL or gRPC, optionally with one tenant per customer."""
+
     def __init__(self):
 
         try:
@@ -26,26 +40,128 @@ class WeaviateManager(metaclass=Singleton):
 
             self.client = Client(f"http://{weaviate_host}:{weaviate_port}")
             logger.info("Successfully connected to Weaviate")
-            self.model = self.load_model()
-            self.download = LocalFileDownloadAndUpload()
+            # Queries and batch imports go over REST/GraphQL ("rest") or gRPC ("grpc"); schema calls always use REST
+            self.transport = os.getenv('WEAVIATE_TRANSPORT', 'rest').lower()
+            self.grpc = None
+            if self.transport == 'grpc':
+                self.grpc = WeaviateGrpcTransport(weaviate_host, weaviate_port, os.getenv('WEAVIATE_GRPC_PORT', 50051))
+            # One multi-tenant class with a tenant per customer instead of a class per customer
+            self.multi_tenancy = os.getenv('WEAVIATE_MULTI_TENANCY', 'false').lower() == 'true'
+            self.multi_tenant_class = os.getenv('WEAVIATE_MULTI_TENANT_CLASS', 'CustomerChunks')
+            self.tenant_idle_seconds = float(os.getenv('WEAVIATE_TENANT_IDLE_SECONDS', 900))
+            # Only one process (the API) deactivates idle tenants; the others just use them
+            self.tenant_reaper = os.getenv('WEAVIATE_TENANT_REAPER', 'false').lower() == 'true'
+            self._tenant_last_used = {}  # tenant -> time.monotonic() of the last use seen by this process
+            self._tenant_lock = threading.Lock()
+            if self.multi_tenancy:
+                self._init_multi_tenancy()
+            self._init_embedding()
         except Exception as e:
             logger.error(f"Failed to initialize Weaviate connection: {e}")
             raise e
 
-    def load_model(self):
-        try:
-            model_dir = os.getenv('MODEL_DIR')  # Get the model path from env variable
-            logger.info(f"Loading model from {model_dir}...")
-            return SentenceTransformer(model_dir)  # Load model from saved path
-        except Exception as e:
-            logger.error(f"Error loading model: {e}")
-            raise e
+    def _hybrid_query(self, class_name, properties, question, alpha, vector, additional=None, limit=None, tenant=None):
+        """Hybrid search over the configured transport; returns the GraphQL result shape."""
+        if self.grpc is not None:
+            return self.grpc.hybrid(class_name, properties, question, alpha, vector, additional, limit, tenant)
+        query = self.client.query.get(class_name, properties).with_hybrid(query=question, alpha=alpha, vector=vector)
+        if tenant:
+            query = query.with_tenant(tenant)
+        if additional:
+            query = query.with_additional(additional)
+        if limit:
+            query = query.with_limit(limit)
+        return query.do()
+
+    def _filtered_query(self, class_name, properties, where_filter, limit, tenant=None, additional=None, offset=None):
+        """Where-filtered fetch over the configured transport; returns the GraphQL result shape."""
+        if self.grpc is not None:
+            return self.grpc.fetch(class_name, properties, where_filter, limit, additional=additional, tenant=tenant,
+                                   offset=offset)
+        query = self.client.query.get(class_name, properties).with_where(where_filter).with_limit(limit)
+        if additional:
+            query = query.with_additional(additional)
+        if offset:
+            query = query.with_offset(offset)
+        if tenant:
+            query = query.with_tenant(tenant)
+        return query.do()
+
+    def _init_multi_tenancy(self):
+        """Create the multi-tenant class if needed and, in the reaper process, start the idle tenant reaper."""
+        if not self.client.schema.exists(self.multi_tenant_class):
+            self.client.schema.create_class(multi_tenant_class_schema(self.multi_tenant_class))
+            logger.info(f"Multi-tenant schema '{self.multi_tenant_class}' created successfully!")
+        logger.info(f"Multi-tenancy enabled on '{self.multi_tenant_class}' (tenant reaper: {self.tenant_reaper})")
+        if self.tenant_reaper and self.tenant_idle_seconds > 0:
+            threading.Thread(target=self._deactivate_idle_tenants_loop, name="weaviate-tenant-reaper", daemon=True).start()
+
+    def _target(self, customer_guid):
+        """
+        Return (class_name, tenant) holding the customer's chunks. In multi-tenancy mode the
+        tenant is marked as used; a COLD tenant is reactivated by Weaviate (autoTenantActivation).
+        """
+        if not self.multi_tenancy:
+            return self.generate_weaviate_class_name(customer_guid), None
+        with self._tenant_lock:
+            self._tenant_last_used[customer_guid] = time.monotonic()
+        return self.multi_tenant_class, customer_guid
+
+    def _set_tenant_status(self, tenants, status):
+        from weaviate.schema.crud_schema import Tenant
+
+        self.client.schema.update_class_tenants(
+            self.multi_tenant_class, [Tenant(name=tenant, activity_status=status) for tenant in tenants])
 
-    def generate_weaviate_class_name(self,customer_guid):
+    def deactivate_idle_tenants(self):
+        """
+        Set HOT tenants unused for WEAVIATE_TENANT_IDLE_SECONDS to COLD so their indexes leave memory.
+        Tenants activated by other processes count as used from the moment they are first seen HOT.
+        """
+        from weaviate.schema.crud_schema import TenantActivityStatus
+
+        hot = [tenant.name for tenant in self.client.schema.get_class_tenants(self.multi_tenant_class)
+               if tenant.activity_status == TenantActivityStatus.HOT]
+        now = time.monotonic()
+        with self._tenant_lock:
+            idle = [tenant for tenant in hot if self._tenant_last_used.setdefault(tenant, now) < now - self.tenant_idle_seconds]
+            for tenant in idle:
+                del self._tenant_last_used[tenant]
+        if not idle:
+            return []
+        # Outside the lock: searches and inserts do not wait for this call
+        self._set_tenant_status(idle, TenantActivityStatus.COLD)
+        logger.info(f"Deactivated {len(idle)} idle tenants")
+        return idle
+
+    def _deactivate_idle_tenants_loop(self):
+        while True:
+            time.sleep(min(self.tenant_idle_seconds / 4, 60))
+            try:
+                self.deactivate_idle_tenants()
+            except Exception as e:
+                logger.error(f"Deactivating idle tenants failed: {e}")
+
+    def add_weaviate_customer_tenant(self, customer_guid):
+        """Add the customer's tenant to the multi-tenant class."""
+        try:
+            existing = {tenant.name for tenant in self.client.schema.get_class_tenants(self.multi_tenant_class)}
+            if customer_guid in existing:
+                logger.info(f"Tenant '{customer_guid}' already exists, skipping creation.")
+                return "schema already exists"
+            from weaviate.schema.crud_schema import Tenant
 
-        return f"Customer_{customer_guid.replace('-', '_')}"
+            self.client.schema.add_class_tenants(self.multi_tenant_class, [Tenant(name=customer_guid)])
+            with self._tenant_lock:
+                self._tenant_last_used[customer_guid] = time.monotonic()
+            logger.info(f"Tenant '{customer_guid}' created successfully!")
+        except Exception as e:
+            logger.error(f"Unexpected error creating tenant '{customer_guid}': {e}")
+            return f"Unexpected error:{e}"
 
     def add_weaviate_customer_class(self,customer_guid):
+        if self.multi_tenancy:
+            return self.add_weaviate_customer_tenant(customer_guid)
         try:
             class_name = self.generate_weaviate_class_name(customer_guid)
             
@@ -55,44 +171,7 @@ class WeaviateManager(metaclass=Singleton):
                 schema_obj = {
                     "class": class_name,
                     "description": "Schema for storing semantic chunks of a customer" + customer_guid,
-                    "properties":[
-                        {
-                            "name": "text",
-                            "dataType": ["text"],
-                            "description": "The chunked text content from the document.",
-                            "indexInverted": True
-                        },
-                        {
-                            "name": "chunk_number",
-                            "dataType": ["int"],
-                            "description": "An object containing metadata like chunk number",
-                            "indexInverted": False
-                        },
-                        {
-                            "name": "page_numbers",
-                            "dataType": ["int[]"],
-                            "description": "An object containing metadata like page number",
-                            "indexFilterable": True
-                        },
-                        {
-                            "name": "customer_guid",
-                            "dataType": ["text"],
-                            "description": "A unique identifier for the customer (namespace-like isolation).",
-                            "indexInverted": True
-                        },
-                        {
-                            "name": "filename",
-                            "dataType": ["text"],
-                            "description": "The name of the file this chunk originates from.",
-                            "indexInverted": True
-                        },
-                        {
-                            "name": "max_page",
-                            "dataType": ["int"],
-                            "description": "Maximum page number in this file.",
-                            "indexFilterable": True
-                        }
-                    ]
+                    "properties": CHUNK_PROPERTIES
                 }
                 self.client.schema.create_class(schema_obj)
                 logger.info(f"Schema '{class_name}' created successfully!")
@@ -106,243 +185,48 @@ class WeaviateManager(metaclass=Singleton):
             logger.error(f"Unexpected error:{e}")
             return f"Unexpected error:{e}"
 
-    def insert_data(self, customer_guid: str, file_path: str):
-        try:
-            # Ensure the class schema is created before inserting data
-            class_names = self.generate_weaviate_class_name(customer_guid)
-
-            # Download and save file locally
-            local_path = self.download.download_and_save_file(customer_guid, file_path)
-
-            filename = os.path.basename(file_path).replace(".chunked.txt", "")
-
-            # Remove embeddings for the file and start fresh embedding
-            self.delete_objects_by_customer_and_filename(customer_guid, filename)
-
-            # Read and validate data
-            with open(local_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-
-            if not isinstance(data, list):
-                raise ValueError("Invalid JSON format: Expected a list of objects.")
-
-            # 🔹 Compute max page number
-            max_page_for_file = 0
-            for entry in data:
-                metadata = entry.get("metadata", {})
-                pages = metadata.get("page_numbers", [])
-                if pages:
-                    max_page_for_file = max(max_page_for_file, max(pages))
-
-            logger.info(f"Max page for file '{filename}' is {max_page_for_file}")
-
-            batch_size = 100
-            self.client.batch.configure(batch_size=batch_size)
-
-            # Process data in batches
-            for i in range(0, len(data), batch_size):
-                batch_data = data[i:i + batch_size]
-
-                texts = [entry["text"].strip() for entry in batch_data if "text" in entry and "metadata" in entry]
-                embeddings = self.model.encode(texts).tolist()
-
-                with self.client.batch as batch:
-                    for entry, embedding in zip(batch_data, embeddings):
-                        metadata = entry["metadata"]
-                        if not metadata.get("filename"):
-                            raise ValueError(f"Missing filename in metadata for entry {i + batch_data.index(entry)}")
-
-                        chunk_data = {
-                            "text": entry["text"].strip(),
-                            "customer_guid": customer_guid,
-                            "filename": metadata["filename"],
-                            "chunk_number": metadata["chunk_number"],
-                            "page_numbers": metadata["page_numbers"],
-                            "max_page": max_page_for_file
-                        }
-
-                        batch.add_data_object(chunk_data, class_name=class_names, vector=embedding)
-
-                logger.info(f"Processed batch {batch_size} for {class_names}")
-
-            logger.info(f"Bulk data inserted for {class_names} successfully!")
-
-            # 🔹 Optionally store the max_page_for_file in a separate metadata object
-            # Example (if you've added `max_page` field to schema):
-            # self.client.data_object.create({
-            #     "filename": filename,
-            #     "customer_guid": customer_guid,
-            #     "max_page": max_page_for_file
-            # }, class_name=class_names)
-
-        except Exception as e:
-            logger.error(f"Unexpected error inserting data for {customer_guid}: {e}")
-            raise e
-
-    def search_query(self, customer_guid, question, alpha=0.5):
-        try:
-            # Get the query vector for the question
-            query_vector = self.model.encode(question).tolist()
-
-            class_names=self.generate_weaviate_class_name(customer_guid)
-
-            # Perform the query with the provided vector
-            result = self.client.query.get(
-               class_names, ["text", "chunk_number", "page_numbers", "filename", "customer_guid"]
-            ).with_hybrid(query=question, alpha=alpha, vector=query_vector).do()
-
-            if not result or "data" not in result or "Get" not in result["data"]:
-                raise ValueError(f"Unexpected search result format: {result}")
-
-            if class_names not in result["data"]["Get"]:
-                raise ValueError(f"No results found for customer: {class_names}")
-
-            for obj in result["data"]["Get"][class_names]:
-                if obj["customer_guid"] != customer_guid:
-                    raise ValueError("Internal server error: Customer GUID mismatch detected!")
-
-            logger.info(f"Search query successful for {customer_guid} with query '{question}'")
-            return result
-
-        except Exception as e:
-            logger.error(f"Unexpected error in search query for {customer_guid}: {e}")
-            raise e
-
-    def search_query_advanced(self, customer_guid: str, question: str, top_k: int = 3, alpha: float = 0.5):
-        """Return extended context for a question using page level retrieval.
-
-        This method performs a hybrid search in Weaviate to obtain candidate
-        chunks, re-ranks them using cosine similarity with the loaded embedding
-        model and then expands the highest ranked chunks to their full page
-        context (including neighbouring pages).  The combined context for the
-        top ranked chunks is returned in a JSON serialisable format.
-        """
-        try:
-            logger.info(
-                f"[ADVANCED SEARCH] Query: '{question}' | customer_guid: {customer_guid} | top_k: {top_k} | alpha: {alpha}")
-            query_embedding = self.model.encode(question)
-            query_vector = query_embedding.tolist()
-            class_name = self.generate_weaviate_class_name(customer_guid)
-
-            raw_result = (
-                self.client.query.get(
-                    class_name,
-                    ["text", "chunk_number", "page_numbers", "filename", "customer_guid", "max_page"],
-                )
-                .with_hybrid(query=question, alpha=alpha, vector=query_vector)
-                .with_additional(["distance"])
-                .with_limit(max(top_k * 2, 10))
-                .do()
+    def _cursor_query(self, class_name, properties, limit, after=None, tenant=None):
+        """One page of every object of a class or tenant in id order, starting after the id `after`."""
+        if self.grpc is not None:
+            return self.grpc.fetch(class_name, properties, None, limit, additional=["id"], tenant=tenant, after=after)
+        query = self.client.query.get(class_name, properties).with_additional(["id"]).with_limit(limit)
+        if after:
+            query = query.with_after(after)
+        if tenant:
+            query = query.with_tenant(tenant)
+        return query.do()
+
+    def _upsert_objects(self, class_name, tenant, chunks, vectors, batch_size):
+        """Write (object_id, properties) pairs with their vectors; an existing object with the same id is replaced."""
+        ids = [object_id for object_id, _ in chunks]
+        objects = [properties for _, properties in chunks]
+        if self.grpc is not None:
+            self.grpc.insert_objects(class_name, objects, vectors, batch_size=batch_size, tenant=tenant, uuids=ids)
+            return
+        self.client.batch.configure(batch_size=batch_size)
+        with self.client.batch as batch:
+            for object_id, chunk_data, vector in zip(ids, objects, vectors):
+                batch.add_data_object(chunk_data, class_name=class_name, uuid=object_id, vector=vector, tenant=tenant)
+
+    def _delete_object_ids(self, class_name, tenant, object_ids, batch_size=100):
+        """Delete objects by id; raises if Weaviate could not delete all of them."""
+        for i in range(0, len(object_ids), batch_size):
+            response = self.client.batch.delete_objects(
+                class_name=class_name,
+                tenant=tenant,
+                where={"path": ["id"], "operator": "ContainsAny", "valueTextArray": object_ids[i:i + batch_size]}
             )
-
-            if not raw_result or "data" not in raw_result or "Get" not in raw_result["data"]:
-                logger.error(f"[ADVANCED SEARCH] Unexpected search result format: {raw_result}")
-                raise ValueError(f"Unexpected search result format: {raw_result}")
-
-            if class_name not in raw_result["data"]["Get"]:
-                logger.warning(f"[ADVANCED SEARCH] No results found for customer: {class_name}")
-                return {"results": []}
-
-            candidates = raw_result.get("data", {}).get("Get", {}).get(class_name, [])
-            if not candidates:
-                logger.warning(f"[ADVANCED SEARCH] No candidates found for customer: {class_name}")
-                return {"results": []}
-
-            for obj in candidates:
-                if obj.get("customer_guid") != customer_guid:
-                    logger.error("[ADVANCED SEARCH] Customer GUID mismatch detected!")
-                    raise ValueError("Internal server error: Customer GUID mismatch detected!")
-            # Re-rank candidates
-            candidate_texts = [c.get("text", "") for c in candidates]
-            candidate_vectors = self.model.encode(candidate_texts)
-            scores = cosine_similarity([query_embedding], candidate_vectors)[0]
-            for cand, score in zip(candidates, scores):
-                cand["relevance_score"] = float(score)
-
-            ranked = sorted(candidates, key=lambda x: x["relevance_score"], reverse=True)[:top_k]
-
-            # New: Extract max_page directly from candidates
-            page_count_cache = {}
-            for item in ranked:
-                filename = item["filename"]
-                max_page = item.get("max_page", 0)
-                if filename not in page_count_cache or max_page > page_count_cache[filename]:
-                    page_count_cache[filename] = max_page
-
-
-            def fetch_page_chunks(pages, filename):
-                where_filter = {
-                    "operator": "And",
-                    "operands": [
-                        {"path": ["filename"], "operator": "Equal", "valueText": filename},
-                        {"path": ["page_numbers"], "operator": "ContainsAny", "valueInt": list(pages)},
-                    ],
-                }
-                res = self.client.query.get(
-                    class_name,
-                    ["text", "chunk_number", "page_numbers", "filename"],
-                ).with_where(where_filter).with_limit(100).do()
-
-                return res.get("data", {}).get("Get", {}).get(class_name) or []
-
-            def safe_min_page(chunk):
-                pages = chunk.get("page_numbers", [])
-                return min(pages) if pages else 0
-
-            page_count_cache = {}
-            for item in ranked:
-                filename = item["filename"]
-                max_page = item.get("max_page", 0)
-                if filename not in page_count_cache or max_page > page_count_cache[filename]:
-                    page_count_cache[filename] = max_page
-            logger.info(f"[ADVANCED SEARCH] Page count cache: {page_count_cache}")
-            
-            final_results = []
-            for idx, item in enumerate(ranked, start=1):
-                pages = item.get("page_numbers", [])
-                filename = item["filename"]
-                logger.info(f"Rank {idx} → Expanding page: {pages} (file: {filename})")
-                page_count = page_count_cache.get(filename, 0)
-                logger.info(f"[ADVANCED SEARCH] Processing file: {filename}, page_count: {page_count}, pages: {pages}")
-
-                expanded_pages = set()
-                logger.info(f"Rank {idx} → Expanded pages: {expanded_pages}, page_count={page_count}")
-
-                for page in pages:
-                    if page_count == 1:
-                        expanded_pages.update([1])
-                    elif page == 1:
-                        expanded_pages.update([1, 2, 3][:page_count])
-                    elif page == page_count:
-                        expanded_pages.update([p for p in [page_count - 2, page_count - 1, page_count] if p >= 1])
-                    else:
-                        expanded_pages.update([p for p in [page - 1, page, page + 1] if 1 <= p <= page_count])
-
-                chunks = fetch_page_chunks(sorted(expanded_pages), filename)
-                chunks.sort(key=lambda c: (safe_min_page(c), c.get("chunk_number", 0)))
-                combined_text = " ".join(c.get("text", "") for c in chunks)
-
-                final_results.append({
-                    "rank": idx,
-                    "relevance_score": item["relevance_score"],
-                    "filename": filename,
-                    "page_numbers": sorted(expanded_pages),
-                    "text": combined_text,
-                })
-
-                logger.info(f"[ADVANCED SEARCH] Final result {idx}: file={filename}, pages={sorted(expanded_pages)}")
-
-            return {"results": final_results}
-
-        except Exception as e:
-            logger.error(f"Unexpected error in advanced search query: {e}")
-            raise
+            failed = response.get("results", {}).get("failed", 0)
+            if failed:
+                logger.error(f"Failed to delete {failed} stale objects from {class_name}: {response['results']}")
+                raise RuntimeError(f"Failed to delete {failed} stale objects from {class_name}")
 
     def delete_objects_by_customer_and_filename(self,customer_guid, filename):
         try:
-            class_name=self.generate_weaviate_class_name(customer_guid)
+            class_name, tenant = self._target(customer_guid)
             response = self.client.batch.delete_objects(
                 class_name=class_name,
+                tenant=tenant,
                 where={
                     "operator": "And",
                     "operands": [
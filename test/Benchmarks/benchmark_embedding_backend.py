@@ -0,0 +1,72 @@
+"""
+Report embedding throughput (sentences per second) of the torch, onnx and onnx-int8 backends.
+
+    python test/Benchmarks/benchmark_embedding_backend.py --model all-mpnet-base-v2 --threads 4
+
+Uses the same loader as WeaviateManager and SemanticChunkProcessor (EMBEDDING_BACKEND).
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+from src.backend.embedding.lib.model_loader import BACKENDS, load_embedding_model
+
+WORDS = ("invoice refund password account billing shipping laptop warranty login upgrade support ticket "
+         "customer order delivery payment subscription plan price device error").split()
+
+
+def make_sentences(rng, count, min_words, max_words):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))) for _ in range(count)]
+
+
+def measure(model, sentences, batch_size, repeats):
+    model.encode(sentences[:batch_size], batch_size=batch_size)  # warm-up
+    rates = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.encode(sentences, batch_size=batch_size)
+        rates.append(len(sentences) / (time.perf_counter() - start))
+    return statistics.median(rates)
+
+
+def measure_single(model, sentences, repeats):
+    """Batch size 1, as a /chat query is encoded."""
+    samples = []
+    for sentence in sentences[:repeats]:
+        start = time.perf_counter()
+        model.encode(sentence)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.getenv("MODEL_DIR") or "all-mpnet-base-v2")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--sentences", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="EMBEDDING_INTRA_OP_THREADS (0 = runtime default)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ["EMBEDDING_INTRA_OP_THREADS"] = str(args.threads)
+    rng = random.Random(args.seed)
+    sentences = make_sentences(rng, args.sentences, 8, 60)
+
+    print(f"model={args.model} sentences={args.sentences} batch_size={args.batch_size} threads={args.threads or 'default'}")
+    baseline = None
+    for backend in args.backends.split(","):
+        model = load_embedding_model(args.model, backend=backend)
+        rate = measure(model, sentences, args.batch_size, args.repeats)
+        single = measure_single(model, sentences, 50)
+        baseline = baseline or rate
+        print(f"{backend:>10} (runtime {getattr(model, 'backend', 'torch')}) | {rate:8.1f} sentences/s ({rate / baseline:4.2f}x) | single query {single * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Compare the REST/GraphQL and gRPC Weaviate transports of WeaviateManager.
+
+For each transport the script imports the same synthetic chunks into a throw-away class,
+then times hybrid searches (with stored vectors, as in search_query_advanced) and the
+where-filtered page fetch. Needs WEAVIATE_HOST, WEAVIATE_PORT and WEAVIATE_GRPC_PORT.
+
+    python test/Benchmarks/benchmark_weaviate_transport.py --objects 2000 --queries 200
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import statistics
+
+from weaviate import Client
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+from src.backend.weaviate.grpc_transport import WeaviateGrpcTransport
+
+PROPERTIES = ["text", "chunk_number", "page_numbers", "filename", "customer_guid", "max_page"]
+WORDS = "invoice refund password account billing shipping laptop warranty login upgrade".split()
+
+
+class RestTransport:
+    """The v3 client calls WeaviateManager makes when WEAVIATE_TRANSPORT=rest."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def insert_objects(self, class_name, objects, vectors, batch_size=100):
+        self.client.batch.configure(batch_size=batch_size)
+        with self.client.batch as batch:
+            for properties, vector in zip(objects, vectors):
+                batch.add_data_object(properties, class_name=class_name, vector=vector)
+
+    def hybrid(self, class_name, properties, question, alpha, vector, additional=None, limit=None):
+        return (self.client.query.get(class_name, properties)
+                .with_hybrid(query=question, alpha=alpha, vector=vector)
+                .with_additional(additional).with_limit(limit).do())
+
+    def fetch(self, class_name, properties, where, limit=None):
+        return self.client.query.get(class_name, properties).with_where(where).with_limit(limit).do()
+
+
+def random_vector(rng, dimensions):
+    return [rng.uniform(-1, 1) for _ in range(dimensions)]
+
+
+def make_objects(rng, count, dimensions, customer_guid):
+    objects, vectors = [], []
+    for i in range(count):
+        page = i // 5 + 1
+        objects.append({
+            "text": " ".join(rng.choice(WORDS) for _ in range(60)),
+            "customer_guid": customer_guid,
+            "filename": f"file_{i % 4}.pdf",
+            "chunk_number": i,
+            "page_numbers": [page],
+            "max_page": count // 5 + 1,
+        })
+        vectors.append(random_vector(rng, dimensions))
+    return objects, vectors
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def timed(calls, fn):
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(name, transport, rest_client, objects, vectors, queries):
+    class_name = f"Benchmark_{name}_{uuid.uuid4().hex[:8]}"
+    rest_client.schema.create_class({
+        "class": class_name,
+        "vectorizer": "none",
+        "properties": [
+            {"name": "text", "dataType": ["text"]},
+            {"name": "chunk_number", "dataType": ["int"]},
+            {"name": "page_numbers", "dataType": ["int[]"]},
+            {"name": "customer_guid", "dataType": ["text"]},
+            {"name": "filename", "dataType": ["text"]},
+            {"name": "max_page", "dataType": ["int"]},
+        ],
+    })
+    try:
+        start = time.perf_counter()
+        transport.insert_objects(class_name, objects, vectors)
+        import_seconds = time.perf_counter() - start
+
+        search = timed(queries, lambda question, vector: transport.hybrid(
+            class_name, PROPERTIES, question, 0.5, vector, additional=["distance", "vector"], limit=10))
+        where = {"operator": "Or", "operands": [
+            {"operator": "And", "operands": [
+                {"path": ["filename"], "operator": "Equal", "valueText": f"file_{i}.pdf"},
+                {"path": ["page_numbers"], "operator": "ContainsAny", "valueInt": [1, 2, 3]},
+            ]} for i in range(3)]}
+        fetch = timed([()] * len(queries), lambda: transport.fetch(class_name, PROPERTIES[:4], where, 300))
+    finally:
+        rest_client.schema.delete_class(class_name)
+
+    print(f"{name:>5} | import {len(objects) / import_seconds:9.0f} obj/s | "
+          f"hybrid p50 {statistics.median(search) * 1000:7.2f} ms p95 {percentile(search, 0.95) * 1000:7.2f} ms | "
+          f"fetch p50 {statistics.median(fetch) * 1000:7.2f} ms p95 {percentile(fetch, 0.95) * 1000:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, default=384, help="384 matches all-MiniLM-L6-v2, the model at MODEL_DIR")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    host = os.getenv("WEAVIATE_HOST", "localhost")
+    port = os.getenv("WEAVIATE_PORT", "8080")
+    grpc_port = os.getenv("WEAVIATE_GRPC_PORT", "50051")
+
+    rng = random.Random(args.seed)
+    objects, vectors = make_objects(rng, args.objects, args.dimensions, str(uuid.uuid4()))
+    queries = [(" ".join(rng.choice(WORDS) for _ in range(6)), random_vector(rng, args.dimensions))
+               for _ in range(args.queries)]
+
+    rest_client = Client(f"http://{host}:{port}")
+    grpc_transport = WeaviateGrpcTransport(host, port, grpc_port)
+    try:
+        print(f"{args.objects} objects, {args.queries} queries, {args.dimensions} dimensions")
+        run("rest", RestTransport(rest_client), rest_client, objects, vectors, queries)
+        run("grpc", grpc_transport, rest_client, objects, vectors, queries)
+    finally:
+        grpc_transport.close()
+
+
+if __name__ == "__main__":
+    main()
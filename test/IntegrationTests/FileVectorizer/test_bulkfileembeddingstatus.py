@@ -0,0 +1,175 @@
+import logging
+import os
+import unittest
+import requests
+import sys
+import uuid
+from http import HTTPStatus
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+from utils.api_utils import add_customer, create_test_token, create_token_without_org_id, create_token_without_org_role
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+class TestBulkFileEmbeddingStatusAPI(unittest.TestCase):
+    BASE_URL = f"http://{os.getenv('CHAT_SERVICE_HOST')}:{os.getenv('CHAT_SERVICE_PORT')}"
+
+    def setUp(self):
+        """Setup function to initialize customer, token, and upload files to get valid file_ids."""
+        logger.info(f"=== Starting setup process for test: {self._testMethodName} ===")
+
+        # Initialize customer and token
+        customer_data = add_customer("test_org")
+        self.org_id = customer_data.get("org_id")
+        self.token = create_test_token(org_id=self.org_id, org_role="org:admin")
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+        self.url = f"{self.BASE_URL}/files/embeddingstatus"
+
+        # Upload files to get valid file_ids
+        self.valid_file_ids = []
+        for i in range(1, 6):
+            unique_filename = f"testfile_{uuid.uuid4().hex}.txt"
+            files = {"file": (unique_filename, b"Sample file content")}
+            upload_response = requests.post(f"{self.BASE_URL}/uploadFile", files=files, headers=self.headers)
+            self.assertEqual(upload_response.status_code, HTTPStatus.OK, f"File upload failed for file {i}")
+            self.valid_file_ids.append(upload_response.json().get("file_id"))
+
+        logger.info(f"=== Setup process completed for test: {self._testMethodName} ===")
+
+    def test_valid_file_ids_and_status(self):
+        """Test the API with valid file_ids and check the processing stage of each file."""
+        logger.info("Executing test_valid_file_ids_and_status")
+
+        response = requests.post(self.url, json={"file_ids": self.valid_file_ids}, headers=self.headers)
+        logger.info(f"Received response status code: {response.status_code}")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK, f"Expected status code 200 but got {response.status_code}")
+
+        data = response.json()
+        logger.info(f"Response data: {data}")
+
+        self.assertEqual([file["file_id"] for file in data["files"]], self.valid_file_ids, "File order does not match request order")
+        self.assertEqual(data["not_found_file_ids"], [], "No file_ids should be reported as missing")
+        for file in data["files"]:
+            self.assertIn("filename", file, "'filename' not found in file entry")
+            self.assertIn(file["processing_stage"],
+                          ["EXTRACTING", "CHUNKING", "EMBEDDING", "SUCCESS", "FILE_EMBEDDING_FAILED"],
+                          f"Unexpected processing stage: {file['processing_stage']}")
+
+    def test_bulk_status_matches_single_status(self):
+        """Test that the bulk API reports the same stage as the single file API."""
+        logger.info("Executing test_bulk_status_matches_single_status")
+
+        file_id = self.valid_file_ids[0]
+        single_response = requests.get(f"{self.BASE_URL}/file/{file_id}/embeddingstatus", headers=self.headers)
+        self.assertEqual(single_response.status_code, HTTPStatus.OK)
+
+        bulk_response = requests.post(self.url, json={"file_ids": [file_id]}, headers=self.headers)
+        self.assertEqual(bulk_response.status_code, HTTPStatus.OK)
+
+        bulk_file = bulk_response.json()["files"][0]
+        self.assertEqual(bulk_file["filename"], single_response.json()["filename"])
+
+    def test_mixed_valid_and_invalid_file_ids(self):
+        """Test that unknown file_ids are reported separately from the found files."""
+        logger.info("Executing test_mixed_valid_and_invalid_file_ids")
+
+        invalid_file_id = "invalid-file-id"
+        response = requests.post(self.url, json={"file_ids": self.valid_file_ids + [invalid_file_id]}, headers=self.headers)
+        self.assertEqual(response.status_code, HTTPStatus.OK, f"Expected status code 200 but got {response.status_code}")
+
+        data = response.json()
+        self.assertEqual(len(data["files"]), len(self.valid_file_ids))
+        self.assertEqual(data["not_found_file_ids"], [invalid_file_id])
+
+    def test_duplicate_file_ids(self):
+        """Test that duplicate file_ids are returned only once."""
+        logger.info("Executing test_duplicate_file_ids")
+
+        file_id = self.valid_file_ids[0]
+        response = requests.post(self.url, json={"file_ids": [file_id, file_id]}, headers=self.headers)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.json()["files"]), 1)
+
+    def test_file_ids_of_other_customer(self):
+        """Test that file_ids belonging to another customer are not resolved."""
+        logger.info("Executing test_file_ids_of_other_customer")
+
+        other_customer = add_customer("test_org")
+        other_token = create_test_token(org_id=other_customer.get("org_id"), org_role="org:admin")
+        other_headers = {'Authorization': f'Bearer {other_token}'}
+
+        response = requests.post(self.url, json={"file_ids": self.valid_file_ids}, headers=other_headers)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        data = response.json()
+        self.assertEqual(data["files"], [])
+        self.assertEqual(data["not_found_file_ids"], self.valid_file_ids)
+
+    def test_empty_file_ids(self):
+        """Test the API with an empty list of file_ids."""
+        logger.info("Executing test_empty_file_ids")
+
+        response = requests.post(self.url, json={"file_ids": []}, headers=self.headers)
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(response.json()["detail"], "file_ids must not be empty")
+
+    def test_too_many_file_ids(self):
+        """Test the API with more file_ids than allowed in one request."""
+        logger.info("Executing test_too_many_file_ids")
+
+        file_ids = [str(uuid.uuid4()) for _ in range(501)]
+        response = requests.post(self.url, json={"file_ids": file_ids}, headers=self.headers)
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_missing_file_ids(self):
+        """Test the API without the file_ids field in the body."""
+        logger.info("Executing test_missing_file_ids")
+
+        response = requests.post(self.url, json={}, headers=self.headers)
+        self.assertEqual(response.status_code, HTTPStatus.UNPROCESSABLE_ENTITY)
+
+    def test_bulk_status_without_token(self):
+        logger.info("Executing test_bulk_status_without_token")
+
+        response = requests.post(self.url, json={"file_ids": self.valid_file_ids})
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        self.assertEqual(response.json().get("detail"), "Authentication required")
+
+    def test_bulk_status_token_without_org_role(self):
+        logger.info("Testing bulk embeddingstatus API with a token missing org_role")
+
+        headers = {'Authorization': f'Bearer {create_token_without_org_role(self.org_id)}'}
+        response = requests.post(self.url, json={"file_ids": self.valid_file_ids}, headers=headers)
+
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN, "Expected status code 403 for missing org_role")
+        self.assertEqual(response.json()["detail"], "Forbidden: Insufficient role", "Unexpected error message")
+
+    def test_bulk_status_token_without_org_id(self):
+        logger.info("Testing bulk embeddingstatus API with a token missing org_id")
+
+        headers = {'Authorization': f'Bearer {create_token_without_org_id("org:admin")}'}
+        response = requests.post(self.url, json={"file_ids": self.valid_file_ids}, headers=headers)
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST, "Expected status code 400 for missing org_id")
+        self.assertEqual(response.json()["detail"], "Org ID not found in token", "Unexpected error message")
+
+    def test_bulk_status_no_mapping_customer_guid(self):
+        logger.info("Testing bulk embeddingstatus API with no mapping between org_id and customer_guid")
+
+        token = create_test_token(org_id="unmapped_org_id", org_role="org:admin")
+        headers = {'Authorization': f'Bearer {token}'}
+        response = requests.post(self.url, json={"file_ids": self.valid_file_ids}, headers=headers)
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND, "Expected status code 404 for unmapped org_id")
+        self.assertEqual(response.json()["detail"], "Invalid customer_guid provided", "Unexpected error message")
+
+    def tearDown(self):
+        """Teardown function to log the completion of the test case."""
+        logger.info(f"=== Finished execution of test: {self._testMethodName} ===")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import time
+import unittest
+import requests
+from http import HTTPStatus
+
+# Ensure the utils directory is in the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+from utils.api_utils import add_customer, create_test_token
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+logger = get_primitivechat_logger(__name__)
+
+
+class TestCreateTicketByConversationAsyncAPI(unittest.TestCase):
+    BASE_URL = f"http://{os.getenv('CHAT_SERVICE_HOST')}:{os.getenv('CHAT_SERVICE_PORT')}"
+    ORG_ROLE = 'org:admin'
+
+    @staticmethod
+    def use_llm_response(use_llm: bool, llmprovider: str = None, model: str = None):
+        url = f"{TestCreateTicketByConversationAsyncAPI.BASE_URL}/llm_service/use_llm_response"
+        payload = {"use_llm": use_llm}
+        if llmprovider:
+            payload["llmprovider"] = llmprovider
+        if model:
+            payload["model"] = model
+        res = requests.post(url, json=payload)
+        res.raise_for_status()
+        return res.json()
+
+    def setUp(self):
+        logger.info(f"=== Setting up test environment for {self._testMethodName} ===")
+        customer_data = add_customer("test_org")
+        self.customer_guid = customer_data.get("customer_guid")
+        self.org_id = customer_data.get("org_id")
+        self.token = create_test_token(org_id=self.org_id, org_role=self.ORG_ROLE)
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+        self.use_llm_response(use_llm=False)
+        response = requests.post(f"{self.BASE_URL}/chat", json={"question": "My laptop is broken."}, headers=self.headers)
+        self.assertEqual(response.status_code, HTTPStatus.OK, f"Failed to create chat. Response: {response.text}")
+        self.chat_id = response.json().get("chat_id")
+
+        # The MOCK provider keeps the test independent of external LLMs
+        self.use_llm_response(use_llm=True, llmprovider="MOCK", model="mock")
+
+    def tearDown(self):
+        self.use_llm_response(use_llm=False)
+
+    def _submit(self, chat_id):
+        url = f"{self.BASE_URL}/create_ticket_by_conversation/async?message_count=20"
+        return requests.post(url, json={"chat_id": chat_id, "reported_by": "test_user"}, headers=self.headers)
+
+    def _wait_for_job(self, job_id, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            response = requests.get(f"{self.BASE_URL}/ticket_jobs/{job_id}", headers=self.headers)
+            self.assertEqual(response.status_code, HTTPStatus.OK, f"Polling failed: {response.text}")
+            job = response.json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.2)
+        self.fail(f"Ticket job {job_id} did not finish within {timeout}s")
+
+    def test_async_job_creates_ticket(self):
+        response = self._submit(self.chat_id)
+        self.assertEqual(response.status_code, HTTPStatus.ACCEPTED, f"API call failed: {response.text}")
+        job = response.json()
+        self.assertIn(job["status"], ["queued", "running", "completed"])
+        self.assertEqual(job["chat_id"], self.chat_id)
+
+        job = self._wait_for_job(job["job_id"])
+        self.assertEqual(job["status"], "completed", f"Job failed: {job.get('error')}")
+        self.assertIsInstance(job["ticket_id"], int)
+
+        ticket_response = requests.get(f"{self.BASE_URL}/tickets/{job['ticket_id']}", headers=self.headers)
+        self.assertEqual(ticket_response.status_code, HTTPStatus.OK)
+        self.assertEqual(ticket_response.json()["chat_id"], self.chat_id)
+
+    def test_duplicate_requests_are_coalesced(self):
+        first = self._submit(self.chat_id).json()
+        second = self._submit(self.chat_id).json()
+        if first["status"] in ("queued", "running") and not second["coalesced"]:
+            # The first job may have finished between the two requests
+            self.assertEqual(self._wait_for_job(first["job_id"])["status"], "completed")
+        elif second["coalesced"]:
+            self.assertEqual(second["job_id"], first["job_id"])
+        self._wait_for_job(second["job_id"])
+
+    def test_stream_job_status(self):
+        job = self._submit(self.chat_id).json()
+        response = requests.get(f"{self.BASE_URL}/ticket_jobs/{job['job_id']}/stream", headers=self.headers, stream=True)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        states = []
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith("data:"):
+                states.append(json.loads(line[len("data:"):].strip()))
+        self.assertTrue(states, "Expected at least one status event")
+        self.assertEqual(states[-1]["status"], "completed")
+        self.assertIsInstance(states[-1]["ticket_id"], int)
+
+    def test_failed_job_for_unknown_chat(self):
+        response = self._submit("non_existent_chat_id_12345")
+        self.assertEqual(response.status_code, HTTPStatus.ACCEPTED)
+        job = self._wait_for_job(response.json()["job_id"])
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("No messages found", job["error"])
+
+    def test_unknown_job_id(self):
+        response = requests.get(f"{self.BASE_URL}/ticket_jobs/does-not-exist", headers=self.headers)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import json
+import unittest
+
+import requests
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+from utils.api_utils import add_customer, create_test_token
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+# Constants
+ORG_ADMIN_ROLE = "org:admin"
+
+
+class TestMockLLMProvider(unittest.TestCase):
+    BASE_URL = f"http://{os.getenv('CHAT_SERVICE_HOST')}:{os.getenv('CHAT_SERVICE_PORT')}"
+
+    def use_llm_response(self, use_llm, llmprovider=None, model=None):
+        payload = {"use_llm": use_llm}
+        if llmprovider:
+            payload["llmprovider"] = llmprovider
+        if model:
+            payload["model"] = model
+        res = requests.post(f"{self.BASE_URL}/llm_service/use_llm_response", json=payload)
+        res.raise_for_status()
+        return res.json()
+
+    def setUp(self):
+        logger.info(f"=== Starting setUp process for {self._testMethodName} ===")
+        customer_data = add_customer("test_org")
+        self.customer_guid = customer_data["customer_guid"]
+        self.token = create_test_token(org_id=customer_data.get("org_id"), org_role=ORG_ADMIN_ROLE)
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+        res = self.use_llm_response(True, "MOCK", "mock")
+        logger.info(f"OUTPUT: Response from use_llm_response: {res}")
+        self.assertEqual(res["llmprovider"], "MOCK")
+        logger.info("=== setUp completed successfully ===\n")
+
+    def tearDown(self):
+        self.use_llm_response(False)
+
+    def test_switch_unregisters_previous_provider_health(self):
+        """After a switch only the active provider's endpoint is probed (unless listed in LLM_HEALTH_PROVIDERS)."""
+        if "OLLAMA" in os.getenv("LLM_HEALTH_PROVIDERS", "").upper():
+            self.skipTest("OLLAMA is monitored through LLM_HEALTH_PROVIDERS")
+        self.use_llm_response(True, "OLLAMA", os.getenv("OLLAMA_MODEL"))
+        providers = requests.get(f"{self.BASE_URL}/llm_service/provider_health").json()["providers"]
+        self.assertIn("OLLAMA", providers)
+
+        self.use_llm_response(True, "MOCK", "mock")
+        after = requests.get(f"{self.BASE_URL}/llm_service/provider_health").json()["providers"]
+        logger.info(f"OUTPUT: Monitored providers after the switch: {list(after)}")
+        self.assertNotIn("OLLAMA", after)
+        self.assertEqual(len(after), len(providers) - 1)
+
+    def test_mock_chat_answer(self):
+        """The MOCK provider answers /chat without any network LLM."""
+        question = "How do I reset my password?"
+        response = requests.post(f"{self.BASE_URL}/chat", json={"question": question}, headers=self.headers)
+        logger.info(f"OUTPUT: Chat response: {response.status_code} {response.text}")
+
+        self.assertEqual(response.status_code, 200)
+        answer = response.json()["answer"]
+        self.assertTrue(answer.startswith(f"Mock answer to: {question}"), f"Unexpected answer: {answer}")
+
+    def test_mock_chat_stream(self):
+        """Streaming through the MOCK provider yields several content chunks and a final stop chunk."""
+        response = requests.post(f"{self.BASE_URL}/chat", json={"question": "Stream please", "stream": True},
+                                 headers=self.headers, stream=True)
+        self.assertEqual(response.status_code, 200)
+
+        chunks = []
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunks.append(json.loads(data))
+
+        contents = [c["choices"][0]["delta"]["content"] for c in chunks if c["choices"][0]["delta"]["content"]]
+        self.assertGreater(len(contents), 1, "Expected the answer to be streamed in several chunks")
+        self.assertEqual(chunks[-1]["choices"][0]["finish_reason"], "stop")
+
+    def test_mock_ticket_by_conversation(self):
+        """The ticket extraction prompt gets valid JSON from the MOCK provider."""
+        chat = requests.post(f"{self.BASE_URL}/chat", json={"question": "My invoice is wrong"}, headers=self.headers)
+        self.assertEqual(chat.status_code, 200)
+        chat_id = chat.json()["chat_id"]
+
+        response = requests.post(f"{self.BASE_URL}/create_ticket_by_conversation",
+                                 json={"chat_id": chat_id, "reported_by": chat.json()["user_id"]},
+                                 headers=self.headers)
+        logger.info(f"OUTPUT: Ticket response: {response.status_code} {response.text}")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ticket_id", response.json())
+
+
+if __name__ == "__main__":
+    unittest.main()
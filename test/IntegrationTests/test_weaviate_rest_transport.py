@@ -0,0 +1,97 @@
+import io
+import os
+import json
+import uuid
+import unittest
+import importlib.util
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+# Runs inside a backend container (weaviate-client, sentence-transformers and minio installed), e.g.
+#   cd test/IntegrationTests && python -m unittest test_weaviate_rest_transport
+BACKEND_MODULES = ("weaviate", "sentence_transformers", "minio")
+MISSING_MODULES = [name for name in BACKEND_MODULES if importlib.util.find_spec(name) is None]
+
+FILENAME = "rest_transport_manual.pdf"
+CHUNKS = [
+    ("To reset your password, open the login page and choose 'Forgot password'.", [1]),
+    ("Refunds are processed within five business days after approval.", [2]),
+    ("The warranty covers manufacturing defects of the laptop battery for two years.", [2, 3]),
+]
+
+
+@unittest.skipIf(MISSING_MODULES, f"Backend dependencies not installed: {MISSING_MODULES}")
+class TestWeaviateRestTransport(unittest.TestCase):
+    """Ingest, search and delete through WeaviateManager over the v3 REST/GraphQL client (WEAVIATE_TRANSPORT=rest)."""
+
+    @classmethod
+    def setUpClass(cls):
+        # WeaviateManager reads its transport once, when the singleton is created
+        os.environ["WEAVIATE_TRANSPORT"] = "rest"
+        os.environ["WEAVIATE_MULTI_TENANCY"] = "false"
+        from src.backend.minio.minio_manager import MinioManager
+        from src.backend.weaviate.weaviate_manager import WeaviateManager
+
+        cls.manager = WeaviateManager()
+        cls.minio = MinioManager()
+
+    def setUp(self):
+        logger.info(f"=== Starting setUp process for {self._testMethodName} ===")
+        self.assertIsNone(self.manager.grpc)
+        self.customer_guid = str(uuid.uuid4())
+        self.class_name = self.manager.generate_weaviate_class_name(self.customer_guid)
+        self.minio.add_storage_bucket(self.customer_guid)
+        self.manager.add_weaviate_customer_class(self.customer_guid)
+        logger.info("=== setUp completed successfully ===\n")
+
+    def tearDown(self):
+        self.manager.client.schema.delete_class(self.class_name)
+        for name in self.minio.client.list_objects(self.customer_guid):
+            self.minio.client.remove_object(self.customer_guid, name.object_name)
+        self.minio.client.remove_bucket(self.customer_guid)
+
+    def upload_chunks(self, chunks):
+        """Upload a chunked file in the format produced by the chunker and return its object name."""
+        data = [{"text": text, "metadata": {"filename": FILENAME, "chunk_number": number, "page_numbers": pages}}
+                for number, (text, pages) in enumerate(chunks, start=1)]
+        object_name = f"{FILENAME}.chunked.txt"
+        self.minio.upload_file(self.customer_guid, object_name, io.BytesIO(json.dumps(data).encode("utf-8")))
+        return object_name
+
+    def stored_texts(self):
+        objects = self.manager._get_file_objects(self.class_name, None, self.customer_guid, FILENAME)
+        return sorted(properties["text"] for properties, _ in objects.values())
+
+    def test_insert_and_search(self):
+        counts = self.manager.insert_data(self.customer_guid, self.upload_chunks(CHUNKS))
+        self.assertEqual(counts["embedded"], len(CHUNKS))
+
+        result = self.manager.search_query(self.customer_guid, "How do I reset my password?")
+        rows = result["data"]["Get"][self.class_name]
+        logger.info(f"OUTPUT: Search rows: {rows}")
+        self.assertEqual(rows[0]["text"], CHUNKS[0][0])
+
+        advanced = self.manager.search_query_advanced(self.customer_guid, "battery warranty", top_k=1)
+        self.assertEqual(advanced["results"][0]["filename"], FILENAME)
+        self.assertNotIn("chunks", advanced["results"][0])
+
+    def test_reingest_removes_stale_chunks(self):
+        self.manager.insert_data(self.customer_guid, self.upload_chunks(CHUNKS))
+        counts = self.manager.insert_data(self.customer_guid, self.upload_chunks([CHUNKS[0], CHUNKS[2]]))
+        logger.info(f"OUTPUT: Re-ingestion counts: {counts}")
+
+        self.assertEqual(counts["embedded"], 0)
+        self.assertEqual(counts["deleted"], 1)
+        self.assertEqual(self.stored_texts(), sorted([CHUNKS[0][0], CHUNKS[2][0]]))
+
+    def test_delete_by_filename(self):
+        self.manager.insert_data(self.customer_guid, self.upload_chunks(CHUNKS))
+        self.manager.delete_objects_by_customer_and_filename(self.customer_guid, FILENAME)
+        self.assertEqual(self.stored_texts(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
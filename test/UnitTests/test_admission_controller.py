@@ -0,0 +1,67 @@
+import os
+import asyncio
+import unittest
+import importlib.util
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+REQUIRED_MODULES = ("prometheus_client", "sse_starlette")
+MISSING_MODULES = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+
+
+@unittest.skipIf(MISSING_MODULES, f"Admission controller dependencies not installed: {MISSING_MODULES}")
+class TestAdmissionSlots(unittest.TestCase):
+
+    def setUp(self):
+        from src.backend.chat_service.admission_controller import AdmissionController
+
+        os.environ["ADMISSION_ENABLED"] = "true"
+        os.environ["ADMISSION_MAX_CONCURRENT"] = "2"
+        AdmissionController._instances.pop(AdmissionController, None)
+        self.controller = AdmissionController()
+
+    def tearDown(self):
+        type(self.controller)._instances.pop(type(self.controller), None)
+
+    def test_release_twice_frees_one_slot(self):
+        async def run():
+            first = await self.controller.acquire("guid")
+            await self.controller.acquire("guid")
+            first.release()
+            first.release()
+            return self.controller.in_flight
+
+        self.assertEqual(asyncio.run(run()), 1)
+
+    def test_stream_never_iterated_releases_the_slot(self):
+        from src.backend.chat_service.admission_controller import AdmittedEventSourceResponse
+
+        started = []
+
+        async def answer():
+            started.append(True)
+            yield {"choices": []}
+
+        async def receive():
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            raise OSError("client went away")  # fails before the first event is sent
+
+        async def run():
+            ticket = await self.controller.acquire("guid")
+            response = AdmittedEventSourceResponse(self.controller.guard(ticket, answer()), ticket)
+            with self.assertRaises(OSError):
+                await response({"type": "http"}, receive, send)
+            return self.controller.in_flight
+
+        self.assertEqual(asyncio.run(run()), 0)
+        self.assertEqual(started, [])
+        self.assertEqual(self.controller.status()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+import importlib.util
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+REQUIRED_MODULES = ("numpy", "sentence_transformers", "onnxruntime", "optimum")
+MISSING_MODULES = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+MODEL_NAME = os.getenv("EMBEDDING_PARITY_MODEL", "all-mpnet-base-v2")
+
+SENTENCES = [
+    "How do I reset my password?",
+    "The invoice for March was charged twice to my credit card.",
+    "Our warranty covers manufacturing defects for two years from the date of purchase.",
+    "Contact support if the laptop does not boot after the firmware update.",
+    "Refunds are processed within five business days.",
+    "Shipping to Canada takes between seven and ten days.",
+    "a",
+    "Kindly note that the premium plan includes priority handling of tickets, a dedicated account "
+    "manager and a guaranteed first response within one hour during business hours.",
+]
+
+
+@unittest.skipIf(MISSING_MODULES, f"Embedding backend dependencies not installed: {MISSING_MODULES}")
+class TestEmbeddingBackendParity(unittest.TestCase):
+    """The ONNX backends must agree with the PyTorch outputs of the same model."""
+
+    @classmethod
+    def setUpClass(cls):
+        import numpy as np
+        from src.backend.embedding.lib.model_loader import load_embedding_model
+
+        cls.np = np
+        cls.cache_dir = tempfile.mkdtemp(prefix="onnx_parity_")
+        os.environ["EMBEDDING_ONNX_CACHE_DIR"] = cls.cache_dir
+        try:
+            cls.reference = load_embedding_model(MODEL_NAME, backend="torch").encode(SENTENCES)
+        except Exception as e:
+            raise unittest.SkipTest(f"Model {MODEL_NAME} could not be loaded: {e}")
+        cls.load_embedding_model = staticmethod(load_embedding_model)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.cache_dir, ignore_errors=True)
+
+    def _cosines(self, vectors):
+        np = self.np
+        reference = self.reference / np.linalg.norm(self.reference, axis=1, keepdims=True)
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (reference * vectors).sum(axis=1)
+
+    def _assert_parity(self, backend, min_cosine):
+        model = self.load_embedding_model(MODEL_NAME, backend=backend)
+        self.assertEqual(model.backend, "onnx", f"{backend} fell back to torch")
+        vectors = model.encode(SENTENCES)
+        self.assertEqual(vectors.shape, self.reference.shape)
+        cosines = self._cosines(vectors)
+        logger.info(f"{backend} cosine agreement: min={cosines.min():.5f} mean={cosines.mean():.5f}")
+        self.assertGreaterEqual(float(cosines.min()), min_cosine)
+
+    def test_onnx_matches_torch(self):
+        self._assert_parity("onnx", 0.9999)
+
+    def test_onnx_int8_matches_torch(self):
+        self._assert_parity("onnx-int8", 0.98)
+
+    def test_int8_preserves_ranking(self):
+        """Quantization must not change which sentence is closest to each query."""
+        np = self.np
+        vectors = self.load_embedding_model(MODEL_NAME, backend="onnx-int8").encode(SENTENCES)
+
+        def nearest(matrix):
+            matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+            similarities = matrix @ matrix.T
+            np.fill_diagonal(similarities, -1)
+            return similarities.argmax(axis=1).tolist()
+
+        self.assertEqual(nearest(vectors), nearest(self.reference))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+import importlib.util
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+REQUIRED_MODULES = ("numpy", "sentence_transformers")
+MISSING_MODULES = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+WINDOW_SECONDS = 0.2
+
+
+class StubModel:
+    """Local stand-in for a SentenceTransformer: 4-dimensional vectors derived from the text length."""
+
+    def __init__(self):
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts):
+        import numpy as np
+
+        self.batches.append(list(texts))
+        return np.asarray([[len(text), 1.0, 0.0, 0.0] for text in texts], dtype=np.float32)
+
+
+@unittest.skipIf(MISSING_MODULES, f"Embedding server dependencies not installed: {MISSING_MODULES}")
+class TestEmbeddingServer(unittest.TestCase):
+
+    def setUp(self):
+        from src.backend.embedding.embedding_service.embedding_client import EmbeddingClient
+        from src.backend.embedding.embedding_service.embedding_server import EmbeddingServer, ModelBatcher
+
+        self.model = StubModel()
+        self.socket_path = os.path.join(tempfile.mkdtemp(prefix="embedding_server_"), "server.sock")
+        server = EmbeddingServer(self.socket_path, WINDOW_SECONDS, 64, preload=[])
+        started = threading.Event()
+
+        async def run():
+            self.loop = asyncio.get_running_loop()
+            self.stop = asyncio.Event()
+            batcher = server.batchers["stub"] = ModelBatcher("stub", self.model, WINDOW_SECONDS, 64)
+            serving = asyncio.create_task(server.serve())
+            started.set()
+            await self.stop.wait()
+            for task in (serving, batcher._task):
+                task.cancel()
+            await asyncio.gather(serving, batcher._task, return_exceptions=True)
+
+        self.thread = threading.Thread(target=asyncio.run, args=(run(),), daemon=True)
+        self.thread.start()
+        started.wait()
+        self.client = EmbeddingClient("stub", self.socket_path)
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.stop.set)
+        self.thread.join()
+
+    def test_lone_requests_skip_the_batch_window(self):
+        self.client.encode(["warm-up"])
+        start = time.perf_counter()
+        for _ in range(5):
+            self.client.encode("one sentence at a time")
+        self.assertLess(time.perf_counter() - start, 5 * WINDOW_SECONDS / 2)
+
+    def test_concurrent_requests_share_a_batch(self):
+        from src.backend.embedding.embedding_service.embedding_client import EmbeddingClient
+
+        self.client.encode(["warm-up"])
+        threads = [threading.Thread(target=EmbeddingClient("stub", self.socket_path).encode, args=([f"text {i}"],))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(len(self.model.batches), 1 + len(threads))
+
+    def test_encode_arguments(self):
+        vectors = self.client.encode(["abcd"], normalize_embeddings=True, batch_size=8)
+        self.assertAlmostEqual(float((vectors ** 2).sum()), 1.0, places=5)
+        self.assertEqual(self.client.encode([]).shape, (0, 4))
+        with self.assertRaises(TypeError):
+            self.client.encode(["abcd"], convert_to_tensor=True)
+        with self.assertRaises(TypeError):
+            self.client.encode(["abcd"], precision="int8")
+
+
+if __name__ == "__main__":
+    unittest.main()
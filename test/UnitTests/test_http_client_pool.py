@@ -0,0 +1,65 @@
+import os
+import asyncio
+import threading
+import unittest
+import importlib.util
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+HAS_HTTPX = importlib.util.find_spec("httpx") is not None
+BASE_URL = "http://llm.local/v1"
+
+
+@unittest.skipUnless(HAS_HTTPX, "httpx is not installed")
+class TestHttpClientPoolRelease(unittest.TestCase):
+
+    def setUp(self):
+        from src.backend.chat_service.http_client_pool import LLMHttpClientPool
+
+        os.environ["LLM_HTTP_CLOSE_GRACE_SECONDS"] = "0"
+        LLMHttpClientPool._instances.pop(LLMHttpClientPool, None)
+        self.pool = LLMHttpClientPool()
+
+    def tearDown(self):
+        type(self.pool)._instances.pop(type(self.pool), None)
+
+    def test_release_from_another_thread_closes_on_the_owning_loop(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            async def acquire():
+                return self.pool.acquire(BASE_URL)
+
+            _, async_client = asyncio.run_coroutine_threadsafe(acquire(), loop).result()
+            self.pool.release(BASE_URL)  # no running loop in this thread
+
+            async def wait_closed():
+                while self.pool._closing or not async_client.is_closed:
+                    await asyncio.sleep(0.01)
+
+            asyncio.run_coroutine_threadsafe(wait_closed(), loop).result(timeout=5)
+            self.assertTrue(async_client.is_closed)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def test_release_after_the_owning_loop_is_gone_drops_the_client(self):
+        async def acquire():
+            return self.pool.acquire(BASE_URL)
+
+        sync_client, async_client = asyncio.run(acquire())
+        self.pool.release(BASE_URL)
+
+        self.assertTrue(sync_client.is_closed)
+        self.assertFalse(async_client.is_closed)  # not closed on a loop it does not belong to
+        self.assertEqual(self.pool._clients, {})
+        self.assertEqual(self.pool._closing, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
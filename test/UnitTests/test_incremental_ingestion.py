@@ -0,0 +1,184 @@
+import os
+import sys
+import copy
+import json
+import shutil
+import hashlib
+import subprocess
+import tempfile
+import unittest
+import importlib.util
+from types import SimpleNamespace
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+REQUIRED_MODULES = ("numpy", "sentence_transformers", "minio", "prometheus_client")
+MISSING_MODULES = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+HAS_WEAVIATE = importlib.util.find_spec("weaviate") is not None
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+CUSTOMER_GUID = "0b6f2c55-7a61-4f7e-9c3e-6f3f1f0f9a10"
+FILENAME = "manual.pdf"
+
+
+class HashEncoder:
+    """Local stand-in for the embedding model: a deterministic vector per text, counting encoded texts."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts):
+        import numpy as np
+
+        if isinstance(texts, str):
+            return self.encode([texts])[0]
+        self.encoded += len(texts)
+        return np.asarray([[byte / 255 for byte in hashlib.sha256(text.encode("utf-8")).digest()[:8]] for text in texts],
+                          dtype=np.float32)
+
+
+class LocalChunkedFiles:
+    """Serves chunked files from a local directory in place of MinIO."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def write(self, filename, chunks):
+        data = [{"text": text, "metadata": {"filename": filename, "chunk_number": number, "page_numbers": pages}}
+                for number, (text, pages) in enumerate(chunks, start=1)]
+        path = os.path.join(self.directory, f"{filename}.chunked.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        return path
+
+    def download_and_save_file(self, customer_guid, file_path):
+        return file_path
+
+
+class RecordingBatch:
+    """Stand-in for the v3 batch client that checks delete filters the way the REST client does."""
+
+    def __init__(self, failed=0):
+        self.failed = failed
+        self.deletes = []
+
+    def delete_objects(self, class_name, where, tenant=None):
+        from weaviate.batch.crud_batch import _clean_delete_objects_where
+
+        _clean_delete_objects_where(copy.deepcopy(where))  # raises on filters the REST endpoint rejects
+        self.deletes.append(where)
+        return {"results": {"matches": len(where["valueTextArray"]), "failed": self.failed}}
+
+
+@unittest.skipIf(MISSING_MODULES, f"Vector store dependencies not installed: {MISSING_MODULES}")
+class TestIncrementalIngestion(unittest.TestCase):
+
+    def setUp(self):
+        from src.backend.weaviate.local_vector_manager import LocalVectorManager
+
+        self.directory = tempfile.mkdtemp(prefix="incremental_ingestion_")
+        os.environ["LOCAL_VECTOR_DIR"] = os.path.join(self.directory, "vectors")
+        os.environ["MODEL_DIR"] = "hash-encoder"
+        for name, value in (("MINIO_HOST", "localhost"), ("MINIO_SERVER_PORT", "9000"),
+                            ("MINIO_ROOT_USER", "test"), ("MINIO_ROOT_PASSWORD", "test")):
+            os.environ.setdefault(name, value)
+
+        class Manager(LocalVectorManager):
+            def load_model(self):
+                return HashEncoder()
+
+        self.manager = Manager()
+        self.files = LocalChunkedFiles(self.directory)
+        self.manager.download = self.files
+        self.class_name = self.manager.generate_weaviate_class_name(CUSTOMER_GUID)
+        self.manager.add_weaviate_customer_class(CUSTOMER_GUID)
+
+    def tearDown(self):
+        type(self.manager)._instances.pop(type(self.manager), None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stored(self, filename=FILENAME):
+        objects = self.manager._get_file_objects(self.class_name, None, CUSTOMER_GUID, filename)
+        return {properties["text"]: properties["page_numbers"] for properties, _ in objects.values()}
+
+    def test_reingestion_removes_stale_chunks(self):
+        self.manager.insert_data(CUSTOMER_GUID, self.files.write(FILENAME, [
+            ("reset your password from the login page", [1]),
+            ("refunds are processed within five days", [2]),
+            ("the warranty covers the laptop battery", [3]),
+        ]))
+        encoded = self.manager.model.encoded
+
+        counts = self.manager.insert_data(CUSTOMER_GUID, self.files.write(FILENAME, [
+            ("reset your password from the login page", [1]),
+            ("the warranty covers the laptop battery", [2, 3]),
+        ]))
+
+        self.assertEqual(counts, {"embedded": 0, "rewritten": 1, "deleted": 1, "unchanged": 1})
+        self.assertEqual(self.manager.model.encoded, encoded)
+        self.assertEqual(self.stored(), {"reset your password from the login page": [1],
+                                         "the warranty covers the laptop battery": [2, 3]})
+
+    def test_local_backend_does_not_import_weaviate(self):
+        code = ("import sys; sys.modules['weaviate'] = None\n"
+                "from src.backend.weaviate.local_vector_manager import LocalVectorManager\n"
+                "assert 'src.backend.weaviate.weaviate_manager' not in sys.modules")
+        result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_file_objects_use_one_filtered_query(self):
+        self.manager.insert_data(CUSTOMER_GUID, self.files.write("other.pdf", [(f"other chunk {i}", [1]) for i in range(5)]))
+        self.manager.insert_data(CUSTOMER_GUID, self.files.write(FILENAME, [(f"manual chunk {i}", [i]) for i in range(5)]))
+        self.manager._cursor_query = None  # must not be needed below QUERY_MAXIMUM_RESULTS
+
+        objects = self.manager._get_file_objects(self.class_name, None, CUSTOMER_GUID, FILENAME)
+        self.assertEqual(sorted(properties["text"] for properties, _ in objects.values()),
+                         [f"manual chunk {i}" for i in range(5)])
+        self.assertTrue(all(vector for _, vector in objects.values()))
+
+    def test_advanced_search_keeps_every_chunk_of_expanded_pages(self):
+        chunks = [(f"warranty clause {i}", [i % 3 + 1]) for i in range(450)]
+        self.manager.insert_data(CUSTOMER_GUID, self.files.write(FILENAME, chunks))
+
+        result = self.manager.search_query_advanced(CUSTOMER_GUID, "warranty clause 7", top_k=2, include_chunks=True)
+        for item in result["results"]:
+            self.assertEqual(item["page_numbers"], [1, 2, 3])
+            self.assertEqual(len(item["chunks"]), len(chunks))
+
+    def test_file_objects_span_cursor_pages(self):
+        self.manager.insert_data(CUSTOMER_GUID, self.files.write("other.pdf", [(f"other chunk {i}", [1]) for i in range(5)]))
+        self.manager.insert_data(CUSTOMER_GUID, self.files.write(FILENAME, [(f"manual chunk {i}", [i]) for i in range(5)]))
+        self.manager.query_maximum_results = 3  # the filtered query is capped, so the cursor API takes over
+
+        objects = self.manager._get_file_objects(self.class_name, None, CUSTOMER_GUID, FILENAME, page_size=2)
+        self.assertEqual(sorted(properties["text"] for properties, _ in objects.values()),
+                         [f"manual chunk {i}" for i in range(5)])
+        self.assertTrue(all(vector for _, vector in objects.values()))
+
+
+@unittest.skipIf(MISSING_MODULES or not HAS_WEAVIATE, "Weaviate manager dependencies not installed")
+class TestStaleChunkDelete(unittest.TestCase):
+
+    def manager(self, batch):
+        from src.backend.weaviate.weaviate_manager import WeaviateManager
+
+        manager = object.__new__(WeaviateManager)  # only the REST client is needed
+        manager.client = SimpleNamespace(batch=batch)
+        return manager
+
+    def test_delete_filter_is_accepted_by_rest(self):
+        batch = RecordingBatch()
+        object_ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(150)]
+        self.manager(batch)._delete_object_ids("Customer_x", None, object_ids)
+        self.assertEqual([len(where["valueTextArray"]) for where in batch.deletes], [100, 50])
+
+    def test_failed_delete_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.manager(RecordingBatch(failed=1))._delete_object_ids("Customer_x", None, ["00000000-0000-0000-0000-000000000001"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import unittest
+
+from src.backend.chat_service.llm_router import LLMRouter
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+
+class StubProvider:
+    """Local stand-in for an LLM: streams fixed tokens after a configurable first-token delay."""
+
+    def __init__(self, name, ttft=0.0, tokens=("hello", " world"), fail=False, role_delta=False):
+        self.name = name
+        self.ttft = ttft
+        self.role_delta = role_delta  # send an empty chunk at once, like the OpenAI role-only delta
+        self.tokens = tokens
+        self.fail = fail
+        self.calls = 0
+        self.closed = False
+
+    async def astream(self, messages):
+        self.calls += 1
+        try:
+            if self.role_delta:
+                yield ""
+            await asyncio.sleep(self.ttft)
+            if self.fail:
+                raise RuntimeError(f"{self.name} is down")
+            for token in self.tokens:
+                yield f"{self.name}:{token}"
+        finally:
+            self.closed = True
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.ttft)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return f"{self.name}:answer"
+
+
+async def collect(router, route_info=None):
+    return [chunk async for chunk in router.astream(["question"], route_info=route_info)]
+
+
+class TestLLMRouter(unittest.TestCase):
+
+    def test_routes_to_fastest_measured_provider(self):
+        """After both providers are measured, the one with the lower rolling TTFT is used."""
+        slow, fast = StubProvider("SLOW", ttft=0.05), StubProvider("FAST", ttft=0.0)
+        router = LLMRouter({"SLOW": slow, "FAST": fast})
+        router.record_ttft("SLOW", 0.5)
+        router.record_ttft("FAST", 0.01)
+
+        route_info = {}
+        chunks = asyncio.run(collect(router, route_info))
+
+        self.assertEqual(chunks, ["FAST:hello", "FAST: world"])
+        self.assertEqual(route_info["provider"], "FAST")
+        self.assertEqual(slow.calls, 0)
+
+    def test_unmeasured_providers_are_tried_first(self):
+        """A provider without samples ranks ahead of measured ones so it gets measured."""
+        router = LLMRouter({"A": StubProvider("A"), "B": StubProvider("B")})
+        router.record_ttft("A", 0.01)
+        self.assertEqual(router.ranked_providers(), ["B", "A"])
+
+    def test_failover_before_first_token(self):
+        """An error before the first token falls over to the next provider."""
+        broken, backup = StubProvider("BROKEN", fail=True), StubProvider("BACKUP")
+        router = LLMRouter({"BROKEN": broken, "BACKUP": backup})
+
+        chunks = asyncio.run(collect(router))
+
+        self.assertEqual(chunks, ["BACKUP:hello", "BACKUP: world"])
+        self.assertEqual(router.stats["BROKEN"].consecutive_failures, 1)
+
+    def test_provider_unhealthy_after_repeated_failures(self):
+        """Consecutive failures take a provider out of rotation until the cooldown expires."""
+        broken, backup = StubProvider("BROKEN", fail=True), StubProvider("BACKUP")
+        router = LLMRouter({"BROKEN": broken, "BACKUP": backup}, failure_threshold=2, cooldown_seconds=60)
+
+        asyncio.run(collect(router))
+        asyncio.run(collect(router))
+        self.assertEqual(router.ranked_providers(), ["BACKUP", "BROKEN"])
+
+        asyncio.run(collect(router))
+        self.assertEqual(broken.calls, 2, "Unhealthy provider should not be called while healthy ones exist")
+
+    def test_hedged_request_cancels_loser(self):
+        """A hedge is issued when the first token misses the deadline and the slower stream is cancelled."""
+        stalled, hedge = StubProvider("STALLED", ttft=1.0), StubProvider("HEDGE", ttft=0.0)
+        router = LLMRouter({"STALLED": stalled, "HEDGE": hedge}, hedge_delay_seconds=0.05)
+
+        route_info = {}
+        chunks = asyncio.run(collect(router, route_info))
+
+        self.assertEqual(chunks, ["HEDGE:hello", "HEDGE: world"])
+        self.assertTrue(route_info.get("hedged"))
+        self.assertEqual(route_info["provider"], "HEDGE")
+        self.assertTrue(stalled.closed, "Losing stream should be closed")
+        self.assertGreaterEqual(router.stats["STALLED"].rolling_ttft(), 0.05)
+
+    def test_ttft_starts_at_first_content_chunk(self):
+        """An early empty chunk is passed through but does not count as the first token or stop a hedge."""
+        stalled, hedge = StubProvider("STALLED", ttft=1.0, role_delta=True), StubProvider("HEDGE", ttft=0.0)
+        router = LLMRouter({"STALLED": stalled, "HEDGE": hedge}, hedge_delay_seconds=0.05)
+
+        route_info = {}
+        chunks = asyncio.run(collect(router, route_info))
+
+        self.assertEqual(chunks, ["HEDGE:hello", "HEDGE: world"])
+        self.assertTrue(route_info.get("hedged"))
+
+        router = LLMRouter({"SLOW": StubProvider("SLOW", ttft=0.05, role_delta=True)})
+        chunks = asyncio.run(collect(router))
+        self.assertEqual(chunks, ["", "SLOW:hello", "SLOW: world"])
+        self.assertGreaterEqual(router.stats["SLOW"].rolling_ttft(), 0.05)
+
+    def test_censored_samples_do_not_lower_the_average(self):
+        router = LLMRouter({"A": StubProvider("A")})
+        router.record_ttft("A", 1.0)
+        router.record_censored_ttft("A", 0.1)
+        self.assertEqual(router.stats["A"].rolling_ttft(), 1.0)
+        self.assertEqual(router.snapshot()["A"]["censored_samples"], 1)
+
+    def test_no_hedge_when_first_token_is_on_time(self):
+        primary, hedge = StubProvider("PRIMARY", ttft=0.0), StubProvider("HEDGE")
+        router = LLMRouter({"PRIMARY": primary, "HEDGE": hedge}, hedge_delay_seconds=0.5)
+
+        route_info = {}
+        asyncio.run(collect(router, route_info))
+
+        self.assertNotIn("hedged", route_info)
+        self.assertEqual(hedge.calls, 0)
+
+    def test_all_providers_failing_raises(self):
+        router = LLMRouter({"A": StubProvider("A", fail=True), "B": StubProvider("B", fail=True)})
+        with self.assertRaises(RuntimeError):
+            asyncio.run(collect(router))
+
+    def test_ainvoke_failover(self):
+        router = LLMRouter({"BROKEN": StubProvider("BROKEN", fail=True), "BACKUP": StubProvider("BACKUP")})
+        route_info = {}
+        result = asyncio.run(router.ainvoke(["question"], route_info=route_info))
+        self.assertEqual(result, "BACKUP:answer")
+        self.assertEqual(route_info["provider"], "BACKUP")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import shutil
+import tempfile
+import unittest
+import importlib.util
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+PROPERTIES = ["text", "chunk_number", "page_numbers", "filename", "customer_guid"]
+
+
+def chunk(number, text, filename="manual.pdf", pages=(1,)):
+    return {"text": text, "chunk_number": number, "page_numbers": list(pages), "filename": filename,
+            "customer_guid": "guid", "max_page": 3}
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestLocalCollection(unittest.TestCase):
+
+    def setUp(self):
+        from src.backend.weaviate.local_vector_store import LocalCollection
+
+        self.LocalCollection = LocalCollection
+        self.directory = tempfile.mkdtemp(prefix="local_vectors_")
+        self.collection = LocalCollection(self.directory)
+        self.collection.upsert(
+            ["a", "b", "c"],
+            [chunk(1, "reset your password from the login page", pages=(1,)),
+             chunk(2, "refunds are processed within five days", pages=(2,)),
+             chunk(3, "the warranty covers the laptop battery", filename="warranty.pdf", pages=(1, 2))],
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_vector_search(self):
+        rows = self.collection.hybrid(PROPERTIES, "", [0.1, 0.9, 0.0], alpha=1.0, limit=2)
+        self.assertEqual([row["chunk_number"] for row in rows], [2, 1])
+
+    def test_keyword_search(self):
+        rows = self.collection.hybrid(PROPERTIES, "warranty battery", [1.0, 0.0, 0.0], alpha=0.0, limit=1)
+        self.assertEqual(rows[0]["filename"], "warranty.pdf")
+
+    def test_hybrid_returns_stored_vectors(self):
+        rows = self.collection.hybrid(PROPERTIES, "password", [1.0, 0.0, 0.0], alpha=0.5, limit=3,
+                                      additional=["id", "vector"])
+        self.assertEqual(rows[0]["_additional"]["id"], "a")
+        self.assertEqual(rows[0]["_additional"]["vector"], [1.0, 0.0, 0.0])
+
+    def test_where_filter_fetch(self):
+        where = {"operator": "And", "operands": [
+            {"path": ["filename"], "operator": "Equal", "valueText": "manual.pdf"},
+            {"path": ["page_numbers"], "operator": "ContainsAny", "valueInt": [2, 3]},
+        ]}
+        rows = self.collection.fetch(PROPERTIES, where, limit=10)
+        self.assertEqual([row["chunk_number"] for row in rows], [2])
+
+    def test_upsert_replaces_and_delete_removes(self):
+        self.collection.upsert(["a"], [chunk(7, "new text")], [[0.0, 1.0, 0.0]])
+        deleted = self.collection.delete({"path": ["id"], "operator": "ContainsAny", "valueTextArray": ["b", "missing"]})
+        self.assertEqual(deleted, 1)
+
+        rows = self.collection.hybrid(PROPERTIES, "", [0.0, 1.0, 0.0], alpha=1.0, limit=5, additional=["id"])
+        self.assertEqual([row["_additional"]["id"] for row in rows][0], "a")
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["chunk_number"], 7)
+
+    def test_changes_are_visible_to_another_instance(self):
+        """A second process (here: a second instance on the same directory) sees later writes."""
+        reader = self.LocalCollection(self.directory)
+        self.assertEqual(len(reader.fetch(PROPERTIES, {"path": ["customer_guid"], "operator": "Equal", "valueText": "guid"})), 3)
+
+        self.collection.upsert(["c"], [chunk(3, "warranty again", filename="warranty.pdf")], [[0.0, 0.0, 2.0]])
+        rows = reader.hybrid(PROPERTIES, "", [0.0, 0.0, 1.0], alpha=1.0, limit=1, additional=["vector"])
+        self.assertEqual(rows[0]["text"], "warranty again")
+        self.assertEqual(rows[0]["_additional"]["vector"], [0.0, 0.0, 2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import inspect
+import unittest
+import warnings
+import importlib.util
+
+from src.backend.lib.logging_config import get_primitivechat_logger
+
+# Set up logging configuration
+logger = get_primitivechat_logger(__name__)
+
+HAS_WEAVIATE = importlib.util.find_spec("weaviate") is not None
+
+
+@unittest.skipUnless(HAS_WEAVIATE, "weaviate-client is not installed")
+class TestWeaviateV3ClientApi(unittest.TestCase):
+    """
+    WeaviateManager's REST transport and schema calls use the v3 client API, which weaviate-client
+    4.x only ships up to 4.9.x. These checks fail on a client version that no longer has it.
+    """
+
+    def setUp(self):
+        warnings.simplefilter("ignore", DeprecationWarning)
+
+    def test_v3_client_and_schema(self):
+        from weaviate import Client
+        from weaviate.schema.crud_schema import Schema, Tenant, TenantActivityStatus
+
+        self.assertTrue(callable(Client))
+        for method in ("exists", "create_class", "delete_class", "get_class_tenants", "add_class_tenants",
+                       "update_class_tenants"):
+            self.assertTrue(hasattr(Schema, method), method)
+        self.assertEqual({status.value for status in TenantActivityStatus}, {"HOT", "COLD"})
+        self.assertEqual(Tenant(name="guid", activity_status=TenantActivityStatus.COLD).name, "guid")
+
+    def test_v3_batch_signatures(self):
+        from weaviate.batch.crud_batch import Batch
+
+        self.assertTrue({"uuid", "vector", "tenant"} <= set(inspect.signature(Batch.add_data_object).parameters))
+        self.assertIn("tenant", inspect.signature(Batch.delete_objects).parameters)
+
+    def test_v3_get_query(self):
+        from weaviate.gql.get import GetBuilder
+
+        query = (GetBuilder("Customer_x", ["text", "filename"], None)
+                 .with_hybrid(query="reset password", alpha=0.5, vector=[0.1, 0.2])
+                 .with_where({"path": ["filename"], "operator": "Equal", "valueText": "manual.pdf"})
+                 .with_additional(["id", "vector"])
+                 .with_tenant("guid")
+                 .with_limit(10)
+                 .build())
+        for fragment in ('hybrid:{query: "reset password"', 'tenant: "guid"', "_additional {id vector }", "limit: 10"):
+            self.assertIn(fragment, query)
+
+
+if __name__ == "__main__":
+    unittest.main()